@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AST memory benchmark - bytes held per AST node for a large program
+AST स्मृती चाचणी - मोठ्या प्रोग्रामसाठी प्रत्येक नोडची स्मृती
+
+Parses the example programs repeated many times and measures, with
+tracemalloc, how much memory the resulting AST keeps alive. The same tree
+is then rebuilt from plain dataclasses with a per-instance __dict__ (the
+old node layout) for comparison.
+"""
+
+import os
+import sys
+import glob
+import argparse
+import tracemalloc
+from dataclasses import fields, make_dataclass
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from interpreter.lexer import MarathiLexer
+from interpreter.parser import ASTNode, MarathiParser
+
+def example_source() -> str:
+    sources = []
+    for path in sorted(glob.glob(os.path.join(ROOT, 'examples', '*.mr'))):
+        with open(path, encoding='utf-8') as f:
+            sources.append(f.read())
+    return '\n'.join(sources) + '\n'
+
+def count_nodes(root: ASTNode) -> int:
+    count = 0
+    pending = [root]
+    while pending:
+        value = pending.pop()
+        if isinstance(value, ASTNode):
+            count += 1
+            pending.extend(getattr(value, field.name) for field in fields(value))
+        elif isinstance(value, list):
+            pending.extend(value)
+    return count
+
+def dict_copy(root: ASTNode, classes: dict):
+    """Copy an AST into the equivalent classes from dict_classes()"""
+    def copy(value):
+        if isinstance(value, ASTNode):
+            return classes[type(value)](*[copy(getattr(value, field.name)) for field in fields(value)])
+        if isinstance(value, list):
+            return [copy(item) for item in value]
+        return value
+
+    return copy(root)
+
+def dict_classes() -> dict:
+    """Plain dataclass twins of the AST node classes, with a __dict__"""
+    return {node_type: make_dataclass(node_type.__name__, [field.name for field in fields(node_type)])
+            for node_type in ASTNode.__subclasses__()}
+
+def measure(build) -> tuple:
+    """Return (result of build(), bytes still allocated by it)"""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        return result, tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--copies', type=int, default=1000,
+                            help='how many times the examples are repeated')
+    args = arg_parser.parse_args()
+
+    tokens = MarathiLexer().tokenize_compact(example_source() * args.copies)
+    program, slotted_bytes = measure(lambda: MarathiParser(print_errors=False).parse(tokens))
+    nodes = count_nodes(program)
+    classes = dict_classes()
+    _, dict_bytes = measure(lambda: dict_copy(program, classes))
+
+    print(f'{nodes} nodes')
+    print(f'  slotted nodes:  {slotted_bytes / nodes:7.1f} bytes/node  ({slotted_bytes / 1e6:.1f} MB)')
+    print(f'  __dict__ nodes: {dict_bytes / nodes:7.1f} bytes/node  ({dict_bytes / 1e6:.1f} MB)')
+    print(f'  saving: {1 - slotted_bytes / dict_bytes:.0%}')
+
+if __name__ == '__main__':
+    main()
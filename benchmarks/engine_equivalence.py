@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Engine equivalence check - every engine must print the same as the evaluator
+इंजिन तुलना - प्रत्येक इंजिनचे आउटपुट मूल्यांकनाशी जुळले पाहिजे
+
+Runs each example program, and the regression programs below, with every
+`--engine` of main.py, with `--no-memoize`, and as the standalone Python
+script written by `--compile` (if it calls no module), and compares the
+output with the tree-walking evaluator's. Exits with status 1 on any
+difference.
+"""
+
+import os
+import sys
+import glob
+import time
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+MAIN = os.path.join(ROOT, 'main.py')
+sys.path.insert(0, ROOT)
+
+from main import ENGINES
+from interpreter.stdlib import MODULES
+
+# Programs that once printed something different on some engine or with
+# some option, run with the examples; `DATA` is replaced by the path of a
+# file of three lines
+DATA_LINES = 'एक\nदोन\nतीन\n'
+REGRESSIONS = {
+    # A memoized call returned 3 twice, though the first call had used
+    # up the ओळी generator both calls were given
+    'memo_generator.mr': '''कार्य मोजा(ओळी) {
+    चल n = ०
+    प्रत्येक ओळ मध्ये ओळी {
+        n = n + १
+    }
+    परत n
+}
+चल फाइल = प्रवेश.ओळी("DATA")
+मुद्रण(मोजा(फाइल))
+मुद्रण(मोजा(फाइल))
+''',
+}
+
+def run(command: list) -> tuple:
+    """Return (stdout, seconds) of a command"""
+    start = time.perf_counter()
+    result = subprocess.run(command, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                            stderr=subprocess.STDOUT, env=dict(os.environ, PYTHONIOENCODING='utf-8'))
+    return result.stdout.decode('utf-8', 'replace'), time.perf_counter() - start
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('files', nargs='*', help='programs to check (default: examples/*.mr)')
+    args = arg_parser.parse_args()
+
+    failed = False
+    with tempfile.TemporaryDirectory() as directory:
+        files = args.files
+        if not files:
+            files = sorted(glob.glob(os.path.join(ROOT, 'examples', '*.mr')))
+            data = os.path.join(directory, 'data.txt')
+            with open(data, 'w', encoding='utf-8') as f:
+                f.write(DATA_LINES)
+            for name, source in REGRESSIONS.items():
+                files.append(os.path.join(directory, name))
+                with open(files[-1], 'w', encoding='utf-8') as f:
+                    f.write(source.replace('DATA', data))
+        for path in files:
+            print(f'{os.path.relpath(path)}:')
+            expected, seconds = run([sys.executable, MAIN, '--no-cache', '--engine', 'tree', path])
+            print(f'  {"tree":<14}{seconds * 1000:10.1f} ms')
+
+            runs = [(engine, [sys.executable, MAIN, '--no-cache', '--engine', engine, path])
+                    for engine in ENGINES if engine != 'tree']
+            runs.append(('--no-memoize', [sys.executable, MAIN, '--no-cache', '--no-memoize', path]))
+            with open(path, encoding='utf-8') as f:
+                source = f.read()
+            # Standalone scripts have no modules to call
+            if not any(f'{name}.' in source for name in MODULES):
+                script = os.path.join(directory, os.path.splitext(os.path.basename(path))[0] + '.py')
+                # Syntax errors are printed while compiling and again by the script
+                run([sys.executable, MAIN, '--compile', script, path])
+                runs.append(('--compile', [sys.executable, script]))
+
+            for name, command in runs:
+                output, seconds = run(command)
+                same = output == expected
+                failed = failed or not same
+                print(f'  {name:<14}{seconds * 1000:10.1f} ms  {"same" if same else "DIFFERENT"}')
+                if not same:
+                    print(f'    expected {expected!r}\n    got      {output!r}')
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
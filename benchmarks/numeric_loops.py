@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Numeric loop benchmark - type-specialized operators in the closure engine
+संख्या पुनरावृत्ती चाचणी - क्लोजर इंजिनमधील प्रकार-विशिष्ट क्रिया
+
+Runs tight integer and float loops on the tree walker and on the closure
+engine with and without type feedback, checks that all three print the
+same, and reports the speedup of the specialized closures. Exits with
+status 1 if the outputs differ.
+"""
+
+import io
+import os
+import sys
+import time
+import argparse
+import contextlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from interpreter.lexer import MarathiLexer
+from interpreter.parser import MarathiParser
+from interpreter.evaluator import MarathiEvaluator
+from interpreter.compiler import ClosureEvaluator
+
+def counting_loop(n: int) -> str:
+    return f'''चल i = ०
+चल बेरीज = ०
+जोपर्यंत i < {n} {{
+    बेरीज = बेरीज + i * २ % ७
+    i = i + १
+}}
+मुद्रण(बेरीज)
+'''
+
+def nested_loops(n: int) -> str:
+    side = max(int(n ** 0.5), 1)
+    return f'''चल i = ०
+चल एकूण = ०
+जोपर्यंत i < {side} {{
+    चल j = ०
+    जोपर्यंत j < {side} {{
+        जर (i + j) % ३ == ० {{
+            एकूण = एकूण + i * j
+        }}
+        j = j + १
+    }}
+    i = i + १
+}}
+मुद्रण(एकूण)
+'''
+
+def float_loop(n: int) -> str:
+    return f'''चल x = ०.५
+चल k = ०
+जोपर्यंत k <= {n} {{
+    x = x * ०.९९९ + ०.००१
+    k = k + १
+}}
+मुद्रण(x)
+'''
+
+def while_countdown(n: int) -> str:
+    return f'''चल बाकी = {n}
+चल सम = ०
+जोपर्यंत बाकी > ० {{
+    जर बाकी % २ == ० {{
+        सम = सम + १
+    }}
+    बाकी = बाकी - १
+}}
+मुद्रण(सम)
+'''
+
+def function_calls(n: int) -> str:
+    return f'''कार्य वर्ग(x) {{
+    परत x * x + १
+}}
+चल i = ०
+चल बेरीज = ०
+जोपर्यंत i < {n // 4} {{
+    बेरीज = बेरीज + वर्ग(i)
+    i = i + १
+}}
+मुद्रण(बेरीज)
+'''
+
+PROGRAMS = {
+    'counting-loop': counting_loop,
+    'nested-loops': nested_loops,
+    'float-loop': float_loop,
+    'countdown': while_countdown,
+    'function-calls': function_calls,
+}
+
+ENGINES = {
+    'tree': lambda: MarathiEvaluator(memoize=False),
+    'closure-generic': lambda: ClosureEvaluator(specialize=False),
+    'closure-specialized': lambda: ClosureEvaluator(specialize=True),
+}
+
+def time_run(source: str, make, repeat: int) -> tuple:
+    """Best-of-`repeat` (seconds, output) of running a source on a fresh evaluator"""
+    program = MarathiParser().parse(MarathiLexer().tokenize(source))
+    best = float('inf')
+    output = ''
+    for _ in range(repeat):
+        evaluator = make()
+        captured = io.StringIO()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(captured):
+            evaluator.evaluate(program)
+        best = min(best, time.perf_counter() - start)
+        output = captured.getvalue()
+    return best, output
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--size', type=int, default=200000, help='iterations per loop')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='runs per engine (best is kept)')
+    arg_parser.add_argument('programs', nargs='*', choices=[[]] + list(PROGRAMS), default=[],
+                            help='programs to run (default: all)')
+    args = arg_parser.parse_args()
+
+    failed = False
+    for name in args.programs or PROGRAMS:
+        source = PROGRAMS[name](args.size)
+        print(f'{name}:')
+        times = {}
+        outputs = set()
+        for engine, make in ENGINES.items():
+            seconds, output = time_run(source, make, args.repeat)
+            times[engine] = seconds
+            outputs.add(output)
+            print(f'  {engine:<20}{seconds * 1000:10.1f} ms')
+        speedup = times['closure-generic'] / times['closure-specialized']
+        print(f'  specialized vs generic closures: {speedup:.2f}x')
+        if len(outputs) != 1:
+            print('  DIFFERENT output')
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
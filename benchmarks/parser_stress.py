@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Parser stress benchmark - machine-generated sources at increasing sizes
+पार्सर ताण चाचणी - वाढत्या आकाराच्या स्वयंनिर्मित फाइल्स
+
+For each shape (huge array literal, long operator chain, deeply nested
+blocks, ...) a source is generated at sizes n, 2n, 4n, ...; the parse time
+per element must stay roughly constant, i.e. parsing scales linearly.
+Exits with status 1 if a shape fails to parse or grows faster than that.
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from interpreter.lexer import MarathiLexer
+from interpreter.parser import MarathiParser
+
+def array_literal(n: int) -> str:
+    return 'चल यादी = [' + ', '.join(str(i) for i in range(n)) + ']\n'
+
+def operator_chain(n: int) -> str:
+    operators = ['+', '-', '*', '+', '/', '+', '%', '-']
+    terms = ['क']
+    for i in range(1, n):
+        terms.append(operators[i % len(operators)])
+        terms.append(str(i))
+    return 'चल बेरीज = ' + ' '.join(terms) + '\n'
+
+def nested_blocks(n: int) -> str:
+    lines = []
+    for i in range(n):
+        lines.append('    ' * (i % 8) + f'जर क > {i} {{')
+    lines.append('मुद्रण(क)')
+    lines.extend('}' for _ in range(n))
+    return '\n'.join(lines) + '\n'
+
+def nested_else(n: int) -> str:
+    lines = []
+    for i in range(n):
+        lines.append(f'जर क == {i} {{')
+        lines.append(f'    मुद्रण({i})')
+        lines.append('} नाहीतर {')
+    lines.append('मुद्रण(क)')
+    lines.extend('}' for _ in range(n))
+    return '\n'.join(lines) + '\n'
+
+def nested_parentheses(n: int) -> str:
+    return 'चल x = ' + '(' * n + '१' + ')' * n + '\n'
+
+def nested_arrays(n: int) -> str:
+    return 'चल x = ' + '[' * n + '१' + ']' * n + '\n'
+
+def unary_chain(n: int) -> str:
+    return 'चल x = ' + 'नाही ' * n + 'सत्य\n'
+
+def many_statements(n: int) -> str:
+    names = ['क', 'ख', 'ग', 'घ']
+    return ''.join(f'चल {names[i % 4]} = {names[i % 3]} + {i}\n' for i in range(n))
+
+SHAPES = {
+    'array-literal': array_literal,
+    'operator-chain': operator_chain,
+    'nested-blocks': nested_blocks,
+    'nested-else': nested_else,
+    'nested-parentheses': nested_parentheses,
+    'nested-arrays': nested_arrays,
+    'unary-chain': unary_chain,
+    'statements': many_statements,
+}
+
+def time_parse(source: str, repeat: int) -> float:
+    """Best-of-`repeat` parse time of a source, excluding lexing"""
+    tokens = MarathiLexer().tokenize_compact(source)
+    best = float('inf')
+    for _ in range(repeat):
+        parser = MarathiParser(print_errors=False)
+        start = time.perf_counter()
+        parser.parse(tokens)
+        best = min(best, time.perf_counter() - start)
+        if parser.errors:
+            raise RuntimeError(parser.errors[0])
+    return best
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--start', type=int, default=10000, help='smallest size')
+    arg_parser.add_argument('--steps', type=int, default=5, help='number of doublings')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='runs per size (best is kept)')
+    arg_parser.add_argument('--tolerance', type=float, default=2.0,
+                            help='largest allowed growth of the time per element')
+    arg_parser.add_argument('shapes', nargs='*', choices=[[]] + list(SHAPES), default=[],
+                            help='shapes to run (default: all)')
+    args = arg_parser.parse_args()
+
+    failed = False
+    for name in args.shapes or SHAPES:
+        generate = SHAPES[name]
+        print(f'{name}:')
+        per_element = []
+        try:
+            for step in range(args.steps):
+                size = args.start << step
+                seconds = time_parse(generate(size), args.repeat)
+                per_element.append(seconds / size)
+                print(f'  {size:>9}  {seconds * 1000:10.2f} ms  {seconds / size * 1e6:8.3f} µs/element')
+        except (RuntimeError, RecursionError, MemoryError) as e:
+            print(f'  FAILED: {type(e).__name__}: {e}')
+            failed = True
+            continue
+
+        growth = per_element[-1] / min(per_element)
+        linear = growth <= args.tolerance
+        failed = failed or not linear
+        print(f'  growth {growth:.2f}x -> {"linear" if linear else "SUPERLINEAR"}')
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Regression checks - behaviour that once went wrong must stay fixed
+पुनरावृत्ती तपासण्या - एकदा चुकलेले वर्तन पुन्हा चुकू नये
+
+Each check runs a small program or API call in this process and compares
+what it prints, returns or raises with what it must. Output that has to
+match on every engine belongs in engine_equivalence.py instead. Exits
+with status 1 if any check fails.
+"""
+
+import io
+import os
+import sys
+import argparse
+import contextlib
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from interpreter.lexer import MarathiLexer
+from interpreter.parser import MarathiParser
+from interpreter.evaluator import MarathiEvaluator
+from interpreter.trampoline import TrampolineEvaluator
+from interpreter.limits import DEPTH, LimitExceeded, Limits
+from interpreter.program import compile_program
+from interpreter.stdlib import load_stdlib
+from main import ENGINES, MarathiREPL
+
+class CheckFailed(Exception):
+    pass
+
+def same(what: str, got, expected):
+    if got != expected:
+        raise CheckFailed(f'{what}: expected {expected!r}, got {got!r}')
+
+def run(source: str, evaluator=None) -> tuple:
+    """(printed output, exception or None) of running source"""
+    evaluator = evaluator or MarathiEvaluator()
+    program = MarathiParser(print_errors=False).parse(MarathiLexer().tokenize(source))
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        try:
+            evaluator.evaluate(program)
+        except Exception as e:
+            return output.getvalue(), e
+    return output.getvalue(), None
+
+def expression_nesting():
+    """A long call-free chain is not reported as a call depth limit"""
+    chain = 'मुद्रण(' + ' + '.join(['१'] * 20000) + ')\n'
+    for name, evaluator in [('tree', MarathiEvaluator()),
+                            ('trampoline', TrampolineEvaluator()),
+                            ('tree with max_depth', MarathiEvaluator(limits=Limits(max_depth=50)))]:
+        _, error = run(chain, evaluator)
+        same(f'{name} error type', type(error), RuntimeError)
+        same(f'{name} error', str(error), 'अभिव्यक्ती खूप खोलवर गुंतलेली आहे')
+
+    recursion = 'कार्य f(n) {\n    परत f(n + १)\n}\nमुद्रण(f(१))\n'
+    _, error = run(recursion, MarathiEvaluator(limits=Limits(max_depth=50)))
+    same('max_depth error', (type(error), getattr(error, 'kind', None), getattr(error, 'limit', None)),
+         (LimitExceeded, DEPTH, 50))
+    _, error = run(recursion)
+    same('unlimited recursion error', (type(error), getattr(error, 'kind', None)), (LimitExceeded, DEPTH))
+
+def program_inputs():
+    """Parameters and locals of a function do not hide top-level reads"""
+    cases = [
+        ('कार्य f(क) {\n    परत क\n}\nमुद्रण(f(क))\n', ('क',)),
+        ('कार्य f() {\n    क = १\n}\nमुद्रण(क)\n', ('क',)),
+        ('कार्य फिबो(न) {\n    जर न <= १ {\n        परत न\n    }\n'
+         '    परत फिबो(न - १) + फिबो(न - २)\n}\nचल उत्तर = फिबो(न)\n', ('न',)),
+        # Top-level assignments do cover what functions read
+        ('चल अ = १\nकार्य g() {\n    परत अ + ब\n}\nमुद्रण(g())\n', ('ब',)),
+    ]
+    for source, inputs in cases:
+        same(repr(source), compile_program(source).inputs, inputs)
+
+def vector_truth():
+    """Vectors have no truth value, and dividing by one checks every element"""
+    vectors = 'चल अ = गणित.सदिश([१, २, ३])\nचल ब = गणित.सदिश([१, ५, ६])\n'
+    cases = [
+        ('जर अ == ब {\n    मुद्रण("समान")\n}\n', '', 'सदिशाचे सत्यमूल्य संदिग्ध आहे'),
+        ('जर अ != ब {\n    मुद्रण("वेगळे")\n}\n', '', 'सदिशाचे सत्यमूल्य संदिग्ध आहे'),
+        ('मुद्रण(नाही अ)\n', '', 'सदिशाचे सत्यमूल्य संदिग्ध आहे'),
+        ('मुद्रण(गणित.बेरीज(अ == ब) == लांबी(अ))\n', 'False\n', None),
+        ('मुद्रण(६ / अ)\n', 'सदिश([6.0, 3.0, 2.0])\n', None),
+        ('मुद्रण(अ / (ब - १))\n', '', 'Division by zero'),
+    ]
+    for engine, evaluator_class in ENGINES.items():
+        for source, expected_output, expected_error in cases:
+            evaluator = evaluator_class()
+            load_stdlib(evaluator)
+            output, error = run(vectors + source, evaluator)
+            message = str(error).split(';')[0] if error is not None else None
+            same(f'{engine} {source.splitlines()[0]!r}', (output, message), (expected_output, expected_error))
+
+def coverage_counts():
+    """Memoized calls do not hide the lines of their body from --coverage"""
+    repl = MarathiREPL(use_cache=False, coverage=True)
+    with contextlib.redirect_stdout(io.StringIO()):
+        repl.execute_file(os.path.join(ROOT, 'examples', 'fibonacci.mr'))
+    same('fibonacci.mr lines 2, 3 and 5', [repl.coverage.hits[line] for line in (2, 3, 5)], [67, 34, 33])
+
+CHECKS = {
+    'expression-nesting': expression_nesting,
+    'program-inputs': program_inputs,
+    'vector-truth': vector_truth,
+    'coverage-counts': coverage_counts,
+}
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('checks', nargs='*', metavar='CHECK',
+                            help=f'checks to run: {", ".join(CHECKS)} (default: all)')
+    args = arg_parser.parse_args()
+    unknown = [name for name in args.checks if name not in CHECKS]
+    if unknown:
+        arg_parser.error(f'unknown check {unknown[0]!r} (choose from {", ".join(CHECKS)})')
+
+    failed = False
+    for name in args.checks or CHECKS:
+        try:
+            CHECKS[name]()
+        except CheckFailed as e:
+            failed = True
+            print(f'{name:<24}FAILED  {e}')
+        else:
+            print(f'{name:<24}ok')
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
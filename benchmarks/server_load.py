@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Server load test - requests per second and latency of the execution server
+सर्व्हर भार चाचणी - अंमलबजावणी सर्व्हरच्या दर सेकंद विनंत्या आणि विलंब
+
+Starts `main.py --serve` (on stdin/stdout, or on a Unix socket with
+--socket) and sends it a program --requests times from --concurrency
+clients, each sending its next request as soon as the last one is done.
+Reports requests per second and the p50/p99 latency, and the same for
+starting `run_marathi.py` once per run as marathi_ide.py used to. Exits
+with status 1 if any run printed something different from the others.
+"""
+
+import io
+import os
+import sys
+import json
+import math
+import time
+import socket
+import argparse
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+MAIN = os.path.join(ROOT, 'main.py')
+RUN = os.path.join(ROOT, 'run_marathi.py')
+ENV = dict(os.environ, PYTHONIOENCODING='utf-8')
+
+class Client:
+    """A JSON-lines connection to the server shared by all load threads"""
+
+    def __init__(self, write, lines):
+        self.write = write
+        self.lock = threading.Lock()
+        # Request id -> [done event, stdout parts, result]
+        self.pending = {}
+        self.next_id = 0
+        self.reader = threading.Thread(target=self.read, args=(lines,), daemon=True)
+        self.reader.start()
+
+    def read(self, lines):
+        for line in lines:
+            message = json.loads(line)
+            entry = self.pending[message['id']]
+            if 'stdout' in message:
+                entry[1].append(message['stdout'])
+            if message.get('done'):
+                entry[2] = message
+                entry[0].set()
+
+    def run(self, source: str) -> tuple:
+        """(stdout, seconds) of running source on the server"""
+        with self.lock:
+            request_id = self.next_id
+            self.next_id += 1
+            entry = self.pending[request_id] = [threading.Event(), [], None]
+            start = time.perf_counter()
+            self.write(json.dumps({'id': request_id, 'source': source}, ensure_ascii=False) + '\n')
+        entry[0].wait()
+        seconds = time.perf_counter() - start
+        del self.pending[request_id]
+        return ''.join(entry[1]), seconds
+
+def start_server(args, directory: str) -> tuple:
+    """(server process, Client)"""
+    command = [sys.executable, MAIN, '--serve', '--workers', str(args.workers), '--max-runs', str(args.max_runs)]
+    if not args.socket:
+        server = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, env=ENV)
+        stdin = io.TextIOWrapper(server.stdin, encoding='utf-8', line_buffering=True)
+        stdout = io.TextIOWrapper(server.stdout, encoding='utf-8')
+        return server, Client(stdin.write, stdout)
+    path = os.path.join(directory, 'server.sock')
+    server = subprocess.Popen(command + ['--socket', path], stdin=subprocess.DEVNULL, env=ENV)
+    while not os.path.exists(path):
+        if server.poll() is not None:
+            sys.exit('the server did not start')
+        time.sleep(0.01)
+    connection = socket.socket(socket.AF_UNIX)
+    connection.connect(path)
+    stream = connection.makefile('rw', encoding='utf-8')
+
+    def write(line: str):
+        stream.write(line)
+        stream.flush()
+
+    return server, Client(write, stream)
+
+def load(run, requests: int, concurrency: int) -> tuple:
+    """(requests per second, latencies, outputs) of calling run() requests times"""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda _: run(), range(requests)))
+    elapsed = time.perf_counter() - start
+    return requests / elapsed, sorted(seconds for _, seconds in results), {output for output, _ in results}
+
+def percentile(latencies: list, fraction: float) -> float:
+    return latencies[min(len(latencies) - 1, max(math.ceil(fraction * len(latencies)) - 1, 0))]
+
+def report(name: str, rate: float, latencies: list):
+    print(f'{name}:')
+    print(f'  {rate:10.1f} requests/s   p50 {percentile(latencies, 0.5) * 1000:8.2f} ms'
+          f'   p99 {percentile(latencies, 0.99) * 1000:8.2f} ms')
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('program', nargs='?', default=os.path.join(ROOT, 'examples', 'fibonacci.mr'),
+                            help='program to run (default: examples/fibonacci.mr)')
+    arg_parser.add_argument('--requests', type=int, default=500, help='runs on the server')
+    arg_parser.add_argument('--concurrency', type=int, default=8, help='requests in flight at once')
+    arg_parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='server worker processes')
+    arg_parser.add_argument('--max-runs', type=int, default=100, help='programs per worker before it is replaced')
+    arg_parser.add_argument('--socket', action='store_true', help='connect over a Unix socket instead of stdin')
+    arg_parser.add_argument('--subprocess-runs', type=int, default=20,
+                            help='runs of run_marathi.py to compare with (0 to skip)')
+    args = arg_parser.parse_args()
+
+    with open(args.program, encoding='utf-8') as f:
+        source = f.read()
+    outputs = set()
+    with tempfile.TemporaryDirectory() as directory:
+        server, client = start_server(args, directory)
+        try:
+            # Let every worker finish starting up
+            load(lambda: client.run(source), args.workers * 2, args.workers)
+            rate, latencies, outputs = load(lambda: client.run(source), args.requests, args.concurrency)
+        finally:
+            if server.stdin:
+                server.stdin.close()
+            else:
+                server.terminate()
+            server.wait()
+        mode = 'socket' if args.socket else 'stdio'
+        report(f'server ({mode}, {args.workers} workers, concurrency {args.concurrency}, '
+               f'{args.requests} requests)', rate, latencies)
+
+        if args.subprocess_runs:
+            path = os.path.join(directory, 'program.mr')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(source)
+
+            def run_subprocess() -> tuple:
+                start = time.perf_counter()
+                result = subprocess.run([sys.executable, RUN, '--no-cache', path], stdin=subprocess.DEVNULL,
+                                        stdout=subprocess.PIPE, env=ENV)
+                return result.stdout.decode('utf-8', 'replace'), time.perf_counter() - start
+
+            rate, latencies, subprocess_outputs = load(run_subprocess, args.subprocess_runs, args.concurrency)
+            report(f'run_marathi.py per run (concurrency {args.concurrency}, '
+                   f'{args.subprocess_runs} requests)', rate, latencies)
+            outputs |= subprocess_outputs
+
+    if len(outputs) != 1:
+        print('DIFFERENT output:\n' + '\n'.join(repr(output) for output in outputs))
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark suite - lexer, parser and evaluator time and memory per workload
+कामगिरी चाचणी संच - प्रत्येक कामासाठी लेक्सर, पार्सर व मूल्यांकनाचा वेळ आणि स्मृती
+
+Runs representative Marathi programs and times MarathiLexer.tokenize,
+MarathiParser.parse and MarathiEvaluator.evaluate separately (best of
+--repeat runs), then runs each phase once more under tracemalloc for its
+peak memory. The results are written as JSON with --output and compared
+with a stored baseline (benchmarks/baseline.json by default): a phase
+whose time or peak memory grew by more than --threshold is a regression
+and the suite exits with status 1, as it does when the baseline was
+recorded at another --scale. Timings depend on the machine, so record a
+baseline with --save-baseline on the machine that compares against it.
+"""
+
+import io
+import os
+import sys
+import json
+import math
+import time
+import argparse
+import platform
+import contextlib
+import tracemalloc
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from interpreter.lexer import MarathiLexer
+from interpreter.parser import MarathiParser
+from interpreter.evaluator import MarathiEvaluator
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+RESULTS_FORMAT = 1
+PHASES = ('tokenize', 'parse', 'evaluate')
+
+def fibonacci(scale: float) -> str:
+    # Each step of n makes about 1.6 times as many calls
+    n = max(20 + round(math.log(scale, 1.618)), 2)
+    return f'''कार्य फिबो(n) {{
+    जर n <= १ {{
+        परत n
+    }}
+    परत फिबो(n - १) + फिबो(n - २)
+}}
+मुद्रण(फिबो({n}))
+'''
+
+def numeric_loops(scale: float) -> str:
+    n = max(int(50000 * scale), 1)
+    return f'''चल i = ०
+चल बेरीज = ०
+चल x = ०.५
+जोपर्यंत i < {n} {{
+    जर i % ३ == ० {{
+        बेरीज = बेरीज + i * २
+    }} नाहीतर {{
+        बेरीज = बेरीज - १
+    }}
+    x = x * ०.९९९ + ०.००१
+    i = i + १
+}}
+मुद्रण(बेरीज, x)
+'''
+
+def lists(scale: float) -> str:
+    n = max(int(3000 * scale), 1)
+    return f'''चल यादी = []
+प्रत्येक i मध्ये श्रेणी({n}) {{
+    यादी = यादी + [i * i % १०१]
+}}
+चल एकूण = ०
+चल मोठे = ०
+प्रत्येक x मध्ये यादी {{
+    एकूण = एकूण + x
+    जर x > ५० {{
+        मोठे = मोठे + १
+    }}
+}}
+मुद्रण(लांबी(यादी), एकूण, मोठे)
+'''
+
+def strings(scale: float) -> str:
+    n = max(int(20000 * scale), 1)
+    return f'''चल मजकूर = ""
+चल i = ०
+जोपर्यंत i < {n} {{
+    जर i % २ == ० {{
+        मजकूर = मजकूर + "अ"
+    }} नाहीतर {{
+        मजकूर = मजकूर + "ब, "
+    }}
+    i = i + १
+}}
+मुद्रण(लांबी(मजकूर))
+'''
+
+def large_source(scale: float) -> str:
+    n = max(int(1000 * scale), 1)
+    parts = []
+    # Names are ASCII: Devanagari letters followed by digits are not one identifier
+    for k in range(n):
+        parts.append(f'''// कार्य क्रमांक {k}
+कार्य kaam{k}(अ, ब) {{
+    चल क = अ * {k % 97} + ब
+    जर क > {k} आणि अ != ब {{
+        क = क - लांबी("शब्द {k}") % ३
+    }}
+    चल यादी = [अ, ब, क, {k}, {k + 1}]
+    परत यादी[{k % 5}] + क % ७
+}}
+चल nikal{k} = kaam{k}({k}, {k % 13})
+''')
+    parts.append(f'मुद्रण(nikal{n - 1})\n')
+    return ''.join(parts)
+
+WORKLOADS = {
+    'fibonacci': fibonacci,
+    'numeric-loops': numeric_loops,
+    'lists': lists,
+    'strings': strings,
+    'large-source': large_source,
+}
+
+def phases(source: str) -> dict:
+    """Callables for each phase; each one runs its phase once"""
+    tokens = MarathiLexer().tokenize(source)
+    program = MarathiParser(print_errors=False).parse(tokens)
+
+    def evaluate():
+        # Memoizing pure functions would skip most of फिबो's calls
+        with contextlib.redirect_stdout(io.StringIO()):
+            MarathiEvaluator(memoize=False).evaluate(program)
+
+    return {
+        'tokenize': lambda: MarathiLexer().tokenize(source),
+        'parse': lambda: MarathiParser(print_errors=False).parse(tokens),
+        'evaluate': evaluate,
+    }
+
+def best_time(run, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def peak_memory(run) -> int:
+    """Most bytes allocated at once by run(), beyond what was already in use"""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        run()
+        return tracemalloc.get_traced_memory()[1] - before
+    finally:
+        tracemalloc.stop()
+
+def run_suite(names: list, scale: float, repeat: int) -> dict:
+    results = {
+        'format': RESULTS_FORMAT,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'scale': scale,
+        'repeat': repeat,
+        'workloads': {},
+    }
+    for name in names:
+        source = WORKLOADS[name](scale)
+        runs = phases(source)
+        workload = results['workloads'][name] = {'source_bytes': len(source.encode('utf-8'))}
+        for phase in PHASES:
+            workload[phase] = {
+                'seconds': best_time(runs[phase], repeat),
+                'peak_bytes': peak_memory(runs[phase]),
+            }
+        print(f'{name}:', file=sys.stderr)
+        for phase in PHASES:
+            print(f'  {phase:<10}{workload[phase]["seconds"] * 1000:10.2f} ms'
+                  f'{workload[phase]["peak_bytes"] / 1e6:10.2f} MB', file=sys.stderr)
+    return results
+
+def compare(results: dict, baseline: dict, threshold: float, min_seconds: float) -> list:
+    """Print each phase against the baseline; return the regressions
+
+    A time only counts as a regression if it also grew by more than
+    min_seconds, so that the noise of very short phases is ignored.
+    """
+    regressions = []
+    print(f'{"workload":<16}{"phase":<10}{"time":>10}{"memory":>10}  (vs baseline, '
+          f'threshold +{threshold:.0%})')
+    for name, workload in results['workloads'].items():
+        old = baseline.get('workloads', {}).get(name)
+        if old is None:
+            print(f'{name:<16}{"":<10}{"new":>10}')
+            continue
+        for phase in PHASES:
+            current, previous = workload[phase], old[phase]
+            time_ratio = current['seconds'] / previous['seconds'] if previous['seconds'] else 1.0
+            memory_ratio = current['peak_bytes'] / previous['peak_bytes'] if previous['peak_bytes'] else 1.0
+            slower = time_ratio > 1 + threshold and current['seconds'] - previous['seconds'] > min_seconds
+            larger = memory_ratio > 1 + threshold
+            flag = '  REGRESSION' if slower or larger else ''
+            print(f'{name:<16}{phase:<10}{time_ratio:>9.2f}x{memory_ratio:>9.2f}x{flag}')
+            if slower:
+                regressions.append(f'{name} {phase}: {time_ratio:.2f}x time')
+            if larger:
+                regressions.append(f'{name} {phase}: {memory_ratio:.2f}x memory')
+    return regressions
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--scale', type=float, default=1.0, help='size of the workloads')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='runs per phase (best is kept)')
+    arg_parser.add_argument('--output', metavar='FILE', help="write the results as JSON ('-' for stdout)")
+    arg_parser.add_argument('--baseline', metavar='FILE', default=BASELINE,
+                            help='results to compare with (default: benchmarks/baseline.json)')
+    arg_parser.add_argument('--threshold', type=float, default=0.25,
+                            help='allowed growth of time or memory, 0.25 = 25%% (default)')
+    arg_parser.add_argument('--min-seconds', type=float, default=0.002,
+                            help='ignore time differences smaller than this')
+    arg_parser.add_argument('--save-baseline', action='store_true',
+                            help='store the results as the baseline instead of comparing')
+    arg_parser.add_argument('workloads', nargs='*', metavar='WORKLOAD',
+                            help=f'workloads to run: {", ".join(WORKLOADS)} (default: all)')
+    args = arg_parser.parse_args()
+    unknown = [name for name in args.workloads if name not in WORKLOADS]
+    if unknown:
+        arg_parser.error(f'unknown workload {unknown[0]!r} (choose from {", ".join(WORKLOADS)})')
+
+    baseline = None
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        # Workloads of another scale do different amounts of work
+        if baseline.get('scale') != args.scale:
+            arg_parser.error(f'{args.baseline} was recorded at --scale {baseline.get("scale")}, '
+                             f'not {args.scale}; compare at that scale or save a new baseline')
+
+    results = run_suite(args.workloads or list(WORKLOADS), args.scale, args.repeat)
+    text = json.dumps(results, indent=2, ensure_ascii=False) + '\n'
+    if args.output == '-':
+        sys.stdout.write(text)
+    elif args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            f.write(text)
+        print(f'baseline saved to {args.baseline}', file=sys.stderr)
+        return
+    if baseline is None:
+        print(f'no baseline at {args.baseline}; record one with --save-baseline', file=sys.stderr)
+        return
+    regressions = compare(results, baseline, args.threshold, args.min_seconds)
+    if regressions:
+        print('regressions:\n  ' + '\n  '.join(regressions), file=sys.stderr)
+    sys.exit(1 if regressions else 0)
+
+if __name__ == '__main__':
+    main()
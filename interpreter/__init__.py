@@ -1 +1,3 @@
 # MarathiLang Interpreter Package
+
+__version__ = '1.0'
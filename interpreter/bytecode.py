@@ -0,0 +1,487 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MarathiLang Bytecode Compiler - Compiles AST into bytecode for the VM
+मराठी भाषा बाइटकोड कंपायलर - AST चे VM साठी बाइटकोडमध्ये रूपांतर
+"""
+
+import operator
+from typing import Any, Dict, List, Optional, Tuple
+
+from .parser import *
+from .evaluator import is_native
+
+# Opcodes. Each instruction is an (opcode, argument) tuple. The VM splits
+# its dispatch on opcode ranges, so the common ones come first.
+LOAD_LOCAL = 0                  # push slots[arg]; an unset slot is looked up in the callers
+LOAD_LOCAL_CONST_BINARY = 1     # arg = (slot, constant, function): push(function(slots[slot], constant))
+CONST = 2                       # push constants[arg]
+BINARY = 3                      # b = pop(); a = pop(); push(arg(a, b))
+LOOKUP_FUNCTION = 4             # push functions[arg]
+CALL = 5                        # call the function below the top arg values with them
+CALL_LOCAL_CONST_BINARY = 6     # arg = (name, slot, constant, function): call name(x op constant)
+RETURN = 7                      # return pop() to the caller
+RETURN_IF_VALUE = 8             # return pop() unless it is शून्य
+STORE_LOCAL = 9                 # slots[arg] = pop()
+STORE_GLOBAL = 10               # STORE_LOCAL in top-level code, which also tracks new globals
+LOCAL_CONST_BINARY_STORE = 11   # arg = (slot, constant, function, slot): x = y op constant
+LOAD_LOCAL_LOCAL_BINARY = 12    # arg = (slot, slot, function)
+LOCAL_CONST_COMPARE_JUMP = 13   # arg = (slot, constant, function, target): jump unless it holds
+LOCAL_CONST_COMPARE_LOOP = 14   # arg = (slot, constant, function, target): jump while it holds
+COMPARE_JUMP_IF_FALSE = 15      # arg = (function, target): b = pop(); a = pop(); if not arg(a, b): jump
+JUMP = 16                       # pc = arg
+FOR_ITER = 17                   # push the iterator's next item, or pop it and jump to arg
+POP_JUMP_IF_FALSE = 18          # if not pop(): pc = arg
+POP = 19
+GET_ITER = 20                   # replace the list (or other iterable) on top with an iterator over it
+DIVIDE = 21                     # a / b, failing on division by zero
+INDEX = 22                      # index = pop(); array = pop(); push(array[index])
+BUILD_LIST = 23                 # push a list of the top arg values
+PRINT = 24                      # print the top arg values
+AND = 25                        # a and b (both operands are evaluated)
+OR = 26                         # a or b (both operands are evaluated)
+NOT = 27
+NEGATE = 28
+UNARY_NONE = 29                 # pop the operand of an unknown unary operator, push शून्य
+DUP = 30
+STORE_CONST_LOCAL = 31          # like STORE_LOCAL, but fails if the name is already defined
+STORE_CONST_GLOBAL = 32         # STORE_CONST_LOCAL in top-level code
+DEFINE_FUNCTION = 33            # functions[constants[arg].name] = constants[arg]
+LOOKUP_NATIVE = 34              # push the builtin or module function (मॉड्यूल.कार्य) named arg
+CALL_NATIVE = 35                # call the Python function below the top arg values with them
+
+OPCODE_NAMES = {value: name for name, value in list(globals().items())
+                if name.isupper() and isinstance(value, int)}
+
+BINARY_OPERATORS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '%': operator.mod,
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '>': operator.gt,
+    '<=': operator.le,
+    '>=': operator.ge,
+}
+OPERATOR_SYMBOLS = {function: symbol for symbol, function in BINARY_OPERATORS.items()}
+COMPARISONS = (operator.eq, operator.ne, operator.lt, operator.gt, operator.le, operator.ge)
+CONSTANT_NODES = (NumberNode, StringNode, BooleanNode, NullNode)
+
+def constant_value(node: ASTNode) -> Any:
+    return None if isinstance(node, NullNode) else node.value
+
+def unknown_operator(symbol: str):
+    def fail(left, right):
+        raise RuntimeError(f"Unknown binary operator: {symbol}")
+    OPERATOR_SYMBOLS[fail] = symbol
+    return fail
+
+# How the value of an if statement is used
+DISCARD = 0         # nested in another statement: परत only ends the branch
+VALUE = 1           # last statement of a program: its value is the result
+FUNCTION = 2        # directly in a function body: a non-null परत returns
+
+class CodeObject:
+    """Bytecode of a program or a function body"""
+
+    def __init__(self, name: str, parameters: List[str]):
+        self.name = name
+        self.parameters = parameters
+        self.instructions: List[Tuple[int, Any]] = []
+        self.constants: List[Any] = []
+        self.constant_index: Dict[tuple, int] = {}
+        # Every variable the code mentions gets a slot; parameters first
+        self.slot_names: List[str] = []
+        self.slot_index: Dict[str, int] = {}
+        for parameter in parameters or ():
+            self.add_slot(parameter)
+        self.parameter_slots = tuple(self.slot_index[parameter] for parameter in parameters or ())
+        # Parameters fill slots 0..n-1 unless a name is repeated
+        self.simple_parameters = self.parameter_slots == tuple(range(len(self.parameter_slots)))
+
+    @property
+    def is_function(self) -> bool:
+        return self.parameters is not None
+
+    def add_constant(self, value: Any) -> int:
+        if isinstance(value, ASTNode):
+            key = (type(value), id(value))
+        elif isinstance(value, float):
+            key = (float, repr(value))     # keep 0.0 and -0.0 apart
+        else:
+            key = (type(value), value)
+        if key not in self.constant_index:
+            self.constant_index[key] = len(self.constants)
+            self.constants.append(value)
+        return self.constant_index[key]
+
+    def add_slot(self, name: str) -> int:
+        if name not in self.slot_index:
+            self.slot_index[name] = len(self.slot_names)
+            self.slot_names.append(name)
+        return self.slot_index[name]
+
+    def emit(self, opcode: int, argument: Any = None) -> int:
+        self.instructions.append((opcode, argument))
+        return len(self.instructions) - 1
+
+    def patch(self, position: int, target: Optional[int] = None):
+        """Point the jump at `position` to `target` (default: the next instruction)"""
+        opcode, argument = self.instructions[position]
+        if target is None:
+            target = len(self.instructions)
+        if opcode in (COMPARE_JUMP_IF_FALSE, LOCAL_CONST_COMPARE_JUMP, LOCAL_CONST_COMPARE_LOOP):
+            argument = argument[:-1] + (target,)
+        else:
+            argument = target
+        self.instructions[position] = (opcode, argument)
+
+class BytecodeCompiler:
+    """Compiles ProgramNode and FunctionDefNode into CodeObjects
+
+    The bytecode keeps every rule of MarathiEvaluator. A function body
+    runs in a copy of its caller's variables, so a name it reads but has
+    not assigned yet is looked up in the caller's frame, and so on up to
+    the globals. The VM does that lookup once per call and caches the
+    value in the slot, which is exact because a caller cannot change
+    while its callee runs. Top-level code uses slots as well; the VM
+    fills them from the global variables and writes them back when the
+    program ends.
+    """
+
+    def __init__(self):
+        self.code: Optional[CodeObject] = None
+        self.statement_rules = {
+            AssignmentNode: self.assignment,
+            PrintNode: self.print_statement,
+            IfNode: self.if_statement,
+            WhileNode: self.while_statement,
+            ForEachNode: self.for_each_statement,
+            FunctionDefNode: self.function_definition,
+            ReturnNode: self.return_statement,
+        }
+        self.expression_rules = {
+            NumberNode: self.constant,
+            StringNode: self.constant,
+            BooleanNode: self.constant,
+            NullNode: self.constant,
+            IdentifierNode: self.identifier,
+            BinaryOpNode: self.binary,
+            UnaryOpNode: self.unary,
+            ArrayNode: self.array,
+            IndexNode: self.index,
+            FunctionCallNode: self.function_call,
+            # Statements used as expressions
+            AssignmentNode: self.assignment_value,
+            PrintNode: self.statement_value,
+            WhileNode: self.statement_value,
+            ForEachNode: self.statement_value,
+            FunctionDefNode: self.statement_value,
+            ReturnNode: self.return_value,
+            IfNode: self.if_value,
+        }
+
+    def compile_program(self, program: ProgramNode) -> CodeObject:
+        """Compile a program; running it returns the value of its last statement"""
+        code = self.code = CodeObject('<कार्यक्रम>', None)
+        statements = program.statements
+        for statement in statements[:-1]:
+            self.statement(statement)
+        if statements:
+            self.expression(statements[-1])
+        else:
+            code.emit(CONST, code.add_constant(None))
+        code.emit(RETURN)
+        return code
+
+    def compile_function(self, function: FunctionDefNode) -> CodeObject:
+        """Compile a function body: it ends at its first top-level परत, or at
+        an if statement that returns a value other than शून्य"""
+        saved = self.code
+        code = self.code = CodeObject(function.name, list(function.parameters))
+        try:
+            for statement in function.body:
+                if isinstance(statement, ReturnNode):
+                    self.return_value(statement)
+                    break
+                if isinstance(statement, IfNode):
+                    self.if_statement(statement, FUNCTION)
+                else:
+                    self.statement(statement)
+            else:
+                code.emit(CONST, code.add_constant(None))
+            code.emit(RETURN)
+        finally:
+            self.code = saved
+        return code
+
+    # Statements: leave the stack as they found it
+    def statement(self, node: ASTNode):
+        rule = self.statement_rules.get(type(node))
+        if rule is not None:
+            rule(node)
+        elif type(node) in self.expression_rules:
+            self.expression(node)
+            self.code.emit(POP)
+        # Other nodes (BreakNode, ContinueNode) do nothing, as in the tree walker
+
+    def block(self, statements: List[ASTNode]):
+        for statement in statements:
+            self.statement(statement)
+
+    def assignment(self, node: AssignmentNode):
+        value = node.value
+        if not node.is_constant and isinstance(value, BinaryOpNode) \
+                and isinstance(value.left, IdentifierNode) and isinstance(value.right, CONSTANT_NODES) \
+                and value.operator in BINARY_OPERATORS:
+            # Counter updates such as `i = i + 1` take one instruction
+            code = self.code
+            code.emit(LOCAL_CONST_BINARY_STORE, (code.add_slot(value.left.name), constant_value(value.right),
+                                                 BINARY_OPERATORS[value.operator], code.add_slot(node.name)))
+            return
+        self.expression(value)
+        self.store(node.name, node.is_constant)
+
+    def store(self, name: str, is_constant: bool):
+        code = self.code
+        if code.is_function:
+            code.emit(STORE_CONST_LOCAL if is_constant else STORE_LOCAL, code.add_slot(name))
+        else:
+            code.emit(STORE_CONST_GLOBAL if is_constant else STORE_GLOBAL, code.add_slot(name))
+
+    def print_statement(self, node: PrintNode):
+        for argument in node.arguments:
+            self.expression(argument)
+        self.code.emit(PRINT, len(node.arguments))
+
+    def if_statement(self, node: IfNode, mode: int = DISCARD):
+        code = self.code
+        jump_to_else = self.condition_jump(node.condition)
+        self.branch(node.then_branch, mode)
+        if node.else_branch or mode == VALUE:
+            jump_to_end = code.emit(JUMP)
+            code.patch(jump_to_else)
+            if node.else_branch:
+                self.branch(node.else_branch, mode)
+            else:
+                code.emit(CONST, code.add_constant(None))
+            code.patch(jump_to_end)
+        else:
+            code.patch(jump_to_else)
+
+    def branch(self, statements: List[ASTNode], mode: int):
+        """Compile an if branch: it ends at its first परत"""
+        code = self.code
+        for statement in statements:
+            if isinstance(statement, ReturnNode):
+                self.return_value(statement)
+                if mode == DISCARD:
+                    code.emit(POP)
+                elif mode == FUNCTION:
+                    code.emit(RETURN_IF_VALUE)
+                return
+            self.statement(statement)
+        if mode == VALUE:
+            code.emit(CONST, code.add_constant(None))
+
+    def condition_jump(self, condition: ASTNode) -> int:
+        """Compile a condition and a jump taken when it is false; returns the jump"""
+        if isinstance(condition, BinaryOpNode) and BINARY_OPERATORS.get(condition.operator) in COMPARISONS:
+            function = BINARY_OPERATORS[condition.operator]
+            if isinstance(condition.left, IdentifierNode) and isinstance(condition.right, CONSTANT_NODES):
+                slot = self.code.add_slot(condition.left.name)
+                return self.code.emit(LOCAL_CONST_COMPARE_JUMP, (slot, constant_value(condition.right), function, None))
+            self.expression(condition.left)
+            self.expression(condition.right)
+            return self.code.emit(COMPARE_JUMP_IF_FALSE, (function, None))
+        self.expression(condition)
+        return self.code.emit(POP_JUMP_IF_FALSE)
+
+    def while_statement(self, node: WhileNode):
+        code = self.code
+        start = len(code.instructions)
+        exit_jump = self.condition_jump(node.condition)
+        self.block(node.body)
+        opcode, argument = code.instructions[exit_jump]
+        if opcode == LOCAL_CONST_COMPARE_JUMP:
+            # Test again at the bottom, saving a jump per iteration
+            code.emit(LOCAL_CONST_COMPARE_LOOP, argument[:-1] + (exit_jump + 1,))
+        else:
+            code.emit(JUMP, start)
+        code.patch(exit_jump)
+
+    def for_each_statement(self, node: ForEachNode):
+        code = self.code
+        self.expression(node.iterable)
+        code.emit(GET_ITER)
+        start = code.emit(FOR_ITER)
+        self.store(node.variable, False)
+        self.block(node.body)
+        code.emit(JUMP, start)
+        code.patch(start)
+
+    def function_definition(self, node: FunctionDefNode):
+        self.code.emit(DEFINE_FUNCTION, self.code.add_constant(node))
+
+    def return_statement(self, node: ReturnNode):
+        # Outside a function body and an if branch, परत only evaluates its value
+        if node.value:
+            self.expression(node.value)
+            self.code.emit(POP)
+
+    # Expressions: push one value
+    def expression(self, node: ASTNode):
+        rule = self.expression_rules.get(type(node))
+        if rule is None:
+            self.code.emit(CONST, self.code.add_constant(None))
+        else:
+            rule(node)
+
+    def constant(self, node: ASTNode):
+        self.code.emit(CONST, self.code.add_constant(constant_value(node)))
+
+    def identifier(self, node: IdentifierNode):
+        self.code.emit(LOAD_LOCAL, self.code.add_slot(node.name))
+
+    def binary(self, node: BinaryOpNode):
+        code = self.code
+        function = BINARY_OPERATORS.get(node.operator)
+        left, right = node.left, node.right
+
+        if function is not None and isinstance(left, IdentifierNode):
+            slot = code.add_slot(left.name)
+            if isinstance(right, CONSTANT_NODES):
+                code.emit(LOAD_LOCAL_CONST_BINARY, (slot, constant_value(right), function))
+                return
+            if isinstance(right, IdentifierNode):
+                code.emit(LOAD_LOCAL_LOCAL_BINARY, (slot, code.add_slot(right.name), function))
+                return
+
+        self.expression(left)
+        self.expression(right)
+        if function is not None:
+            code.emit(BINARY, function)
+        elif node.operator == '/':
+            code.emit(DIVIDE)
+        elif node.operator == 'आणि':
+            code.emit(AND)
+        elif node.operator == 'किंवा':
+            code.emit(OR)
+        else:
+            code.emit(BINARY, unknown_operator(node.operator))
+
+    def unary(self, node: UnaryOpNode):
+        self.expression(node.operand)
+        if node.operator == 'नाही':
+            self.code.emit(NOT)
+        elif node.operator == '-':
+            self.code.emit(NEGATE)
+        else:
+            self.code.emit(UNARY_NONE)
+
+    def array(self, node: ArrayNode):
+        for element in node.elements:
+            self.expression(element)
+        self.code.emit(BUILD_LIST, len(node.elements))
+
+    def index(self, node: IndexNode):
+        self.expression(node.array)
+        self.expression(node.index)
+        self.code.emit(INDEX)
+
+    def function_call(self, node: FunctionCallNode):
+        code = self.code
+        native = is_native(node.name)
+        if len(node.arguments) == 1 and not native:
+            argument = node.arguments[0]
+            if isinstance(argument, BinaryOpNode) and argument.operator in BINARY_OPERATORS \
+                    and isinstance(argument.left, IdentifierNode) and isinstance(argument.right, CONSTANT_NODES):
+                # Recursive calls such as फिबो(n - १) take one instruction
+                code.emit(CALL_LOCAL_CONST_BINARY, (node.name, code.add_slot(argument.left.name),
+                                                    constant_value(argument.right),
+                                                    BINARY_OPERATORS[argument.operator]))
+                return
+        # The function is looked up before its arguments are evaluated
+        code.emit(LOOKUP_NATIVE if native else LOOKUP_FUNCTION, node.name)
+        for argument in node.arguments:
+            self.expression(argument)
+        code.emit(CALL_NATIVE if native else CALL, len(node.arguments))
+
+    def assignment_value(self, node: AssignmentNode):
+        self.expression(node.value)
+        self.code.emit(DUP)
+        self.store(node.name, node.is_constant)
+
+    def statement_value(self, node: ASTNode):
+        self.statement_rules[type(node)](node)
+        self.code.emit(CONST, self.code.add_constant(None))
+
+    def return_value(self, node: ReturnNode):
+        if node.value:
+            self.expression(node.value)
+        else:
+            self.code.emit(CONST, self.code.add_constant(None))
+
+    def if_value(self, node: IfNode):
+        self.if_statement(node, VALUE)
+
+def format_argument(code: CodeObject, opcode: int, argument: Any) -> str:
+    if argument is None:
+        return ''
+    if opcode == CONST:
+        value = code.constants[argument]
+        if isinstance(value, FunctionDefNode):
+            return f'{argument} (<कार्य {value.name}>)'
+        return f'{argument} ({value!r})'
+    if opcode in (LOAD_LOCAL, STORE_LOCAL, STORE_CONST_LOCAL, STORE_GLOBAL, STORE_CONST_GLOBAL):
+        return f'{argument} ({code.slot_names[argument]})'
+    if opcode == DEFINE_FUNCTION:
+        return f'{argument} ({code.constants[argument].name})'
+    if opcode == BINARY:
+        return OPERATOR_SYMBOLS[argument]
+    if opcode == LOAD_LOCAL_CONST_BINARY:
+        slot, value, function = argument
+        return f'{code.slot_names[slot]} {OPERATOR_SYMBOLS[function]} {value!r}'
+    if opcode == LOAD_LOCAL_LOCAL_BINARY:
+        slot, other, function = argument
+        return f'{code.slot_names[slot]} {OPERATOR_SYMBOLS[function]} {code.slot_names[other]}'
+    if opcode == COMPARE_JUMP_IF_FALSE:
+        function, target = argument
+        return f'{OPERATOR_SYMBOLS[function]} -> {target}'
+    if opcode == LOCAL_CONST_COMPARE_JUMP or opcode == LOCAL_CONST_COMPARE_LOOP:
+        slot, value, function, target = argument
+        return f'{code.slot_names[slot]} {OPERATOR_SYMBOLS[function]} {value!r} -> {target}'
+    if opcode == CALL_LOCAL_CONST_BINARY:
+        name, slot, value, function = argument
+        return f'{name}({code.slot_names[slot]} {OPERATOR_SYMBOLS[function]} {value!r})'
+    if opcode == LOCAL_CONST_BINARY_STORE:
+        slot, value, function, target = argument
+        return f'{code.slot_names[target]} = {code.slot_names[slot]} {OPERATOR_SYMBOLS[function]} {value!r}'
+    if opcode in (JUMP, POP_JUMP_IF_FALSE, FOR_ITER):
+        return f'-> {argument}'
+    return str(argument)
+
+def disassemble(code: CodeObject) -> str:
+    """Return a readable listing of a code object and the functions it defines"""
+    if code.is_function:
+        lines = [f'कार्य {code.name}({", ".join(code.parameters)})  slots: {", ".join(code.slot_names)}']
+    else:
+        lines = [code.name]
+    jump_targets = set()
+    for opcode, argument in code.instructions:
+        if opcode in (JUMP, POP_JUMP_IF_FALSE, FOR_ITER):
+            jump_targets.add(argument)
+        elif opcode in (COMPARE_JUMP_IF_FALSE, LOCAL_CONST_COMPARE_JUMP, LOCAL_CONST_COMPARE_LOOP):
+            jump_targets.add(argument[-1])
+    for offset, (opcode, argument) in enumerate(code.instructions):
+        marker = '>>' if offset in jump_targets else '  '
+        lines.append(f'{marker}{offset:5}  {OPCODE_NAMES[opcode]:<26}{format_argument(code, opcode, argument)}')
+
+    compiler = BytecodeCompiler()
+    for value in code.constants:
+        if isinstance(value, FunctionDefNode):
+            lines.append('')
+            lines.append(disassemble(compiler.compile_function(value)))
+    return '\n'.join(lines)
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MarathiLang AST Cache - Stores parsed programs as .mrc files
+मराठी भाषा AST कॅशे - पार्स केलेले प्रोग्राम .mrc फाइलमध्ये साठवतो
+"""
+
+import os
+import hashlib
+import marshal
+from functools import lru_cache
+from dataclasses import fields
+from typing import Any, List, Optional, Tuple
+
+from . import __version__
+from .lexer import MarathiLexer
+from .parser import *
+
+# Bump when the AST classes or the encoding below change
+CACHE_FORMAT = 2
+CACHE_MAGIC = b'MRC\x00'
+CACHE_DIR_NAME = '__marathicache__'
+
+# Node classes in encoding order; a node is stored as (index, *field values)
+NODE_TYPES = [
+    NumberNode, StringNode, BooleanNode, NullNode, IdentifierNode,
+    BinaryOpNode, UnaryOpNode, AssignmentNode, FunctionDefNode,
+    FunctionCallNode, IfNode, WhileNode, ForEachNode, ReturnNode,
+    PrintNode, ArrayNode, IndexNode, BreakNode, ContinueNode, ProgramNode,
+]
+NODE_CODES = {node_type: code for code, node_type in enumerate(NODE_TYPES)}
+NODE_FIELDS = [tuple(field.name for field in fields(node_type)) for node_type in NODE_TYPES]
+
+def encode_node(value: Any) -> Any:
+    """Convert an AST into nested tuples/lists that marshal can store"""
+    if isinstance(value, ASTNode):
+        code = NODE_CODES[type(value)]
+        return (code,) + tuple(encode_node(getattr(value, name)) for name in NODE_FIELDS[code])
+    if isinstance(value, list):
+        return [encode_node(item) for item in value]
+    return value
+
+def decode_node(value: Any) -> Any:
+    """Rebuild an AST from the output of encode_node"""
+    if isinstance(value, tuple):
+        return NODE_TYPES[value[0]](*[decode_node(item) for item in value[1:]])
+    if isinstance(value, list):
+        return [decode_node(item) for item in value]
+    return value
+
+@lru_cache(maxsize=None)
+def grammar_fingerprint() -> str:
+    """Hash of what decides the AST a source parses to
+
+    Covers the lexer's keywords and patterns, the token types, the
+    operator binding powers, the node fields and GRAMMAR_VERSION, so that
+    entries written before the language gained a keyword or an operator
+    are never replayed.
+    """
+    lexer = MarathiLexer()
+    grammar = (
+        GRAMMAR_VERSION,
+        [token_type.name for token_type in TokenType],
+        sorted((word, token_type.name) for word, token_type in lexer.keywords.items()),
+        lexer.token_patterns,
+        sorted((token_type.name, power) for token_type, power in INFIX_POWERS.items()),
+        UNARY_POWER,
+        NODE_FIELDS,
+    )
+    return hashlib.sha256(repr(grammar).encode('utf-8')).hexdigest()
+
+def source_digest(path: str) -> bytes:
+    """Hash a source file together with the interpreter, grammar and cache versions"""
+    digest = hashlib.sha256(f'{__version__}:{grammar_fingerprint()}:{CACHE_FORMAT}:'.encode('utf-8'))
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.digest()
+
+class ASTCache:
+    """Reads and writes .mrc files keyed by a source digest
+
+    By default the cache lives in a __marathicache__ directory next to each
+    source file; pass cache_dir to keep every entry in one place instead.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = cache_dir
+
+    def cache_path(self, source_path: str) -> str:
+        source_path = os.path.abspath(source_path)
+        stem = os.path.splitext(os.path.basename(source_path))[0]
+        if self.cache_dir:
+            # Distinguish same-named scripts from different directories
+            tag = hashlib.sha1(source_path.encode('utf-8')).hexdigest()[:12]
+            return os.path.join(self.cache_dir, f'{stem}.{tag}.mrc')
+        return os.path.join(os.path.dirname(source_path), CACHE_DIR_NAME, f'{stem}.mrc')
+
+    def load(self, source_path: str, digest: bytes) -> Optional[Tuple[ProgramNode, List[str]]]:
+        """Return (program, syntax errors) if a cache entry matches digest"""
+        try:
+            with open(self.cache_path(source_path), 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+
+        header = CACHE_MAGIC + digest
+        if not data.startswith(header):
+            return None
+        try:
+            errors, program = marshal.loads(data[len(header):])
+            return decode_node(program), errors
+        except (EOFError, ValueError, TypeError, IndexError):
+            return None
+
+    def store(self, source_path: str, digest: bytes, program: ProgramNode, errors: List[str]):
+        """Write a cache entry; failures (read-only directories etc.) are ignored"""
+        path = self.cache_path(source_path)
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(temp_path, 'wb') as f:
+                f.write(CACHE_MAGIC + digest)
+                f.write(marshal.dumps((errors, encode_node(program))))
+            os.replace(temp_path, path)
+        except (OSError, ValueError, RecursionError):
+            # Too deeply nested ASTs are not cached; marshal refuses them anyway
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+    def compile_file(self, source_path: str, lexer: Any, parser: MarathiParser,
+                     rebuild: bool = False) -> ProgramNode:
+        """Return the program for a source file, parsing it only on a cache miss"""
+        digest = source_digest(source_path)
+        if not rebuild:
+            cached = self.load(source_path, digest)
+            if cached is not None:
+                program, errors = cached
+                # Report syntax errors exactly as the parser did when it ran
+                for message in errors:
+                    print(message)
+                return program
+
+        with open(source_path, 'r', encoding='utf-8') as f:
+            program = parser.parse(lexer.iter_tokens(f))
+        self.store(source_path, digest, program, parser.errors)
+        return program
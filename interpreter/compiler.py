@@ -0,0 +1,519 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MarathiLang Closure Compiler - Turns AST nodes into Python closures
+मराठी भाषा क्लोजर कंपायलर - AST नोड्सचे Python फंक्शन्समध्ये रूपांतर
+"""
+
+import math
+import operator
+from typing import Any, Callable, Dict, List
+
+from .parser import *
+from .evaluator import MarathiEvaluator, is_native, native_function, print_values
+from .feedback import SPECIALIZABLE, FeedbackTable, FusedExpression, counting_loop, fused_factory
+from .scope import collect_names
+from .storage import LIST_TYPES, make_list
+from .sequences import loop_items
+from .vector import zero_divisor
+
+# A compiled node: called with the variables dict it runs in
+Code = Callable[[Dict[str, Any]], Any]
+
+BINARY_OPERATORS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '%': operator.mod,
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '>': operator.gt,
+    '<=': operator.le,
+    '>=': operator.ge,
+}
+
+CONSTANT_NODES = (NumberNode, StringNode, BooleanNode, NullNode)
+
+def constant_value(node: ASTNode) -> Any:
+    return None if isinstance(node, NullNode) else node.value
+
+def undefined_variable(name: str) -> RuntimeError:
+    return RuntimeError(f"Undefined variable '{name}'")
+
+def no_operation(variables: Dict[str, Any]) -> None:
+    return None
+
+class ClosureCompiler:
+    """Compiles each AST node once into a closure that does that node's work
+
+    The closures behave exactly like MarathiEvaluator.evaluate, including
+    its scoping: a function call runs in a copy of the caller's variables,
+    so nothing the function assigns is visible after it returns. Instead
+    of swapping evaluator.variables, the current variables dict is passed
+    to every closure as its only argument.
+    """
+
+    def __init__(self, evaluator: MarathiEvaluator, specialize: bool = True):
+        self.functions = evaluator.functions
+        self.modules = evaluator.modules
+        # id(FunctionDefNode) -> (node, compiled function)
+        self.function_code: Dict[int, tuple] = {}
+        # Operand types seen by each operator, or None to compile generically
+        self.feedback = FeedbackTable() if specialize else None
+        # Closures compiled so far that depend on type feedback
+        self.feedback_sites = 0
+        self.rules = {
+            ProgramNode: self.program,
+            NumberNode: self.constant,
+            StringNode: self.constant,
+            BooleanNode: self.constant,
+            NullNode: self.constant,
+            IdentifierNode: self.identifier,
+            AssignmentNode: self.assignment,
+            ArrayNode: self.array,
+            IndexNode: self.index,
+            BinaryOpNode: self.binary,
+            UnaryOpNode: self.unary,
+            PrintNode: self.print_statement,
+            IfNode: self.if_statement,
+            WhileNode: self.while_statement,
+            ForEachNode: self.for_each_statement,
+            FunctionDefNode: self.function_definition,
+            FunctionCallNode: self.function_call,
+            ReturnNode: self.return_statement,
+        }
+
+    def compile(self, node: ASTNode) -> Code:
+        rule = self.rules.get(type(node))
+        if rule is None:
+            # Like the tree walker, other nodes (BreakNode, ContinueNode) do nothing
+            return no_operation
+        return rule(node)
+
+    def compile_all(self, nodes: List[ASTNode]) -> tuple:
+        return tuple(self.compile(node) for node in nodes)
+
+    def program(self, node: ProgramNode) -> Code:
+        statements = self.compile_all(node.statements)
+
+        def run_program(variables):
+            result = None
+            for statement in statements:
+                result = statement(variables)
+            return result
+        return run_program
+
+    def constant(self, node: ASTNode) -> Code:
+        value = constant_value(node)
+        return lambda variables: value
+
+    def identifier(self, node: IdentifierNode) -> Code:
+        name = node.name
+
+        def load(variables):
+            try:
+                return variables[name]
+            except KeyError:
+                raise undefined_variable(name) from None
+        return load
+
+    def assignment(self, node: AssignmentNode) -> Code:
+        name = node.name
+        if self.feedback is not None and not node.is_constant and isinstance(node.value, BinaryOpNode):
+            fused = self.fuse(node, node.value, name, 1)
+            if fused is not None:
+                return fused
+        value = self.compile(node.value)
+
+        if node.is_constant:
+            def assign_constant(variables):
+                result = value(variables)
+                if name in variables:
+                    raise RuntimeError(f"Cannot reassign constant '{name}'")
+                variables[name] = result
+                return result
+            return assign_constant
+
+        def assign(variables):
+            result = value(variables)
+            variables[name] = result
+            return result
+        return assign
+
+    def array(self, node: ArrayNode) -> Code:
+        elements = self.compile_all(node.elements)
+        return lambda variables: make_list([element(variables) for element in elements])
+
+    def index(self, node: IndexNode) -> Code:
+        array_code = self.compile(node.array)
+        index_code = self.compile(node.index)
+
+        def load_item(variables):
+            array = array_code(variables)
+            index = index_code(variables)
+            if not isinstance(array, LIST_TYPES):
+                raise RuntimeError(f"Indexing non-array type")
+            if not isinstance(index, int):
+                raise RuntimeError(f"Array index must be an integer")
+            if index < 0 or index >= len(array):
+                raise RuntimeError(f"Array index out of bounds")
+            return array[index]
+        return load_item
+
+    def binary(self, node: BinaryOpNode) -> Code:
+        operator_name = node.operator
+        if self.feedback is not None and operator_name in SPECIALIZABLE:
+            fused = self.fuse(node, node, None, 2)
+            if fused is not None:
+                return fused
+        left = self.compile(node.left)
+        right = self.compile(node.right)
+
+        # Both operands are always evaluated, left first, as in the tree walker
+        if operator_name == '/':
+            def divide(variables):
+                dividend = left(variables)
+                divisor = right(variables)
+                if zero_divisor(divisor):
+                    raise RuntimeError("Division by zero")
+                return dividend / divisor
+            return divide
+        if operator_name == 'आणि':
+            def both(variables):
+                first = left(variables)
+                second = right(variables)
+                return first and second
+            return both
+        if operator_name == 'किंवा':
+            def either(variables):
+                first = left(variables)
+                second = right(variables)
+                return first or second
+            return either
+
+        function = BINARY_OPERATORS.get(operator_name)
+        if function is None:
+            def unknown(variables):
+                left(variables)
+                right(variables)
+                raise RuntimeError(f"Unknown binary operator: {operator_name}")
+            return unknown
+
+        if self.feedback is not None and operator_name in SPECIALIZABLE:
+            feedback = self.feedback.site(node)
+            if feedback.warming():
+                return self.observe(feedback, function, left, right)
+
+        # Specialize the common `name op constant` and `name op name` shapes
+        if isinstance(node.left, IdentifierNode):
+            name = node.left.name
+            if isinstance(node.right, CONSTANT_NODES):
+                constant = constant_value(node.right)
+
+                def name_constant(variables):
+                    try:
+                        value = variables[name]
+                    except KeyError:
+                        raise undefined_variable(name) from None
+                    return function(value, constant)
+                return name_constant
+
+            if isinstance(node.right, IdentifierNode):
+                other = node.right.name
+
+                def name_name(variables):
+                    try:
+                        value = variables[name]
+                    except KeyError:
+                        raise undefined_variable(name) from None
+                    try:
+                        other_value = variables[other]
+                    except KeyError:
+                        raise undefined_variable(other) from None
+                    return function(value, other_value)
+                return name_name
+
+        if isinstance(node.right, CONSTANT_NODES):
+            constant = constant_value(node.right)
+            return lambda variables: function(left(variables), constant)
+
+        return lambda variables: function(left(variables), right(variables))
+
+    def observe(self, feedback: Any, function: Callable[[Any, Any], Any], left: Code, right: Code) -> Code:
+        """Compile an operator that records its operand types while computing its result"""
+        table = self.feedback
+        self.feedback_sites += 1
+
+        def observe(variables):
+            left_value = left(variables)
+            right_value = right(variables)
+            result = function(left_value, right_value)
+            if feedback.warming():
+                table.observe(feedback, left_value, right_value)
+            return result
+        return observe
+
+    def fuse(self, node: ASTNode, expression: BinaryOpNode, target: Any, minimum: int) -> Any:
+        """Compile node as one fused Python function if type feedback allows, else return None
+
+        node is the expression itself, or an assignment of it to target.
+        The expression must have at least `minimum` operators.
+        """
+        table = self.feedback
+        fused = FusedExpression(expression, table)
+        if fused.source is None or len(fused.sites) < minimum:
+            return None
+        self.feedback_sites += 1
+        table.fused.add(id(expression))
+        generic = self.compile_generic(node)
+        return fused_factory(fused.function_source(target))(generic, table.guard_failure(fused.sites, generic))
+
+    def compile_generic(self, node: ASTNode) -> Code:
+        """Compile node without using type feedback"""
+        feedback = self.feedback
+        self.feedback = None
+        try:
+            return self.compile(node)
+        finally:
+            self.feedback = feedback
+
+    def unary(self, node: UnaryOpNode) -> Code:
+        operand = self.compile(node.operand)
+        if node.operator == 'नाही':
+            return lambda variables: not operand(variables)
+        if node.operator == '-':
+            return lambda variables: -operand(variables)
+
+        def ignore(variables):
+            operand(variables)
+        return ignore
+
+    def print_statement(self, node: PrintNode) -> Code:
+        arguments = self.compile_all(node.arguments)
+
+        def run_print(variables):
+            print_values([argument(variables) for argument in arguments])
+        return run_print
+
+    def branch(self, statements: List[ASTNode]) -> Code:
+        """Compile an if branch: it ends at its first परत, whose value it returns"""
+        for position, statement in enumerate(statements):
+            if isinstance(statement, ReturnNode):
+                steps = self.compile_all(statements[:position])
+                result = self.compile(statement)
+                break
+        else:
+            steps = self.compile_all(statements)
+            result = no_operation
+
+        def run_branch(variables):
+            for step in steps:
+                step(variables)
+            return result(variables)
+        return run_branch
+
+    def if_statement(self, node: IfNode) -> Code:
+        condition = self.compile(node.condition)
+        then_branch = self.branch(node.then_branch)
+        else_branch = self.branch(node.else_branch) if node.else_branch else no_operation
+
+        def run_if(variables):
+            if condition(variables):
+                return then_branch(variables)
+            return else_branch(variables)
+        return run_if
+
+    def while_statement(self, node: WhileNode) -> Code:
+        sites = self.feedback_sites
+        condition = self.compile(node.condition)
+        body = self.compile_all(node.body)
+
+        if self.feedback is None:
+            def run_while(variables):
+                while condition(variables):
+                    for statement in body:
+                        statement(variables)
+            return run_while
+
+        # Compile the loop again whenever type feedback changes
+        table = self.feedback
+        version = table.version
+        adaptive = self.feedback_sites != sites
+
+        def run_while(variables):
+            nonlocal condition, body, version
+            while condition(variables):
+                for statement in body:
+                    statement(variables)
+                if adaptive and table.version != version:
+                    version = table.version
+                    condition = self.compile(node.condition)
+                    body = self.compile_all(node.body)
+
+        assigned: Dict[str, None] = {}
+        collect_names(node.body[:-1], assigned, {})
+        shape = counting_loop(node, assigned)
+        if shape is None:
+            return run_while
+        return self.counting_loop(node, shape, run_while)
+
+    def counting_loop(self, node: WhileNode, shape: tuple, run_while: Code) -> Code:
+        """Compile `जोपर्यंत i <= n { ...; i = i + १ }` into a Python while loop
+
+        The counter lives in a Python variable and is copied into the
+        variables after every step. The loop runs as an ordinary while
+        loop unless the counter is an int and the limit an int or a
+        finite float when it starts; neither can change while it runs.
+        """
+        name, inclusive, limit, step = shape
+        table = self.feedback
+        version = table.version
+        sites = self.feedback_sites
+        body = self.compile_all(node.body[:-1])
+        adaptive = self.feedback_sites != sites
+        limit_name = limit.name if isinstance(limit, IdentifierNode) else None
+        limit_value = None if limit_name else limit.value
+
+        def run_counting(variables):
+            nonlocal body, version
+            counter = variables.get(name)
+            bound = variables.get(limit_name) if limit_name else limit_value
+            if type(counter) is not int or not (type(bound) is int or
+                                                 type(bound) is float and math.isfinite(bound)):
+                return run_while(variables)
+            # For an int counter, `counter <= bound` is `counter < floor(bound) + 1`
+            end = math.floor(bound) + 1 if inclusive else math.ceil(bound)
+            while counter < end:
+                for statement in body:
+                    statement(variables)
+                counter += step
+                variables[name] = counter
+                if adaptive and table.version != version:
+                    version = table.version
+                    body = self.compile_all(node.body[:-1])
+        return run_counting
+
+    def for_each_statement(self, node: ForEachNode) -> Code:
+        name = node.variable
+        iterable_code = self.compile(node.iterable)
+        body = self.compile_all(node.body)
+
+        def run_for_each(variables):
+            iterable = iterable_code(variables)
+            if not isinstance(iterable, LIST_TYPES):
+                iterable = loop_items(iterable)
+            for element in iterable:
+                variables[name] = element
+                for statement in body:
+                    statement(variables)
+        return run_for_each
+
+    def function_definition(self, node: FunctionDefNode) -> Code:
+        functions = self.functions
+        name = node.name
+
+        def define(variables):
+            functions[name] = node
+        return define
+
+    def function_call(self, node: FunctionCallNode) -> Code:
+        functions = self.functions
+        name = node.name
+        arguments = self.compile_all(node.arguments)
+        if is_native(name):
+            return self.native_call(name, arguments)
+        code_for = self.code_for
+        # Last function seen at this call site and its compiled code
+        cache = [None, None]
+
+        def call(variables):
+            function = functions.get(name)
+            if not function:
+                raise RuntimeError(f"अपरिभाषित कार्य '{name}'")
+            values = [argument(variables) for argument in arguments]
+            if cache[0] is not function:
+                cache[0] = function
+                cache[1] = code_for(function)
+            return cache[1](values, variables)
+        return call
+
+    def native_call(self, name: str, arguments: List[Code]) -> Code:
+        modules = self.modules
+
+        def call(variables):
+            native = native_function(modules, name)
+            return native(*[argument(variables) for argument in arguments])
+        return call
+
+    def code_for(self, function: FunctionDefNode) -> Callable[[List[Any], Dict[str, Any]], Any]:
+        """Return the compiled function, compiling it on first use"""
+        entry = self.function_code.get(id(function))
+        if entry is None or entry[0] is not function:
+            entry = (function, self.compile_function(function))
+            self.function_code[id(function)] = entry
+        return entry[1]
+
+    def compile_function(self, function: FunctionDefNode) -> Callable[[List[Any], Dict[str, Any]], Any]:
+        """Compile a function body into invoke(arguments, caller variables)
+
+        The body runs until its first top-level परत, or until an if
+        statement in it returns a value other than शून्य, like
+        MarathiEvaluator.execute_function.
+        """
+        parameters = tuple(function.parameters)
+        count = len(parameters)
+        sites = self.feedback_sites
+        steps, result = self.function_body(function)
+        table = self.feedback
+        version = table.version if table else 0
+        adaptive = self.feedback_sites != sites
+
+        def invoke(arguments, caller_variables):
+            nonlocal steps, result, version
+            if len(arguments) != count:
+                raise RuntimeError("Argument count mismatch")
+            if adaptive and table.version != version:
+                # Type feedback changed; later calls use the new code
+                version = table.version
+                steps, result = self.function_body(function)
+            variables = caller_variables.copy()
+            variables.update(zip(parameters, arguments))
+            for step, is_if in steps:
+                value = step(variables)
+                if is_if and value is not None:
+                    return value
+            return result(variables)
+        return invoke
+
+    def function_body(self, function: FunctionDefNode) -> tuple:
+        """Compile the statements of a function up to its first top-level परत"""
+        steps = []
+        result = no_operation
+        for statement in function.body:
+            if isinstance(statement, ReturnNode):
+                result = self.compile(statement)
+                break
+            steps.append((self.compile(statement), isinstance(statement, IfNode)))
+        return tuple(steps), result
+
+    def return_statement(self, node: ReturnNode) -> Code:
+        if node.value:
+            return self.compile(node.value)
+        return no_operation
+
+class ClosureEvaluator(MarathiEvaluator):
+    """MarathiEvaluator that compiles nodes with ClosureCompiler before running them"""
+
+    supports_hooks = False
+    supports_limits = False
+
+    def __init__(self, specialize: bool = True):
+        super().__init__(memoize=False)
+        self.compiler = ClosureCompiler(self, specialize)
+
+    def evaluate(self, node: ASTNode) -> Any:
+        return self.compiler.compile(node)(self.variables)
+
+    def execute_function(self, function: FunctionDefNode, arguments: List[Any]) -> Any:
+        return self.compiler.code_for(function)(arguments, self.variables)
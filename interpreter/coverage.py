@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MarathiLang Coverage - Which lines of a program ran
+मराठी भाषा कव्हरेज - प्रोग्रामच्या कोणत्या ओळी चालल्या
+
+Coverage is a Hooks object that counts the statements run on each line.
+Its report is the source with every line prefixed by how often it ran,
+`>>>>>>` for lines with statements that never ran and blanks for lines
+without statements, like the .cover files of Python's trace module.
+"""
+
+import os
+from collections import Counter
+from typing import List, Optional, Set, Tuple
+
+from .parser import *
+from .hooks import Hooks, statement_nodes
+
+MISSED = '>>>>>>'
+
+class Coverage(Hooks):
+    """Line coverage of the programs given to add_program"""
+
+    def __init__(self):
+        self.hits: Counter = Counter()
+        # Lines that have at least one statement
+        self.lines: Set[int] = set()
+
+    def add_program(self, program: ProgramNode):
+        self.lines.update(statement.line for statement in statement_nodes(program).values())
+
+    def on_line(self, statement: ASTNode):
+        self.hits[statement.line] += 1
+
+    def missed(self) -> List[int]:
+        return sorted(line for line in self.lines if not self.hits[line])
+
+    def summary(self) -> Tuple[int, int]:
+        """(lines that ran, lines with statements)"""
+        return len(self.lines) - len(self.missed()), len(self.lines)
+
+    def annotate(self, source_lines: List[str]) -> str:
+        """The source with each line's count, or MISSED, in front of it"""
+        width = len(MISSED)
+        output = []
+        for number, text in enumerate(source_lines, 1):
+            if self.hits[number]:
+                prefix = f'{self.hits[number]:>{width - 1}}:'
+            elif number in self.lines:
+                prefix = MISSED
+            else:
+                prefix = ' ' * width
+            output.append(f'{prefix} {text}'.rstrip())
+        return '\n'.join(output) + '\n'
+
+    def report(self, source_path: str, output_dir: Optional[str] = None) -> str:
+        """Write `<file>.cover` next to the source or into output_dir
+
+        Returns a summary to show on the terminal.
+        """
+        with open(source_path, 'r', encoding='utf-8') as f:
+            source_lines = f.read().split('\n')
+        if source_lines and not source_lines[-1]:
+            source_lines.pop()
+        name = os.path.basename(source_path)
+        directory = output_dir or os.path.dirname(os.path.abspath(source_path))
+        os.makedirs(directory, exist_ok=True)
+        cover_path = os.path.join(directory, name + '.cover')
+        with open(cover_path, 'w', encoding='utf-8') as f:
+            f.write(self.annotate(source_lines))
+        covered, total = self.summary()
+        percent = 100.0 * covered / total if total else 100.0
+        missed = ', '.join(str(line) for line in self.missed())
+        summary = f'coverage: {name} {covered}/{total} lines ({percent:.1f}%) -> {cover_path}'
+        return summary + (f'\nmissed lines: {missed}' if missed else '')
@@ -5,22 +5,107 @@ MarathiLang Evaluator - Evaluates AST into executed statements
 मराठी भाषा मूल्यांकन - AST चे विधानांत रूपांतर करा
 """
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 from .parser import *
 from .lexer import TokenType
+from .scope import UNSET, Frame, ScopeResolver
+from .memo import DEFAULT_MEMO_SIZE, Memoizer
+from .storage import LIST_TYPES, make_list
+from .sequences import SIZED_TYPES, loop_items, make_range
+from .vector import Vector, zero_divisor
+from .hooks import Hooks, install
+from .limits import DEPTH, Governor, LimitExceeded, Limits
+
+def print_values(arguments: List[Any]):
+    """Print the arguments of मुद्रण, separated by spaces"""
+    try:
+        print(*arguments)
+    except UnicodeEncodeError:
+        # Handle Unicode encoding issues
+        import sys
+        output = ' '.join(str(arg) for arg in arguments)
+        sys.stdout.buffer.write(output.encode('utf-8'))
+        sys.stdout.buffer.write(b'\n')
+        sys.stdout.buffer.flush()
+
+def length(value: Any) -> int:
+    if not isinstance(value, (str, Vector) + SIZED_TYPES):
+        raise RuntimeError("लांबी फक्त शब्द किंवा यादीची असते")
+    return len(value)
+
+# Functions named by keywords, which Marathi functions cannot be named
+BUILTINS: Dict[str, Callable[..., Any]] = {
+    'लांबी': length,
+    'श्रेणी': make_range,
+}
+
+def is_native(name: str) -> bool:
+    """Whether a call reaches a Python function rather than a Marathi one"""
+    return '.' in name or name in BUILTINS
+
+def native_function(modules: Dict[str, Any], name: str) -> Callable[..., Any]:
+    """Python function that a call of a builtin or of `मॉड्यूल.कार्य` reaches
+
+    Only the public functions of modules given to load_module can be
+    called this way.
+    """
+    builtin = BUILTINS.get(name)
+    if builtin is not None:
+        return builtin
+    module_name, _, attribute = name.partition('.')
+    module = modules.get(module_name)
+    function = None
+    if module is not None and attribute and not attribute.startswith('_'):
+        function = getattr(module, attribute, None)
+    if not callable(function):
+        raise RuntimeError(f"अपरिभाषित कार्य '{name}'")
+    return function
 
 class MarathiEvaluator:
-    def __init__(self):
+    # Whether add_hooks works: every node goes through self.evaluate and
+    # every call through self.execute_function
+    supports_hooks = True
+    # Whether set_limits works: every loop and call goes through the
+    # code of this class that counts them
+    supports_limits = True
+
+    def __init__(self, memoize: bool = True, memo_size: int = DEFAULT_MEMO_SIZE,
+                 limits: Optional[Limits] = None):
         self.variables: Dict[str, Any] = {}
         self.functions: Dict[str, FunctionDefNode] = {}
-        self.call_stack = []
-        self.return_value = None
+        # Modules whose functions `मॉड्यूल.कार्य` calls
+        self.modules: Dict[str, Any] = {}
+        # Active calls, innermost last; top-level code uses self.variables
+        self.call_stack: List[Frame] = []
+        self.frame: Optional[Frame] = None
+        self.resolver = ScopeResolver()
+        # Results of pure functions, reused when called with the same arguments
+        self.memo = Memoizer(self.functions, memo_size) if memoize else None
+        # Registered Hooks; see add_hooks
+        self.hooks: List[Hooks] = []
+        # Enforces the limits given to set_limits, if any
+        self.governor: Optional[Governor] = None
+        if limits is not None:
+            self.set_limits(limits)
 
     def evaluate(self, node: ASTNode) -> Any:
         if isinstance(node, ProgramNode):
+            if self.governor is not None:
+                self.governor.start()
             result = None
-            for statement in node.statements:
-                result = self.evaluate(statement)
+            try:
+                for statement in node.statements:
+                    result = self.evaluate(statement)
+            except RecursionError as e:
+                # Python's stack ran out before any max_depth was reached.
+                # Inside calls that amounts to the depth limit; outside
+                # them only an expression can nest that deeply.
+                stack = getattr(e, 'marathi_stack', [])
+                if not stack:
+                    raise RuntimeError("अभिव्यक्ती खूप खोलवर गुंतलेली आहे") from None
+                error = LimitExceeded(DEPTH, len(stack))
+                error.marathi_stack = stack
+                raise error from None
             return result
 
         if isinstance(node, NumberNode):
@@ -32,6 +117,12 @@ class MarathiEvaluator:
         elif isinstance(node, NullNode):
             return None
         elif isinstance(node, IdentifierNode):
+            frame = self.frame
+            if frame is not None:
+                value = frame.slots[frame.layout.slot_index[node.name]]
+                if value is UNSET:
+                    value = self.load_local(node.name)
+                return value
             if node.name not in self.variables:
                 raise RuntimeError(f"Undefined variable '{node.name}'")
             return self.variables[node.name]
@@ -39,18 +130,24 @@ class MarathiEvaluator:
         elif isinstance(node, AssignmentNode):
             value = self.evaluate(node.value)
             if node.is_constant:
-                if node.name in self.variables:
+                if self.is_defined(node.name):
                     raise RuntimeError(f"Cannot reassign constant '{node.name}'")
-            self.variables[node.name] = value
+            if self.frame is None:
+                self.variables[node.name] = value
+            else:
+                self.store(node.name, value)
             return value
 
         elif isinstance(node, ArrayNode):
-            return [self.evaluate(element) for element in node.elements]
+            value = make_list([self.evaluate(element) for element in node.elements])
+            if self.governor is not None:
+                self.governor.allocate(value)
+            return value
 
         elif isinstance(node, IndexNode):
             array = self.evaluate(node.array)
             index = self.evaluate(node.index)
-            if not isinstance(array, list):
+            if not isinstance(array, LIST_TYPES):
                 raise RuntimeError(f"Indexing non-array type")
             if not isinstance(index, int):
                 raise RuntimeError(f"Array index must be an integer")
@@ -63,13 +160,17 @@ class MarathiEvaluator:
             right = self.evaluate(node.right)
             operator = node.operator
             if operator == '+':
+                if self.governor is not None:
+                    self.governor.combine(operator, left, right)
                 return left + right
             elif operator == '-':
                 return left - right
             elif operator == '*':
+                if self.governor is not None:
+                    self.governor.combine(operator, left, right)
                 return left * right
             elif operator == '/':
-                if right == 0:
+                if zero_divisor(right):
                     raise RuntimeError("Division by zero")
                 return left / right
             elif operator == '%':
@@ -102,16 +203,7 @@ class MarathiEvaluator:
                 return -operand
 
         elif isinstance(node, PrintNode):
-            arguments = [self.evaluate(arg) for arg in node.arguments]
-            try:
-                print(*arguments)
-            except UnicodeEncodeError:
-                # Handle Unicode encoding issues
-                import sys
-                output = ' '.join(str(arg) for arg in arguments)
-                sys.stdout.buffer.write(output.encode('utf-8'))
-                sys.stdout.buffer.write(b'\n')
-                sys.stdout.buffer.flush()
+            print_values([self.evaluate(arg) for arg in node.arguments])
 
         elif isinstance(node, IfNode):
             condition = self.evaluate(node.condition)
@@ -127,26 +219,36 @@ class MarathiEvaluator:
                         return result
 
         elif isinstance(node, WhileNode):
+            governor = self.governor
             while self.evaluate(node.condition):
                 for stmt in node.body:
                     self.evaluate(stmt)
+                if governor is not None:
+                    governor.step()
 
         elif isinstance(node, ForEachNode):
             iterable = self.evaluate(node.iterable)
-            if not isinstance(iterable, list):
-                raise RuntimeError("ForEach expects a list")
+            if not isinstance(iterable, LIST_TYPES):
+                iterable = loop_items(iterable)
+            governor = self.governor
             for element in iterable:
-                self.variables[node.variable] = element
+                self.store(node.variable, element)
                 for stmt in node.body:
                     self.evaluate(stmt)
+                if governor is not None:
+                    governor.step()
 
         elif isinstance(node, FunctionDefNode):
-            self.functions[node.name] = node
+            self.define_function(node)
 
         elif isinstance(node, FunctionCallNode):
             function = self.functions.get(node.name)
             if not function:
-                raise RuntimeError(f"अपरिभाषित कार्य '{node.name}'")
+                native = native_function(self.modules, node.name)
+                value = native(*[self.evaluate(arg) for arg in node.arguments])
+                if self.governor is not None:
+                    self.governor.allocate(value)
+                return value
 
             arguments = [self.evaluate(arg) for arg in node.arguments]
             return self.execute_function(function, arguments)
@@ -157,53 +259,139 @@ class MarathiEvaluator:
             return None
 
     def execute_function(self, function: FunctionDefNode, arguments: List[Any]) -> Any:
-        # Save previous state
-        previous_variables = self.variables.copy()
-        previous_return = self.return_value
-        self.return_value = None
-
         if len(function.parameters) != len(arguments):
             raise RuntimeError("Argument count mismatch")
+        if self.governor is not None:
+            self.governor.call(len(self.call_stack) + 1)
+        # Pure functions called with the same arguments again reuse the result
+        results = key = None
+        if self.memo is not None:
+            results, key = self.memo.lookup(function, arguments)
+            if results is not None and key in results:
+                return self.memo.reuse(results, key)
 
-        # Set up parameters
-        for param, arg in zip(function.parameters, arguments):
-            self.variables[param] = arg
+        # The call gets a fixed-size frame of slots. Variables it has not
+        # assigned are looked up in its callers' frames and then the
+        # globals, so it still sees what its caller could see.
+        frame = Frame(function, self.resolver.layout(function), arguments)
+        caller = self.frame
+        self.call_stack.append(frame)
+        self.frame = frame
 
         # Execute function body
+        result = None
         try:
             for stmt in function.body:
                 if isinstance(stmt, ReturnNode):
                     if stmt.value:
-                        self.return_value = self.evaluate(stmt.value)
-                    else:
-                        self.return_value = None
+                        result = self.evaluate(stmt.value)
                     break
                 else:
-                    result = self.evaluate(stmt)
+                    value = self.evaluate(stmt)
                     # Check if we encountered a return statement in nested structure
-                    if isinstance(stmt, IfNode) and result is not None:
-                        self.return_value = result
+                    if isinstance(stmt, IfNode) and value is not None:
+                        result = value
                         break
         except Exception as e:
-            # Restore state on error
-            self.variables = previous_variables
-            self.return_value = previous_return
-            raise e
+            # Remember where the error happened for tracebacks
+            if not hasattr(e, 'marathi_stack'):
+                e.marathi_stack = self.stack_trace()
+            raise
+        finally:
+            self.call_stack.pop()
+            self.frame = caller
 
-        # Get return value
-        result = self.return_value
-        
-        # Restore state
-        self.variables = previous_variables
-        self.return_value = previous_return
-        
+        if results is not None:
+            self.memo.remember(results, key, result)
         return result
 
+    def define_function(self, function: FunctionDefNode):
+        self.functions[function.name] = function
+        # A call may now reach a different function
+        if self.memo is not None:
+            self.memo.invalidate()
+
+    def stack_trace(self) -> List[str]:
+        """Names of the functions being executed, outermost first"""
+        return [frame.function.name for frame in self.call_stack]
+
+    def load_local(self, name: str) -> Any:
+        """Read a variable inside a function call"""
+        frame = self.frame
+        slot = frame.layout.slot_index[name]
+        value = frame.slots[slot]
+        if value is UNSET:
+            # The callers are suspended until this call returns, so the
+            # value cannot change; keep it for later reads
+            value = frame.slots[slot] = self.load_outer(name)
+        return value
+
+    def load_outer(self, name: str) -> Any:
+        """Read a variable the current call has not assigned"""
+        value = self.find_outer(name)
+        if value is UNSET:
+            raise RuntimeError(f"Undefined variable '{name}'")
+        return value
+
+    def find_outer(self, name: str) -> Any:
+        """Value of a variable in the callers' frames or the globals, or UNSET"""
+        stack = self.call_stack
+        for index in range(len(stack) - 2, -1, -1):
+            frame = stack[index]
+            slot = frame.layout.slot_index.get(name)
+            if slot is not None and frame.slots[slot] is not UNSET:
+                return frame.slots[slot]
+        return self.variables.get(name, UNSET)
+
+    def is_defined(self, name: str) -> bool:
+        frame = self.frame
+        if frame is None:
+            return name in self.variables
+        slot = frame.layout.slot_index.get(name)
+        if slot is not None and frame.slots[slot] is not UNSET:
+            return True
+        return self.find_outer(name) is not UNSET
+
+    def store(self, name: str, value: Any):
+        """Assign a variable in the current call, or a global at top level"""
+        frame = self.frame
+        if frame is None:
+            self.variables[name] = value
+            return
+        frame.slots[frame.layout.slot_index[name]] = value
+
     def get_variables(self) -> Dict[str, Any]:
         return self.variables
 
     def load_module(self, name: str, module: Any):
         self.variables[name] = module
+        self.modules[name] = module
+
+    def add_hooks(self, hooks: Hooks):
+        """Call hooks on calls, returns, statements and allocations from now on
+
+        Without hooks nothing is checked while evaluating; with them,
+        evaluate and execute_function are replaced on this instance by
+        versions that call the events the registered hooks override.
+        """
+        if not self.supports_hooks:
+            raise RuntimeError(f"{type(self).__name__} does not support hooks")
+        self.hooks.append(hooks)
+        install(self, self.hooks)
+
+    def remove_hooks(self, hooks: Hooks):
+        self.hooks.remove(hooks)
+        install(self, self.hooks)
+
+    def set_limits(self, limits: Optional[Limits]):
+        """Stop every program from now on that goes over limits
+
+        A program over a limit raises LimitExceeded. None removes the
+        limits, after which nothing is counted.
+        """
+        if not self.supports_limits:
+            raise RuntimeError(f"{type(self).__name__} does not support limits")
+        self.governor = Governor(limits) if limits is not None else None
 
 # Test the evaluator
 if __name__ == "__main__":
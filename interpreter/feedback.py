@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MarathiLang Type Feedback - Operand types seen at each operator
+मराठी भाषा प्रकार अभिप्राय - प्रत्येक क्रियेवर आढळलेले प्रकार
+
+The closure compiler first compiles an operator so that it records the
+types of its operands. Once every operator of an arithmetic expression
+has only seen ints and floats, the loop or function around it is
+compiled again and the whole expression becomes one Python function:
+its variables are read once, their types are checked against what was
+seen, and the operators run inline instead of as one closure each. If a
+check fails, the expression is computed by the generic closures, its
+operators are marked as failed, and they are compiled generically from
+then on.
+"""
+
+import math
+from typing import Any, Callable, Dict, List, Optional
+
+from .parser import *
+
+# Operators that can run inline; '/' keeps its own zero check and आणि/किंवा
+# evaluate both operands, unlike Python's and/or
+SPECIALIZABLE = ('+', '-', '*', '%', '==', '!=', '<', '>', '<=', '>=')
+
+# Operand types a fused expression can be specialized for
+NUMERIC_TYPES = {int: 'int', float: 'float'}
+
+# Observations with the same types before an operator is specialized
+WARMUP = 2
+
+# Most operators fused into one expression
+MAX_FUSED_OPERATORS = 32
+
+class TypeFeedback:
+    """What one operator has seen"""
+
+    __slots__ = ('types', 'seen', 'failed')
+
+    def __init__(self):
+        # (left type, right type), or None once they differed
+        self.types: Optional[tuple] = None
+        self.seen = 0
+        self.failed = False
+
+    def warming(self) -> bool:
+        return self.seen < WARMUP and not self.failed
+
+    def numeric(self) -> bool:
+        """Whether both operands have always had the same numeric types"""
+        return (not self.failed and self.seen >= WARMUP and self.types is not None
+                and self.types[0] in NUMERIC_TYPES and self.types[1] in NUMERIC_TYPES)
+
+class FeedbackTable:
+    """TypeFeedback of every operator a compiler has compiled
+
+    version changes whenever any operator's feedback changes in a way
+    that affects how it should be compiled; compiled loops and functions
+    compare it with the version they were compiled at.
+    """
+
+    def __init__(self):
+        # id(BinaryOpNode) -> (node, feedback)
+        self.sites: Dict[int, tuple] = {}
+        self.version = 0
+        # id() of the expressions compiled fused at least once
+        self.fused: set = set()
+        self.failures = 0
+
+    def site(self, node: BinaryOpNode) -> TypeFeedback:
+        entry = self.sites.get(id(node))
+        if entry is None or entry[0] is not node:
+            entry = (node, TypeFeedback())
+            self.sites[id(node)] = entry
+        return entry[1]
+
+    def observe(self, feedback: TypeFeedback, left: Any, right: Any):
+        types = (type(left), type(right))
+        if feedback.seen == 0:
+            feedback.types = types
+        elif feedback.types != types:
+            feedback.types = None
+        feedback.seen += 1
+        if feedback.seen == WARMUP:
+            self.version += 1
+
+    def guard_failure(self, sites: List[TypeFeedback], generic: Callable[[Any], Any]) -> Callable[[Any], Any]:
+        """Slow path of a fused expression: mark its operators failed and run generically"""
+        def fail(variables):
+            if not sites[0].failed:
+                for feedback in sites:
+                    feedback.failed = True
+                self.failures += 1
+                self.version += 1
+            return generic(variables)
+        return fail
+
+    def stats(self) -> Dict[str, int]:
+        return {'operators': len(self.sites), 'fused': len(self.fused), 'guard failures': self.failures}
+
+class FusedExpression:
+    """Python source of an arithmetic expression whose operators all have numeric feedback"""
+
+    def __init__(self, node: BinaryOpNode, table: FeedbackTable):
+        # Variable name -> (local name, type it must have)
+        self.variables: Dict[str, tuple] = {}
+        self.sites: List[TypeFeedback] = []
+        self.source = self.expression(node, table, None)
+
+    def expression(self, node: ASTNode, table: FeedbackTable, expected: Optional[type]) -> Optional[str]:
+        """Python source of node, or None if it cannot be fused
+
+        expected is the type the parent operator saw for this operand.
+        Operands are parenthesized, so Python's precedence does not matter.
+        """
+        if isinstance(node, BinaryOpNode):
+            if node.operator not in SPECIALIZABLE:
+                return None
+            feedback = table.site(node)
+            if not feedback.numeric() or len(self.sites) == MAX_FUSED_OPERATORS:
+                return None
+            self.sites.append(feedback)
+            left = self.expression(node.left, table, feedback.types[0])
+            right = self.expression(node.right, table, feedback.types[1]) if left is not None else None
+            if right is None:
+                return None
+            return f'({left} {node.operator} {right})'
+        if isinstance(node, IdentifierNode) and expected is not None:
+            entry = self.variables.get(node.name)
+            if entry is None:
+                entry = self.variables[node.name] = (f'v{len(self.variables)}', expected)
+            elif entry[1] is not expected:
+                return None
+            return entry[0]
+        if isinstance(node, NumberNode) and type(node.value) in NUMERIC_TYPES and math.isfinite(node.value):
+            return repr(node.value)
+        return None
+
+    def function_source(self, target: Optional[str]) -> str:
+        """Source of factory(generic, fail), which returns the fused closure
+
+        With a target, the closure also assigns the result to it, as an
+        assignment statement does.
+        """
+        loads = ''.join(f'            {local} = variables[{name!r}]\n'
+                        for name, (local, _) in self.variables.items()) or '            pass\n'
+        guard = ' and '.join(f'type({local}) is {NUMERIC_TYPES[expected]}'
+                             for local, expected in self.variables.values()) or 'True'
+        if target is None:
+            result = f'            return {self.source}\n'
+        else:
+            result = (f'            variables[{target!r}] = result = {self.source}\n'
+                      f'            return result\n')
+        return ('def factory(generic, fail):\n'
+                '    def fused(variables):\n'
+                '        try:\n'
+                f'{loads}'
+                '        except KeyError:\n'
+                '            # Let the generic code report the undefined variable\n'
+                '            return generic(variables)\n'
+                f'        if {guard}:\n'
+                f'{result}'
+                '        return fail(variables)\n'
+                '    return fused\n')
+
+# factory functions by source, so recompiled loops reuse them
+FACTORIES: Dict[str, Callable] = {}
+
+def fused_factory(source: str) -> Callable:
+    factory = FACTORIES.get(source)
+    if factory is None:
+        namespace: Dict[str, Any] = {}
+        exec(compile(source, '<fused expression>', 'exec'), namespace)
+        factory = FACTORIES[source] = namespace['factory']
+    return factory
+
+def counting_loop(node: WhileNode, assigned: set) -> Optional[tuple]:
+    """Recognize `जोपर्यंत i <= n { ...; i = i + १ }`
+
+    Returns (counter name, inclusive, limit node, step) when the condition
+    compares a variable with < or <= against a constant or a variable,
+    the body ends by adding a positive integer constant to the counter,
+    and nothing before that assigns the counter or the limit. assigned
+    holds the names the body assigns before its last statement.
+    """
+    condition = node.condition
+    if not (isinstance(condition, BinaryOpNode) and condition.operator in ('<', '<=')
+            and isinstance(condition.left, IdentifierNode)):
+        return None
+    name = condition.left.name
+    limit = condition.right
+    if isinstance(limit, IdentifierNode):
+        if limit.name == name or limit.name in assigned:
+            return None
+    elif not isinstance(limit, NumberNode):
+        return None
+    if not node.body or name in assigned:
+        return None
+    step = node.body[-1]
+    if not (isinstance(step, AssignmentNode) and step.name == name and not step.is_constant
+            and isinstance(step.value, BinaryOpNode) and step.value.operator == '+'
+            and isinstance(step.value.left, IdentifierNode) and step.value.left.name == name
+            and isinstance(step.value.right, NumberNode)
+            and type(step.value.right.value) is int and step.value.right.value > 0):
+        return None
+    return name, condition.operator == '<=', limit, step.value.right.value
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MarathiLang Hooks - Callbacks on what the evaluator is doing
+मराठी भाषा हुक्स - मूल्यांकनादरम्यान होणाऱ्या घटनांवर कॉलबॅक
+
+Coverage, tracing and metrics tools subclass Hooks, override the events
+they need and register with MarathiEvaluator.add_hooks:
+
+- on_call(function, arguments): a कार्य is called
+- on_return(function, result): the call finished (result is None if it
+  failed)
+- on_line(statement): a statement is about to run
+- on_alloc(value): a new list or string was made by a literal, `+`, `*`
+  or a builtin or module function
+
+An evaluator without hooks runs exactly as if this module did not exist.
+Registering hooks replaces evaluate and execute_function on that one
+evaluator instance with wrappers that call them, and only for the events
+some registered hooks object overrides.
+"""
+
+from typing import Any, Callable, Dict, List
+
+from .parser import *
+from .optimizer import FUNCTION, blocks, post_order
+from .storage import LIST_TYPES
+
+EVENTS = ('on_call', 'on_return', 'on_line', 'on_alloc')
+
+# Binary operators whose result can be a new list or string
+ALLOCATING_OPERATORS = ('+', '*')
+
+class Hooks:
+    """Base class of evaluator hooks; every event does nothing by default"""
+
+    def on_call(self, function: FunctionDefNode, arguments: List[Any]):
+        pass
+
+    def on_return(self, function: FunctionDefNode, result: Any):
+        pass
+
+    def on_line(self, statement: ASTNode):
+        pass
+
+    def on_alloc(self, value: Any):
+        pass
+
+def handlers(hooks: List[Hooks], event: str) -> List[Callable]:
+    """Bound methods of the hooks objects that override an event"""
+    default = getattr(Hooks, event)
+    return [getattr(item, event) for item in hooks
+            if getattr(type(item), event, default) is not default]
+
+def statement_nodes(root: ASTNode) -> Dict[int, ASTNode]:
+    """id() of the node evaluated for each statement in a tree -> the statement
+
+    Function bodies are included. A परत directly in a function body is not
+    evaluated as a node, only its value is, so the value stands for it.
+    """
+    statements = {}
+    for node in post_order(root):
+        for block, kind in blocks(node):
+            for statement in block:
+                if kind == FUNCTION and isinstance(statement, ReturnNode) and statement.value:
+                    statements[id(statement.value)] = statement
+                else:
+                    statements[id(statement)] = statement
+    return statements
+
+def live_statements(program: ProgramNode, functions: Dict[str, FunctionDefNode]) -> Dict[int, ASTNode]:
+    """statement_nodes of a program and of the functions defined before it
+
+    Built afresh for every program, so that ids of the statements of
+    programs that are gone are not mistaken for new nodes.
+    """
+    statements = {}
+    for function in functions.values():
+        statements.update(statement_nodes(function))
+    statements.update(statement_nodes(program))
+    return statements
+
+def install(evaluator: Any, hooks: List[Hooks]):
+    """Give evaluator the evaluate and execute_function its hooks need"""
+    for name in ('evaluate', 'execute_function'):
+        evaluator.__dict__.pop(name, None)
+    on_call, on_return = handlers(hooks, 'on_call'), handlers(hooks, 'on_return')
+    on_line, on_alloc = handlers(hooks, 'on_line'), handlers(hooks, 'on_alloc')
+    if on_line or on_alloc:
+        evaluator.evaluate = hooked_evaluate(evaluator, on_line, on_alloc)
+    if on_call or on_return:
+        evaluator.execute_function = hooked_execute_function(evaluator, on_call, on_return)
+
+def hooked_evaluate(evaluator: Any, on_line: List[Callable], on_alloc: List[Callable]) -> Callable:
+    evaluate = type(evaluator).evaluate
+    functions = evaluator.functions
+    # Statements that can run, by id() as for statement_nodes
+    statements: Dict[int, ASTNode] = {}
+
+    def hooked(node: ASTNode) -> Any:
+        statement = statements.get(id(node))
+        if statement is not None:
+            for handler in on_line:
+                handler(statement)
+        elif node.__class__ is ProgramNode:
+            statements.clear()
+            statements.update(live_statements(node, functions))
+        value = evaluate(evaluator, node)
+        if on_alloc and (type(value) is str or isinstance(value, LIST_TYPES)):
+            kind = node.__class__
+            if kind is ArrayNode or (kind is BinaryOpNode and node.operator in ALLOCATING_OPERATORS) \
+                    or (kind is FunctionCallNode and node.name not in functions):
+                for handler in on_alloc:
+                    handler(value)
+        return value
+
+    return hooked
+
+def hooked_execute_function(evaluator: Any, on_call: List[Callable], on_return: List[Callable]) -> Callable:
+    execute_function = type(evaluator).execute_function
+
+    def hooked(function: FunctionDefNode, arguments: List[Any]) -> Any:
+        for handler in on_call:
+            handler(function, arguments)
+        result = None
+        try:
+            result = execute_function(evaluator, function, arguments)
+            return result
+        finally:
+            for handler in on_return:
+                handler(function, result)
+
+    return hooked
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MarathiLang Incremental Front End - Re-lexes and re-parses only edited regions
+मराठी भाषा वाढीव पार्सर - फक्त बदललेला भाग पुन्हा तपासतो
+"""
+
+import re
+from bisect import bisect_left
+from dataclasses import fields
+from typing import Iterator, List, Optional, Tuple
+
+from .lexer import MarathiLexer, Token, TokenType
+from .parser import ASTNode, MarathiParser, ProgramNode, TokenLookahead
+
+# (physical line, index of the token among the tokens starting on that line)
+Position = Tuple[int, int]
+
+QUOTES = ('"', "'")
+
+# A syntax error that ends with the (line:column) of the token it is about
+POSITIONED = re.compile(r'(.*) \((\d+):(\d+)\)', re.DOTALL)
+
+def shift_lines(nodes: List[Optional[ASTNode]], delta: int):
+    """Move the positions of whole statements down by delta lines (up if negative)"""
+    pending = [node for node in nodes if node is not None]
+    while pending:
+        node = pending.pop()
+        # Columns on the first line count one less, as in the lexer
+        if node.line == 1:
+            node.column += 1
+        node.line += delta
+        if node.line == 1:
+            node.column -= 1
+        for field in fields(node):
+            value = getattr(node, field.name)
+            if isinstance(value, ASTNode):
+                pending.append(value)
+            elif isinstance(value, list):
+                pending.extend(item for item in value if isinstance(item, ASTNode))
+
+class IncrementalDocument:
+    """Editor buffer that keeps its tokens and top-level statements up to date.
+
+    Tokens are stored per physical line as (types, values, offsets), so an
+    edit re-lexes only from the first line it can affect and stops at the
+    first line start after the edit where the old tokens can be reused.
+    Top-level statements remember the token positions they were parsed
+    from, and only those whose tokens changed are parsed again. Lines and
+    columns are 0-based, like editor APIs.
+    """
+
+    def __init__(self, text: str = '', lexer: Optional[MarathiLexer] = None):
+        self.lexer = lexer or MarathiLexer()
+        self.parser = MarathiParser(print_errors=False)
+
+        self.lines: List[str] = ['']
+        self.line_tokens: List[tuple] = [((), (), ())]
+        # carry[y] is 1 when a string token runs past the end of line y
+        self.carry = bytearray(1)
+        # quotes[y] is 1 when line y has an unmatched quote (an UNKNOWN token),
+        # which turns into a string as soon as a quote is typed further down
+        self.quotes = bytearray(1)
+
+        # Top-level statements: first token, first token after it (the
+        # parser's lookahead), AST node and syntax errors. Errors are kept
+        # as (lines after the statement's first line or None, column,
+        # message without its position), so that they move with it.
+        self.seg_starts: List[Position] = []
+        self.seg_ends: List[Position] = []
+        self.seg_nodes: List[Optional[ASTNode]] = []
+        self.seg_errors: List[List[tuple]] = []
+        self.program = ProgramNode([])
+
+        self.replace_lines(0, 1, text.split('\n'))
+
+    @property
+    def text(self) -> str:
+        return '\n'.join(self.lines)
+
+    @property
+    def errors(self) -> List[str]:
+        """Syntax errors, with the positions their statements have now"""
+        messages = []
+        for (y, _), errors in zip(self.seg_starts, self.seg_errors):
+            for offset, column, message in errors:
+                if offset is None:
+                    messages.append(message)
+                    continue
+                line = self.token_line(y) + offset
+                # Columns on the first line count one less, as in the lexer
+                if line == 1:
+                    column -= 1
+                messages.append(f'{message} ({line}:{column})')
+        return messages
+
+    def tokens(self) -> List[Token]:
+        """Return the full token stream (same as MarathiLexer.tokenize(self.text))"""
+        return list(self.tokens_from((0, 0), []))
+
+    def edit(self, start_line: int, start_column: int, end_line: int, end_column: int,
+             text: str) -> ProgramNode:
+        """Replace the text between two (line, column) positions"""
+        prefix = self.lines[start_line][:start_column]
+        suffix = self.lines[end_line][end_column:]
+        return self.replace_lines(start_line, end_line + 1, (prefix + text + suffix).split('\n'))
+
+    def update(self, text: str) -> ProgramNode:
+        """Bring the document in line with a new full text, touching only changed lines"""
+        old_lines = self.lines
+        new_lines = text.split('\n')
+
+        first = 0
+        limit = min(len(old_lines), len(new_lines))
+        while first < limit and old_lines[first] == new_lines[first]:
+            first += 1
+        if first == len(old_lines) == len(new_lines):
+            return self.program
+
+        old_end, new_end = len(old_lines), len(new_lines)
+        while old_end > first and new_end > first and old_lines[old_end - 1] == new_lines[new_end - 1]:
+            old_end -= 1
+            new_end -= 1
+        return self.replace_lines(first, old_end, new_lines[first:new_end])
+
+    def replace_lines(self, first: int, last: int, new_lines: List[str]) -> ProgramNode:
+        """Replace physical lines first..last-1 and update tokens and AST"""
+        old_count = len(self.lines)
+        if first == 0 and last == old_count and not new_lines:
+            new_lines = ['']
+        shift = len(new_lines) - (last - first)
+        self.lines[first:last] = new_lines
+        edit_stop = first + len(new_lines)
+
+        # Find a line start before the edit where lexing can restart
+        restart = first
+        if last == old_count and first > 0:
+            # The line before the edit gains or loses its trailing newline
+            restart = first - 1
+        if any(quote in line for line in new_lines for quote in QUOTES):
+            unmatched = self.quotes.find(1, 0, restart)
+            if unmatched != -1:
+                restart = unmatched
+        while restart > 0 and self.carry[restart - 1]:
+            restart -= 1
+
+        line_tokens, carry, quotes, stop = self.relex(restart, edit_stop, shift)
+        old_stop = stop - shift
+        self.line_tokens[restart:old_stop] = line_tokens
+        self.carry[restart:old_stop] = carry
+        self.quotes[restart:old_stop] = quotes
+
+        self.reparse(restart, stop, shift)
+        return self.program
+
+    def relex(self, restart: int, edit_stop: int, shift: int) -> tuple:
+        """Lex lines from `restart` until a line start where the old tokens line up again
+
+        Lines from `edit_stop` on are unchanged old lines moved by `shift`.
+        Returns the new per-line tokens, carry and quote flags, and the
+        first line (new numbering) whose old tokens are kept.
+        """
+        lines = self.lines
+        count = len(lines)
+        pattern = self.lexer.master_pattern
+        scan = self.lexer.scan_match
+        unknown = TokenType.UNKNOWN
+        newline = TokenType.NEWLINE
+
+        line_tokens = []
+        carry = bytearray()
+        quotes = bytearray()
+        y = restart
+        while y < count:
+            if y >= edit_stop and y > restart:
+                old_y = y - shift
+                if old_y == 0 or not self.carry[old_y - 1]:
+                    break
+
+            # Lex a window of whole lines starting at line y. It only grows
+            # past one line when a quote has to look further for its match.
+            window = lines[y] + '\n' if y < count - 1 else lines[y]
+            line_ends = [len(window)]
+            window_tokens = [([], [], [])]
+            window_carry = bytearray([1])
+            window_quotes = bytearray([0])
+            current = 0
+            pos = 0
+            while pos < len(window):
+                match = pattern.match(window, pos)
+                token = scan(match)
+                if token is not None and token[0] == unknown and token[1] in QUOTES \
+                        and y + len(line_ends) < count:
+                    while y + len(line_ends) < count:
+                        next_line = y + len(line_ends)
+                        text = lines[next_line] + '\n' if next_line < count - 1 else lines[next_line]
+                        window += text
+                        line_ends.append(len(window))
+                        window_tokens.append(([], [], []))
+                        window_carry.append(1)
+                        window_quotes.append(0)
+                        if token[1] in text:
+                            break
+                    continue
+
+                start = match.start()
+                pos = match.end()
+                if token is None:
+                    continue
+                while start >= line_ends[current]:
+                    current += 1
+                types, values, offsets = window_tokens[current]
+                types.append(token[0])
+                values.append(token[1])
+                offsets.append(start - (line_ends[current - 1] if current else 0))
+                if token[0] == newline:
+                    window_carry[current] = 0
+                elif token[0] == unknown and token[1] in QUOTES:
+                    window_quotes[current] = 1
+
+            if y + len(line_ends) == count:
+                # The last line has no newline to carry past
+                window_carry[-1] = 0
+            for types, values, offsets in window_tokens:
+                line_tokens.append((tuple(types), tuple(values), tuple(offsets)))
+            carry += window_carry
+            quotes += window_quotes
+            y += len(line_ends)
+
+        return line_tokens, carry, quotes, y
+
+    def reparse(self, restart: int, stop: int, shift: int):
+        """Parse top-level statements again from the first one that reaches line `restart`
+
+        Parsing stops at the first statement start from line `stop` on that
+        matches the start of an old statement; that statement and the ones
+        after it are kept.
+        """
+        parser = self.parser
+        first = bisect_left(self.seg_ends, (restart, 0))
+        begin = self.seg_ends[first - 1] if first else (0, 0)
+
+        positions: List[Position] = []
+        parser.load(TokenLookahead(self.tokens_from(begin, positions)))
+        parser.errors = []
+
+        starts, ends, nodes, errors = [], [], [], []
+        reuse = len(self.seg_starts)
+        while not parser.is_at_end():
+            if parser.check(TokenType.NEWLINE):
+                parser.skip()
+                continue
+
+            start = positions[parser.current]
+            if start[0] >= stop:
+                old_start = (start[0] - shift, start[1])
+                index = bisect_left(self.seg_starts, old_start, first)
+                if index < len(self.seg_starts) and self.seg_starts[index] == old_start:
+                    reuse = index
+                    break
+
+            mark = len(parser.errors)
+            node = parser.statement()
+            parser.peek()       # pull the lookahead token so its position is known
+            starts.append(start)
+            ends.append(positions[parser.current])
+            nodes.append(node)
+            errors.append([self.locate_error(message, start[0]) for message in parser.errors[mark:]])
+
+        if shift:
+            moved_starts = [(line + shift, index) for line, index in self.seg_starts[reuse:]]
+            moved_ends = [(line + shift, index) for line, index in self.seg_ends[reuse:]]
+        else:
+            moved_starts = self.seg_starts[reuse:]
+            moved_ends = self.seg_ends[reuse:]
+        self.seg_starts[first:] = starts + moved_starts
+        self.seg_ends[first:] = ends + moved_ends
+        for node, (line, _) in zip(self.seg_nodes[reuse:], moved_starts):
+            if node is not None:
+                # Kept statements start at the token line of their new place
+                delta = 1 + line - self.carry[:line].count(1) - node.line
+                if delta:
+                    shift_lines(self.seg_nodes[reuse:], delta)
+                break
+        self.seg_nodes[first:] = nodes + self.seg_nodes[reuse:]
+        self.seg_errors[first:] = errors + self.seg_errors[reuse:]
+        self.program = ProgramNode([node for node in self.seg_nodes if node])
+
+    def locate_error(self, message: str, y: int) -> tuple:
+        """Split a syntax error of a statement starting on line y into its seg_errors form"""
+        match = POSITIONED.fullmatch(message)
+        if match is None:
+            return None, 0, message
+        line, column = int(match.group(2)), int(match.group(3))
+        if line == 1:
+            column += 1
+        return line - self.token_line(y), column, match.group(1)
+
+    def token_line(self, y: int) -> int:
+        """Token line (counting NEWLINE tokens, 1-based) of the tokens on physical line y"""
+        return 1 + y - self.carry[:y].count(1)
+
+    def tokens_from(self, position: Position, positions: List[Position]) -> Iterator[Token]:
+        """Yield Tokens from a position to EOF, appending each token's position"""
+        y, index = position
+        lines = self.lines
+        count = len(lines)
+        newline = TokenType.NEWLINE
+
+        # Token lines count NEWLINE tokens; columns count from the last
+        # NEWLINE token (offset relative to the start of line y)
+        line = self.token_line(y)
+        line_start = self.newline_before(y)
+        while True:
+            types, values, offsets = self.line_tokens[y]
+            for index in range(index, len(types)):
+                positions.append((y, index))
+                yield Token(types[index], values[index], line, offsets[index] - line_start + 1)
+                if types[index] == newline:
+                    line += 1
+                    line_start = offsets[index]
+            if y == count - 1:
+                break
+            line_start -= len(lines[y]) + 1
+            y += 1
+            index = 0
+
+        positions.append((count, 0))
+        yield Token(TokenType.EOF, None, line, len(lines[y]) - line_start + 1)
+
+    def newline_before(self, y: int) -> int:
+        """Offset of the last NEWLINE token before line y, relative to the start of line y"""
+        offset = 0
+        while y > 0:
+            y -= 1
+            if not self.carry[y]:
+                return offset - 1
+            offset -= len(self.lines[y]) + 1
+        # Like the lexer, line 1 counts columns from the start of the text
+        return offset
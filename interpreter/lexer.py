@@ -5,13 +5,18 @@ MarathiLang Lexer - Tokenizes Marathi code into tokens
 मराठी भाषा लेक्सर - मराठी कोड टोकन्समध्ये रूपांतरित करतो
 """
 
+import io
 import re
+import codecs
 import unicodedata
-from enum import Enum, auto
+from array import array
+from enum import IntEnum, auto
 from dataclasses import dataclass
-from typing import List, Optional, Any
+from typing import List, Optional, Any, Dict, Iterator
 
-class TokenType(Enum):
+# IntEnum so that token kinds can be stored in (and compared against) the
+# byte array of a TokenBuffer without converting back to members
+class TokenType(IntEnum):
     # Literals
     NUMBER = auto()
     STRING = auto()
@@ -40,6 +45,7 @@ class TokenType(Enum):
     LAMBI = auto()       # लांबी (length)
     SANKHYA = auto()     # संख्या (number cast)
     SHUSHOBHIT = auto()  # सुशोभित (string cast)
+    SHRENI = auto()      # श्रेणी (range)
     
     # Operators
     ASSIGN = auto()      # =
@@ -70,6 +76,7 @@ class TokenType(Enum):
     LBRACKET = auto()    # [
     RBRACKET = auto()    # ]
     COMMA = auto()       # ,
+    DOT = auto()         # .
     SEMICOLON = auto()   # ;
     NEWLINE = auto()     # \n
     
@@ -84,6 +91,94 @@ class Token:
     line: int
     column: int
 
+# TokenType member for each stored kind code
+TOKEN_TYPES = [None] * (max(TokenType) + 1)
+for _token_type in TokenType:
+    TOKEN_TYPES[_token_type] = _token_type
+
+class TokenBuffer:
+    """Compact struct-of-arrays token storage.
+
+    Kinds, lines and columns live in parallel typed arrays and every token
+    value is stored once in an interned value table, so a token costs a few
+    bytes instead of a Token object. Indexing still returns a Token.
+    """
+    
+    def __init__(self):
+        self.kinds = array('B')
+        self.lines = array('I')
+        self.columns = array('I')
+        self.value_ids = array('I')
+        self.values: List[Any] = []
+        self.value_index: Dict[Any, int] = {}
+        self.last_line = 0
+    
+    @classmethod
+    def from_tokens(cls, tokens: List[Token]) -> 'TokenBuffer':
+        """Pack an existing token list"""
+        buffer = cls()
+        for token in tokens:
+            buffer.append(token.type, token.value, token.line, token.column)
+        return buffer
+    
+    def intern(self, value: Any) -> int:
+        """Return the value table index for value, adding it if needed"""
+        # Key non-strings by type as well so 1, 1.0 and True stay distinct
+        key = value if value.__class__ is str else (value.__class__, value)
+        value_id = self.value_index.get(key)
+        if value_id is None:
+            value_id = self.value_index[key] = len(self.values)
+            self.values.append(value)
+        return value_id
+    
+    def append(self, token_type: TokenType, value: Any, line: int, column: int):
+        self.kinds.append(token_type)
+        self.lines.append(line)
+        self.columns.append(column)
+        self.value_ids.append(self.intern(value))
+    
+    def type_at(self, index: int) -> TokenType:
+        return TOKEN_TYPES[self.kinds[index]]
+    
+    def value_at(self, index: int) -> Any:
+        return self.values[self.value_ids[index]]
+    
+    def position_at(self, index: int) -> tuple:
+        """(line, column) of a token
+
+        Tokens on the line of the previous call get the same int object
+        for their line, so the AST nodes of a line share one.
+        """
+        line = self.lines[index]
+        if line != self.last_line:
+            self.last_line = line
+        return self.last_line, self.columns[index]
+    
+    def __len__(self) -> int:
+        return len(self.kinds)
+    
+    def __getitem__(self, index: int) -> Token:
+        return Token(TOKEN_TYPES[self.kinds[index]], self.values[self.value_ids[index]],
+                     self.lines[index], self.columns[index])
+    
+    def __iter__(self) -> Iterator[Token]:
+        for index in range(len(self.kinds)):
+            yield self[index]
+    
+    def nbytes(self) -> int:
+        """Approximate size of the token arrays (excluding the shared values)"""
+        return sum(column.itemsize * len(column)
+                   for column in (self.kinds, self.lines, self.columns, self.value_ids))
+
+# Scanner actions for the master regex (one per capturing alternative)
+SCAN_SKIP = 0
+SCAN_EMIT = 1
+SCAN_NEWLINE = 2
+SCAN_MARATHI_NUMBER = 3
+SCAN_ARABIC_NUMBER = 4
+SCAN_STRING = 5
+SCAN_IDENTIFIER = 6
+
 class MarathiLexer:
     def __init__(self):
         # Marathi keywords mapping
@@ -102,6 +197,7 @@ class MarathiLexer:
             'लांबी': TokenType.LAMBI,
             'संख्या': TokenType.SANKHYA,
             'सुशोभित': TokenType.SHUSHOBHIT,
+            'श्रेणी': TokenType.SHRENI,
             'आणि': TokenType.ANI,
             'किंवा': TokenType.KINVA,
             'नाही': TokenType.NAHI,
@@ -125,8 +221,8 @@ class MarathiLexer:
             (r'/\*.*?\*/', None),
             
             # Numbers (Marathi and Arabic)
-            (r'[०-९]+(\.[०-९]+)?', 'MARATHI_NUMBER'),
-            (r'[0-9]+(\.[0-9]+)?', 'ARABIC_NUMBER'),
+            (r'[०-९]+(?:\.[०-९]+)?', 'MARATHI_NUMBER'),
+            (r'[0-9]+(?:\.[0-9]+)?', 'ARABIC_NUMBER'),
             
             # Strings
             (r'"[^"]*"', 'STRING'),
@@ -156,6 +252,7 @@ class MarathiLexer:
             (r'\[', 'LBRACKET'),
             (r'\]', 'RBRACKET'),
             (r',', 'COMMA'),
+            (r'\.', 'DOT'),
             (r';', 'SEMICOLON'),
             (r'\n', 'NEWLINE'),
             
@@ -172,6 +269,49 @@ class MarathiLexer:
             (re.compile(pattern, re.MULTILINE), token_type)
             for pattern, token_type in self.token_patterns
         ]
+        
+        # Master regex: every pattern above becomes one capturing alternative,
+        # in the same order, so the first alternative that matches wins just
+        # like the pattern loop in tokenize_legacy. The trailing catch-all
+        # alternative produces UNKNOWN tokens.
+        self.master_pattern = re.compile(
+            '|'.join(f'({pattern})' for pattern, _ in self.token_patterns) + '|(.)',
+            re.MULTILINE
+        )
+        
+        # Scanner actions indexed by match.lastindex (group 0 is unused)
+        self.scan_actions = [(SCAN_SKIP, None)]
+        for _, token_type in self.token_patterns:
+            self.scan_actions.append(self._scan_action(token_type))
+        self.scan_actions.append((SCAN_EMIT, TokenType.UNKNOWN))
+        
+        # Keyword table: word -> (token type, token value)
+        self.keyword_table = {}
+        for word, token_type in self.keywords.items():
+            if token_type == TokenType.BOOLEAN:
+                self.keyword_table[word] = (token_type, word == 'सत्य')
+            elif token_type == TokenType.NULL:
+                self.keyword_table[word] = (token_type, None)
+            else:
+                self.keyword_table[word] = (token_type, word)
+        
+        self.numeral_table = str.maketrans(self.marathi_to_arabic)
+    
+    def _scan_action(self, token_type: Optional[str]) -> tuple:
+        """Precompute the scanner action for a token pattern"""
+        if token_type is None:
+            return (SCAN_SKIP, None)
+        if token_type == 'NEWLINE':
+            return (SCAN_NEWLINE, TokenType.NEWLINE)
+        if token_type == 'MARATHI_NUMBER':
+            return (SCAN_MARATHI_NUMBER, TokenType.NUMBER)
+        if token_type == 'ARABIC_NUMBER':
+            return (SCAN_ARABIC_NUMBER, TokenType.NUMBER)
+        if token_type == 'STRING':
+            return (SCAN_STRING, TokenType.STRING)
+        if token_type == 'IDENTIFIER':
+            return (SCAN_IDENTIFIER, TokenType.IDENTIFIER)
+        return (SCAN_EMIT, getattr(TokenType, token_type, TokenType.UNKNOWN))
     
     def convert_marathi_number(self, marathi_num: str) -> str:
         """Convert Marathi numerals to Arabic numerals"""
@@ -186,6 +326,106 @@ class MarathiLexer:
     def tokenize(self, text: str) -> List[Token]:
         """Tokenize the input text into a list of tokens"""
         tokens = []
+        append = tokens.append
+        actions = self.scan_actions
+        keywords = self.keyword_table
+        numerals = self.numeral_table
+        line = 1
+        line_start = 0
+        
+        # Every position is matched by some alternative (the last one is a
+        # catch-all), so finditer walks the text without gaps.
+        for match in self.master_pattern.finditer(text):
+            action, token_type = actions[match.lastindex]
+            if action == SCAN_SKIP:
+                continue
+            
+            value = match.group()
+            column = match.start() - line_start + 1
+            if action == SCAN_EMIT:
+                append(Token(token_type, value, line, column))
+            elif action == SCAN_IDENTIFIER:
+                keyword = keywords.get(value)
+                if keyword is None:
+                    append(Token(token_type, value, line, column))
+                else:
+                    append(Token(keyword[0], keyword[1], line, column))
+            elif action == SCAN_NEWLINE:
+                append(Token(token_type, value, line, column))
+                # tokenize_legacy resets the column to 1 and then adds the
+                # newline's own width, so later lines start at column 2.
+                line += 1
+                line_start = match.start()
+            elif action == SCAN_STRING:
+                append(Token(token_type, value[1:-1], line, column))
+            else:
+                if action == SCAN_MARATHI_NUMBER:
+                    value = value.translate(numerals)
+                numeric_value = float(value) if '.' in value else int(value)
+                append(Token(token_type, numeric_value, line, column))
+        
+        tokens.append(Token(TokenType.EOF, None, line, len(text) - line_start + 1))
+        return tokens
+    
+    def scan_match(self, match: Any) -> Optional[tuple]:
+        """Turn a master_pattern match into (token type, value), or None if skipped"""
+        action, token_type = self.scan_actions[match.lastindex]
+        if action == SCAN_SKIP:
+            return None
+        value = match.group()
+        if action == SCAN_IDENTIFIER:
+            return self.keyword_table.get(value) or (token_type, value)
+        if action == SCAN_STRING:
+            return (token_type, value[1:-1])
+        if action == SCAN_MARATHI_NUMBER or action == SCAN_ARABIC_NUMBER:
+            value = value.translate(self.numeral_table)
+            return (token_type, float(value) if '.' in value else int(value))
+        return (token_type, value)
+    
+    def tokenize_compact(self, text: str) -> TokenBuffer:
+        """Tokenize the input text straight into a TokenBuffer"""
+        buffer = TokenBuffer()
+        add_kind = buffer.kinds.append
+        add_line = buffer.lines.append
+        add_column = buffer.columns.append
+        add_value = buffer.value_ids.append
+        intern = buffer.intern
+        actions = self.scan_actions
+        keywords = self.keyword_table
+        numerals = self.numeral_table
+        line = 1
+        line_start = 0
+        
+        for match in self.master_pattern.finditer(text):
+            action, token_type = actions[match.lastindex]
+            if action == SCAN_SKIP:
+                continue
+            
+            value = match.group()
+            add_line(line)
+            add_column(match.start() - line_start + 1)
+            if action == SCAN_IDENTIFIER:
+                keyword = keywords.get(value)
+                if keyword is not None:
+                    token_type, value = keyword
+            elif action == SCAN_NEWLINE:
+                line += 1
+                line_start = match.start()
+            elif action == SCAN_STRING:
+                value = value[1:-1]
+            elif action != SCAN_EMIT:
+                if action == SCAN_MARATHI_NUMBER:
+                    value = value.translate(numerals)
+                value = float(value) if '.' in value else int(value)
+            add_kind(token_type)
+            add_value(intern(value))
+        
+        buffer.append(TokenType.EOF, None, line, len(text) - line_start + 1)
+        return buffer
+    
+    def tokenize_legacy(self, text: str) -> List[Token]:
+        """Tokenize by trying each pattern in turn (original scanner, kept for benchmarking)"""
+        tokens = []
         line = 1
         column = 1
         pos = 0
@@ -248,6 +488,108 @@ class MarathiLexer:
         tokens.append(Token(TokenType.EOF, None, line, column))
         return tokens
     
+    def iter_tokens(self, stream: Any, chunk_size: int = 64 * 1024) -> Iterator[Token]:
+        """Lazily tokenize a file object, mmap or bytes buffer in chunks"""
+        read = self._chunk_reader(stream, chunk_size)
+        actions = self.scan_actions
+        keywords = self.keyword_table
+        numerals = self.numeral_table
+        pattern = self.master_pattern
+        
+        buffer = ''
+        pos = 0
+        limit = 0           # end of the last complete line in buffer
+        at_eof = False
+        line = 1
+        line_start = 0      # relative to buffer, may go negative
+        
+        while True:
+            match = pattern.match(buffer, pos) if pos < len(buffer) else None
+            
+            if not at_eof and (match is None or not self._is_final(match, actions, limit)):
+                # The token may continue in the next chunk: drop the consumed
+                # prefix and append more text before matching again.
+                chunk = read()
+                if chunk:
+                    buffer = buffer[pos:] + chunk
+                    line_start -= pos
+                    pos = 0
+                    limit = buffer.rfind('\n') + 1
+                else:
+                    at_eof = True
+                continue
+            
+            if match is None:
+                break
+            
+            pos = match.end()
+            action, token_type = actions[match.lastindex]
+            if action == SCAN_SKIP:
+                continue
+            
+            value = match.group()
+            column = match.start() - line_start + 1
+            if action == SCAN_EMIT:
+                yield Token(token_type, value, line, column)
+            elif action == SCAN_IDENTIFIER:
+                keyword = keywords.get(value)
+                if keyword is None:
+                    yield Token(token_type, value, line, column)
+                else:
+                    yield Token(keyword[0], keyword[1], line, column)
+            elif action == SCAN_NEWLINE:
+                yield Token(token_type, value, line, column)
+                line += 1
+                line_start = match.start()
+            elif action == SCAN_STRING:
+                yield Token(token_type, value[1:-1], line, column)
+            else:
+                if action == SCAN_MARATHI_NUMBER:
+                    value = value.translate(numerals)
+                numeric_value = float(value) if '.' in value else int(value)
+                yield Token(token_type, numeric_value, line, column)
+        
+        yield Token(TokenType.EOF, None, line, len(buffer) - line_start + 1)
+    
+    def _is_final(self, match: Any, actions: list, limit: int) -> bool:
+        """Check whether a match near the end of the buffer can't grow with more input"""
+        action, token_type = actions[match.lastindex]
+        if action == SCAN_STRING:
+            # The closing quote is already in the buffer
+            return True
+        if match.end() > limit:
+            # Every other token stays on one line, so it is only complete
+            # once the newline that ends its line has been read
+            return False
+        # A lone quote becomes UNKNOWN only if no closing quote follows
+        # anywhere in the rest of the input
+        return not (token_type == TokenType.UNKNOWN and match.group() in '"\'')
+    
+    def _chunk_reader(self, stream: Any, chunk_size: int):
+        """Return a function that reads the next decoded text chunk ('' at EOF)"""
+        if isinstance(stream, str):
+            stream = io.StringIO(stream)
+        elif isinstance(stream, (bytes, bytearray, memoryview)):
+            stream = io.BytesIO(stream)
+        
+        # Binary sources (binary files, mmap) are decoded incrementally so
+        # multi-byte characters may straddle chunks; newlines are translated
+        # the same way open(..., 'r') does.
+        decoder = io.IncrementalNewlineDecoder(
+            codecs.getincrementaldecoder('utf-8')(), translate=True
+        )
+        
+        def read() -> str:
+            while True:
+                data = stream.read(chunk_size)
+                if isinstance(data, str):
+                    return data
+                text = decoder.decode(data, final=not data)
+                if text or not data:
+                    return text
+        
+        return read
+    
     def format_tokens(self, tokens: List[Token]) -> str:
         """Format tokens for debugging"""
         result = []
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MarathiLang Limits - Bounds on what one execution may use
+मराठी भाषा मर्यादा - एका अंमलबजावणीला किती संसाधने वापरता येतील
+
+Limits holds the most steps, seconds, call depth and allocated bytes a
+program may use; MarathiEvaluator.set_limits enforces them with a
+Governor, which is reset at the start of every program. Steps are
+counted where a program can run for ever, at loop back-edges and calls,
+and the clock is only read every CHECK_INTERVAL steps. Allocated bytes
+are the approximate sizes of all lists and strings the program makes,
+counted when they are made, including ones it drops again. A program
+that goes over a limit stops with LimitExceeded, a RuntimeError with a
+Marathi message.
+"""
+
+import sys
+from array import array
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Any, Optional
+
+from .storage import CompactList
+from .vector import Vector
+
+STEPS = 'steps'
+TIME = 'time'
+DEPTH = 'depth'
+MEMORY = 'memory'
+
+# Steps between looks at the clock
+CHECK_INTERVAL = 100
+
+MESSAGES = {
+    STEPS: "पायऱ्यांची मर्यादा ओलांडली: {} पेक्षा जास्त पायऱ्या",
+    TIME: "वेळेची मर्यादा ओलांडली: {} सेकंदांपेक्षा जास्त",
+    DEPTH: "कार्य कॉलच्या खोलीची मर्यादा ओलांडली: {} पेक्षा जास्त",
+    MEMORY: "स्मृतीची मर्यादा ओलांडली: {} बाइट्सपेक्षा जास्त",
+}
+
+# Suffixes of parse_size
+UNITS = {'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30}
+
+class LimitExceeded(RuntimeError):
+    """A program went over one of its Limits; `kind` says which"""
+
+    def __init__(self, kind: str, limit: Any):
+        super().__init__(MESSAGES[kind].format(limit))
+        self.kind = kind
+        self.limit = limit
+
+@dataclass(frozen=True)
+class Limits:
+    """Most a program may use; None means no limit
+
+    A step is one loop iteration or one call of a कार्य.
+    """
+    max_steps: Optional[int] = None
+    max_seconds: Optional[float] = None
+    max_depth: Optional[int] = None
+    max_bytes: Optional[int] = None
+
+    def __post_init__(self):
+        for name in ('max_steps', 'max_seconds', 'max_depth', 'max_bytes'):
+            value = getattr(self, name)
+            if value is not None and value <= 0:
+                raise ValueError(f'{name} must be positive, not {value}')
+
+def parse_size(text: str) -> int:
+    """Bytes in a size such as '4096', '512K', '64M' or '1G'"""
+    text = text.strip().upper()
+    scale = UNITS.get(text[-1:], 1)
+    if scale != 1:
+        text = text[:-1]
+    return int(float(text) * scale)
+
+def size_of(value: Any) -> int:
+    """Approximate bytes of a list or string, 0 for anything else"""
+    if type(value) is str or type(value) is list or type(value) is array:
+        return sys.getsizeof(value)
+    if type(value) is CompactList:
+        return sys.getsizeof(value.items)
+    if type(value) is Vector:
+        return sys.getsizeof(value.data)
+    return 0
+
+class Governor:
+    """Counts what the current program has used and stops it at its Limits"""
+
+    def __init__(self, limits: Limits):
+        self.limits = limits
+        self.start()
+
+    def start(self):
+        """Begin a new execution with nothing used"""
+        limits = self.limits
+        # Steps counted up to the last check; `countdown` more steps
+        # until the next check, out of an interval of `interval`
+        self.steps = 0
+        self.interval = self.countdown = self.next_interval()
+        self.allocated = 0
+        self.deadline = None
+        if limits.max_seconds is not None:
+            self.deadline = perf_counter() + limits.max_seconds
+
+    def next_interval(self) -> int:
+        max_steps = self.limits.max_steps
+        if max_steps is None:
+            return CHECK_INTERVAL
+        # Check exactly when the step after the last allowed one is taken
+        return min(CHECK_INTERVAL, max_steps - self.steps + 1)
+
+    def used_steps(self) -> int:
+        return self.steps + self.interval - self.countdown
+
+    def step(self):
+        """One loop iteration or call"""
+        self.countdown -= 1
+        if self.countdown <= 0:
+            self.check()
+
+    def check(self):
+        self.steps += self.interval
+        # Until the checks pass; a program that is stopped stays stopped
+        self.interval = 0
+        limits = self.limits
+        if limits.max_steps is not None and self.steps > limits.max_steps:
+            raise LimitExceeded(STEPS, limits.max_steps)
+        if self.deadline is not None and perf_counter() > self.deadline:
+            raise LimitExceeded(TIME, limits.max_seconds)
+        self.interval = self.countdown = self.next_interval()
+
+    def call(self, depth: int):
+        """A call that makes `depth` calls active"""
+        max_depth = self.limits.max_depth
+        if max_depth is not None and depth > max_depth:
+            raise LimitExceeded(DEPTH, max_depth)
+        self.step()
+
+    def allocate(self, value: Any):
+        """Count a list or string that was just made"""
+        self.add_bytes(size_of(value))
+
+    def combine(self, operator: str, left: Any, right: Any):
+        """Count the list or string `left operator right` is about to make
+
+        Counted before it is made, so that repeating a long list or
+        string very many times fails without using the memory first.
+        """
+        left_size, right_size = size_of(left), size_of(right)
+        if not (left_size or right_size):
+            return
+        # Vectors multiply element by element; lists and strings repeat
+        if operator == '*' and type(right) is int and type(left) is not Vector:
+            self.add_bytes(left_size * max(right, 0))
+        elif operator == '*' and type(left) is int and type(right) is not Vector:
+            self.add_bytes(right_size * max(left, 0))
+        else:
+            self.add_bytes(left_size + right_size)
+
+    def add_bytes(self, size: int):
+        self.allocated += size
+        max_bytes = self.limits.max_bytes
+        if max_bytes is not None and self.allocated > max_bytes:
+            raise LimitExceeded(MEMORY, max_bytes)
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MarathiLang Memoizer - Remembers the results of pure functions
+मराठी भाषा स्मरण - शुद्ध कार्यांचे निकाल लक्षात ठेवतो
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, List, Set
+
+from .parser import *
+from .sequences import Range
+
+# Results kept per function before the least recently used is dropped
+DEFAULT_MEMO_SIZE = 4096
+
+# Immutable values a call can be cached on; ranges are keyed by their bounds
+VALUE_TYPES = (int, bool, str, type(None))
+
+def argument_key(arguments: List[Any]) -> tuple:
+    """Cache key for a call; raises TypeError unless every argument is a value
+
+    Lists and vectors can change, and iterators such as the lines of
+    प्रवेश.ओळी are used up by the call, so calls with anything but
+    numbers, strings, सत्य/असत्य, शून्य and ranges always run. The type
+    is part of the key because 1, 1.0 and सत्य are equal in Python but
+    print differently. Floats are keyed by repr so that 0.0 and -0.0
+    stay apart.
+    """
+    key = []
+    for argument in arguments:
+        kind = type(argument)
+        if kind is float:
+            key.append((kind, repr(argument)))
+        elif kind in VALUE_TYPES:
+            key.append((kind, argument))
+        elif kind is Range:
+            key.append((kind, argument_key([argument.start, argument.stop, argument.step])))
+        else:
+            raise TypeError(f'{kind.__name__} arguments are not cached')
+    return tuple(key)
+
+def block_is_pure(statements: List[ASTNode], assigned: Set[str], calls: Set[str],
+                  allow_print: bool = False) -> bool:
+    """Whether a block only reads names it has certainly assigned
+
+    Assignments made inside a nested block may not happen, so they count
+    only within that block. Names of called functions go into calls.
+    """
+    assigned = set(assigned)
+    for statement in statements:
+        if isinstance(statement, AssignmentNode):
+            # स्थिर checks whether the name exists in the caller
+            if statement.is_constant or not expression_is_pure(statement.value, assigned, calls):
+                return False
+            assigned.add(statement.name)
+        elif isinstance(statement, IfNode):
+            if not (expression_is_pure(statement.condition, assigned, calls)
+                    and block_is_pure(statement.then_branch, assigned, calls, allow_print)
+                    and block_is_pure(statement.else_branch or [], assigned, calls, allow_print)):
+                return False
+        elif isinstance(statement, WhileNode):
+            if not (expression_is_pure(statement.condition, assigned, calls)
+                    and block_is_pure(statement.body, assigned, calls, allow_print)):
+                return False
+        elif isinstance(statement, ForEachNode):
+            if not (expression_is_pure(statement.iterable, assigned, calls)
+                    and block_is_pure(statement.body, assigned | {statement.variable}, calls,
+                                      allow_print)):
+                return False
+        elif isinstance(statement, ReturnNode):
+            if statement.value and not expression_is_pure(statement.value, assigned, calls):
+                return False
+        elif isinstance(statement, PrintNode):
+            if not allow_print:
+                return False
+            for argument in statement.arguments:
+                if not expression_is_pure(argument, assigned, calls):
+                    return False
+        elif isinstance(statement, FunctionDefNode):
+            return False
+        elif isinstance(statement, (BreakNode, ContinueNode)):
+            pass
+        elif not expression_is_pure(statement, assigned, calls):
+            return False
+    return True
+
+def expression_is_pure(node: ASTNode, assigned: Set[str], calls: Set[str]) -> bool:
+    pending = [node]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, (NumberNode, StringNode, BooleanNode, NullNode)):
+            continue
+        elif isinstance(node, IdentifierNode):
+            # Anything else comes from the caller's variables
+            if node.name not in assigned:
+                return False
+        elif isinstance(node, BinaryOpNode):
+            pending.extend((node.left, node.right))
+        elif isinstance(node, UnaryOpNode):
+            pending.append(node.operand)
+        elif isinstance(node, ArrayNode):
+            pending.extend(node.elements)
+        elif isinstance(node, IndexNode):
+            pending.extend((node.array, node.index))
+        elif isinstance(node, FunctionCallNode):
+            calls.add(node.name)
+            pending.extend(node.arguments)
+        else:
+            return False
+    return True
+
+class PurityAnalyzer:
+    """Decides which functions depend on nothing but their arguments
+
+    A function is pure when it does not print, define functions, use
+    स्थिर, or read a variable it has not assigned itself (which would
+    come from its caller), and every function it calls is pure too.
+    With allow_print, printing is allowed. Which function a call reaches
+    depends on the definitions seen so far, so invalidate() must be
+    called whenever a function is defined.
+    """
+
+    def __init__(self, functions: Dict[str, FunctionDefNode], allow_print: bool = False):
+        self.functions = functions
+        self.allow_print = allow_print
+        # id(FunctionDefNode) -> (node, verdict)
+        self.verdicts: Dict[int, tuple] = {}
+
+    def invalidate(self):
+        self.verdicts.clear()
+
+    def is_pure(self, function: FunctionDefNode) -> bool:
+        entry = self.verdicts.get(id(function))
+        if entry is None or entry[0] is not function:
+            self.analyze(function)
+            entry = self.verdicts[id(function)]
+        return entry[1]
+
+    def analyze(self, function: FunctionDefNode):
+        """Decide a function and every function it can call
+
+        Functions still being decided are assumed pure, so recursion
+        does not make a function impure by itself. If anything reachable
+        turns out impure, only the function asked about is marked; the
+        others are decided when they are asked about.
+        """
+        group: Dict[int, FunctionDefNode] = {}
+        pending = [function]
+        pure = True
+        while pending and pure:
+            node = pending.pop()
+            if id(node) in group:
+                continue
+            entry = self.verdicts.get(id(node))
+            if entry is not None and entry[0] is node:
+                pure = entry[1]
+                continue
+            group[id(node)] = node
+            calls: Set[str] = set()
+            pure = block_is_pure(node.body, set(node.parameters), calls, self.allow_print)
+            for name in calls:
+                callee = self.functions.get(name)
+                if callee is None:
+                    pure = False
+                    break
+                pending.append(callee)
+        if not pure:
+            self.verdicts[id(function)] = (function, False)
+            return
+        for key, node in group.items():
+            self.verdicts[key] = (node, True)
+
+class Memoizer:
+    """Result caches for the pure functions of one evaluator"""
+
+    def __init__(self, functions: Dict[str, FunctionDefNode], size: int = DEFAULT_MEMO_SIZE):
+        self.analyzer = PurityAnalyzer(functions)
+        self.size = size
+        # id(FunctionDefNode) -> (node, result cache or None if impure)
+        self.tables: Dict[int, tuple] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def invalidate(self):
+        self.analyzer.invalidate()
+        self.tables.clear()
+
+    def table(self, function: FunctionDefNode) -> Any:
+        """Result cache of a function, or None if it is not pure"""
+        entry = self.tables.get(id(function))
+        if entry is None or entry[0] is not function:
+            entry = (function, OrderedDict() if self.analyzer.is_pure(function) else None)
+            self.tables[id(function)] = entry
+        return entry[1]
+
+    def lookup(self, function: FunctionDefNode, arguments: List[Any]) -> tuple:
+        """(result cache, key) for a call, or (None, None) if it cannot be cached
+
+        The caller checks `key in results`, returns reuse(results, key)
+        if so, and otherwise runs the function and calls remember().
+        """
+        results = self.table(function)
+        if results is None:
+            return None, None
+        try:
+            key = argument_key(arguments)
+        except TypeError:
+            return None, None
+        if key in results:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return results, key
+
+    def reuse(self, results: OrderedDict, key: tuple) -> Any:
+        results.move_to_end(key)
+        return results[key]
+
+    def remember(self, results: OrderedDict, key: tuple, value: Any):
+        results[key] = value
+        if len(results) > self.size:
+            results.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        cached = sum(len(entry[1]) for entry in self.tables.values() if entry[1] is not None)
+        return {'hits': self.hits, 'misses': self.misses, 'cached': cached}
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MarathiLang Optimizer - Simplifies a parsed program before it runs
+मराठी भाषा ऑप्टिमायझर - चालवण्यापूर्वी प्रोग्राम सोपा करतो
+"""
+
+from collections import Counter
+from dataclasses import fields
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .parser import *
+
+CONSTANT_NODES = (NumberNode, StringNode, BooleanNode, NullNode)
+
+# Longest string or list a fold may create; `"-" * 100000` stays in the source
+MAX_FOLDED_LENGTH = 4096
+
+# Kinds of statement blocks
+PROGRAM = 'program'
+FUNCTION = 'function'
+BRANCH = 'branch'
+LOOP = 'loop'
+
+def constant_value(node: ASTNode) -> Any:
+    return None if isinstance(node, NullNode) else node.value
+
+def constant_node(value: Any) -> Optional[ASTNode]:
+    """Node for a folded value, or None if it has no literal form"""
+    if value is None:
+        return NullNode()
+    if isinstance(value, bool):
+        return BooleanNode(value)
+    if isinstance(value, (int, float)):
+        return NumberNode(value)
+    if isinstance(value, str) and len(value) <= MAX_FOLDED_LENGTH:
+        return StringNode(value)
+    return None
+
+def binary_value(operator: str, left: Any, right: Any) -> Any:
+    """Compute a binary operation exactly as MarathiEvaluator does"""
+    if operator == '+':
+        return left + right
+    elif operator == '-':
+        return left - right
+    elif operator == '*':
+        # Do not build huge strings at compile time
+        for count, other in ((left, right), (right, left)):
+            if isinstance(other, str) and isinstance(count, int) and count * len(other) > MAX_FOLDED_LENGTH:
+                raise OverflowError('folded string too long')
+        return left * right
+    elif operator == '/':
+        if right == 0:
+            raise RuntimeError("Division by zero")
+        return left / right
+    elif operator == '%':
+        return left % right
+    elif operator == '==':
+        return left == right
+    elif operator == '!=':
+        return left != right
+    elif operator == '<':
+        return left < right
+    elif operator == '>':
+        return left > right
+    elif operator == '<=':
+        return left <= right
+    elif operator == '>=':
+        return left >= right
+    elif operator == 'आणि':
+        return left and right
+    elif operator == 'किंवा':
+        return left or right
+    raise RuntimeError(f"Unknown binary operator: {operator}")
+
+def unary_value(operator: str, operand: Any) -> Any:
+    if operator == 'नाही':
+        return not operand
+    elif operator == '-':
+        return -operand
+    return None
+
+def post_order(root: ASTNode) -> Iterator[ASTNode]:
+    """Yield every node below and including root, children before parents
+
+    Iterative, so that deeply nested programs (which the parser accepts)
+    do not hit Python's recursion limit.
+    """
+    pending: List[Tuple[ASTNode, bool]] = [(root, False)]
+    while pending:
+        node, expanded = pending.pop()
+        if expanded:
+            yield node
+            continue
+        pending.append((node, True))
+        for field in reversed(fields(node)):
+            value = getattr(node, field.name)
+            if isinstance(value, ASTNode):
+                pending.append((value, False))
+            elif isinstance(value, list):
+                pending.extend((item, False) for item in reversed(value) if isinstance(item, ASTNode))
+
+def blocks(node: ASTNode) -> List[Tuple[List[ASTNode], str]]:
+    """Statement lists directly owned by a node, with their kind"""
+    if isinstance(node, ProgramNode):
+        return [(node.statements, PROGRAM)]
+    if isinstance(node, FunctionDefNode):
+        return [(node.body, FUNCTION)]
+    if isinstance(node, IfNode):
+        if node.else_branch is None:
+            return [(node.then_branch, BRANCH)]
+        return [(node.then_branch, BRANCH), (node.else_branch, BRANCH)]
+    if isinstance(node, (WhileNode, ForEachNode)):
+        return [(node.body, LOOP)]
+    return []
+
+def has_direct(statements: List[ASTNode], node_type: type) -> bool:
+    return any(isinstance(statement, node_type) for statement in statements)
+
+class FoldConstants:
+    """Replace operators whose operands are all literals by their result
+
+    An operation that fails (division by zero, `"अ" - 1`, ...) is left in
+    place, so the program still fails at the same point when it runs.
+    """
+
+    name = 'fold'
+
+    def run(self, program: ProgramNode, stats: Counter):
+        for node in post_order(program):
+            for field in fields(node):
+                value = getattr(node, field.name)
+                if isinstance(value, ASTNode):
+                    folded = self.fold(value)
+                    if folded is not None:
+                        setattr(node, field.name, folded)
+                        stats['folded'] += 1
+                elif isinstance(value, list):
+                    for index, item in enumerate(value):
+                        folded = self.fold(item) if isinstance(item, ASTNode) else None
+                        if folded is not None:
+                            value[index] = folded
+                            stats['folded'] += 1
+
+    def fold(self, node: ASTNode) -> Optional[ASTNode]:
+        """Literal node for a constant operation, or None"""
+        folded = None
+        try:
+            if isinstance(node, BinaryOpNode):
+                if isinstance(node.left, CONSTANT_NODES) and isinstance(node.right, CONSTANT_NODES):
+                    folded = constant_node(binary_value(node.operator, constant_value(node.left),
+                                                        constant_value(node.right)))
+            elif isinstance(node, UnaryOpNode):
+                if isinstance(node.operand, CONSTANT_NODES):
+                    folded = constant_node(unary_value(node.operator, constant_value(node.operand)))
+        except Exception:
+            pass
+        if folded is not None:
+            # The literal stands where the operation was written
+            folded.line, folded.column = node.line, node.column
+        return folded
+
+class PruneBranches:
+    """Decide जर and जोपर्यंत statements whose condition is a literal
+
+    The branch that cannot run is dropped. The branch that runs replaces
+    the whole statement when that cannot change what its statements do:
+    it must not contain a परत of its own, and in a function body it must
+    not contain an if statement, since a function returns the value of
+    an if statement directly in its body. The last statement of a
+    program is kept, because its value is the program's result.
+    """
+
+    name = 'branches'
+
+    def run(self, program: ProgramNode, stats: Counter):
+        for node in post_order(program):
+            for statements, kind in blocks(node):
+                statements[:] = self.block(statements, kind, stats)
+
+    def block(self, statements: List[ASTNode], kind: str, stats: Counter) -> List[ASTNode]:
+        result = []
+        for position, statement in enumerate(statements):
+            keep = kind == PROGRAM and position == len(statements) - 1
+            if isinstance(statement, IfNode) and isinstance(statement.condition, CONSTANT_NODES):
+                taken = statement.then_branch if constant_value(statement.condition) else statement.else_branch or []
+                if not keep and not has_direct(taken, ReturnNode) \
+                        and not (kind == FUNCTION and has_direct(taken, IfNode)):
+                    result.extend(taken)
+                    stats['inlined' if taken else 'removed'] += 1
+                    continue
+                if statement.else_branch:
+                    statement.condition = BooleanNode(True, statement.condition.line,
+                                                      statement.condition.column)
+                    statement.then_branch = taken
+                    statement.else_branch = None
+                    stats['pruned'] += 1
+            elif isinstance(statement, WhileNode) and isinstance(statement.condition, CONSTANT_NODES) \
+                    and not constant_value(statement.condition) and not keep:
+                stats['removed'] += 1
+                continue
+            result.append(statement)
+        return result
+
+class RemoveDeadCode:
+    """Drop statements after a परत that ends a function body or an if branch
+
+    परत inside a loop body or at the top level does not stop anything, so
+    those blocks are left alone.
+    """
+
+    name = 'dead-code'
+
+    def run(self, program: ProgramNode, stats: Counter):
+        for node in post_order(program):
+            for statements, kind in blocks(node):
+                if kind not in (FUNCTION, BRANCH):
+                    continue
+                for position, statement in enumerate(statements):
+                    if isinstance(statement, ReturnNode):
+                        if position + 1 < len(statements):
+                            stats['removed'] += len(statements) - position - 1
+                            del statements[position + 1:]
+                        break
+
+PASSES = {optimization.name: optimization for optimization in (FoldConstants, PruneBranches, RemoveDeadCode)}
+
+class Optimizer:
+    """Runs a pipeline of passes over a ProgramNode and counts what each changed
+
+    The program is changed in place and also returned. Passes run in the
+    given order; the default is every pass in PASSES.
+    """
+
+    def __init__(self, passes: Optional[Sequence[str]] = None):
+        names = list(PASSES) if passes is None else list(passes)
+        for name in names:
+            if name not in PASSES:
+                raise ValueError(f"Unknown optimizer pass '{name}' (available: {', '.join(PASSES)})")
+        self.passes = [PASSES[name]() for name in names]
+        self.stats: Dict[str, Counter] = {name: Counter() for name in names}
+
+    def optimize(self, program: ProgramNode) -> ProgramNode:
+        for optimization in self.passes:
+            optimization.run(program, self.stats[optimization.name])
+        return program
+
+    def report(self) -> str:
+        lines = []
+        for name, counts in self.stats.items():
+            details = ', '.join(f'{event} {count}' for event, count in sorted(counts.items()))
+            lines.append(f'{name}: {details or "no changes"}')
+        return '\n'.join(lines)
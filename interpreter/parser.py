@@ -5,125 +5,308 @@ MarathiLang Parser - Generates AST from tokens
 मराठी भाषा पार्सर - टोकन्समधून AST तयार करतो
 """
 
-from typing import List, Optional, Union
-from dataclasses import dataclass
-from .lexer import Token, TokenType
+from array import array
+from functools import partial
+from typing import Iterable, List, Optional, Union
+from dataclasses import dataclass, field, fields
+from .lexer import Token, TokenType, TokenBuffer
+
+EOF = TokenType.EOF
+
+# Binding powers for the Pratt expression parser (higher binds tighter)
+BINARY_POWERS = {
+    TokenType.KINVA: 1,
+    TokenType.ANI: 2,
+    TokenType.EQUAL: 3,
+    TokenType.NOT_EQUAL: 3,
+    TokenType.GREATER: 4,
+    TokenType.GREATER_EQUAL: 4,
+    TokenType.LESS: 4,
+    TokenType.LESS_EQUAL: 4,
+    TokenType.PLUS: 5,
+    TokenType.MINUS: 5,
+    TokenType.MULTIPLY: 6,
+    TokenType.DIVIDE: 6,
+    TokenType.MODULO: 6,
+}
+UNARY_POWER = 7
+POSTFIX_POWER = 8
+INFIX_POWERS = dict(BINARY_POWERS)
+INFIX_POWERS[TokenType.LPAREN] = POSTFIX_POWER
+INFIX_POWERS[TokenType.LBRACKET] = POSTFIX_POWER
+INFIX_POWERS[TokenType.DOT] = POSTFIX_POWER
+
+# Bump when the parser reads the same tokens into different trees; the
+# .mrc cache (interpreter/cache.py) keys its entries on it
+GRAMMAR_VERSION = 1
+
+def slotted(cls):
+    """Recreate a dataclass with __slots__ for its fields
+
+    Same as dataclass(slots=True), which needs Python 3.10. Nodes then have
+    no per-instance __dict__, which keeps large ASTs noticeably smaller.
+    """
+    names = tuple(field.name for field in fields(cls))
+    namespace = {key: value for key, value in cls.__dict__.items()
+                 if key not in names and key not in ('__dict__', '__weakref__')}
+    namespace['__slots__'] = names
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+def positioned(cls):
+    """Give a node class `line` and `column` fields, after its own fields
+
+    They hold where the node's first token is in the source, 1-based like
+    Token.line and Token.column, or 0 for nodes not made by the parser.
+    They take no part in == or repr, so positions never make otherwise
+    equal trees differ.
+    """
+    cls.__annotations__ = dict(cls.__dict__.get('__annotations__', {}), line=int, column=int)
+    cls.line = field(default=0, compare=False, repr=False)
+    cls.column = field(default=0, compare=False, repr=False)
+    return cls
 
 # AST Node Classes
+@slotted
 @dataclass
 class ASTNode:
     """Base class for all AST nodes"""
     pass
 
+@slotted
 @dataclass
+@positioned
 class NumberNode(ASTNode):
     value: Union[int, float]
 
+@slotted
 @dataclass
+@positioned
 class StringNode(ASTNode):
     value: str
 
+@slotted
 @dataclass
+@positioned
 class BooleanNode(ASTNode):
     value: bool
 
+@slotted
 @dataclass
+@positioned
 class NullNode(ASTNode):
     pass
 
+@slotted
 @dataclass
+@positioned
 class IdentifierNode(ASTNode):
     name: str
 
+@slotted
 @dataclass
+@positioned
 class BinaryOpNode(ASTNode):
     left: ASTNode
     operator: str
     right: ASTNode
 
+@slotted
 @dataclass
+@positioned
 class UnaryOpNode(ASTNode):
     operator: str
     operand: ASTNode
 
+@slotted
 @dataclass
+@positioned
 class AssignmentNode(ASTNode):
     name: str
     value: ASTNode
     is_constant: bool = False
 
+@slotted
 @dataclass
+@positioned
 class FunctionDefNode(ASTNode):
     name: str
     parameters: List[str]
     body: List[ASTNode]
 
+@slotted
 @dataclass
+@positioned
 class FunctionCallNode(ASTNode):
     name: str
     arguments: List[ASTNode]
 
+@slotted
 @dataclass
+@positioned
 class IfNode(ASTNode):
     condition: ASTNode
     then_branch: List[ASTNode]
     else_branch: Optional[List[ASTNode]] = None
 
+@slotted
 @dataclass
+@positioned
 class WhileNode(ASTNode):
     condition: ASTNode
     body: List[ASTNode]
 
+@slotted
 @dataclass
+@positioned
 class ForEachNode(ASTNode):
     variable: str
     iterable: ASTNode
     body: List[ASTNode]
 
+@slotted
 @dataclass
+@positioned
 class ReturnNode(ASTNode):
     value: Optional[ASTNode] = None
 
+@slotted
 @dataclass
+@positioned
 class PrintNode(ASTNode):
     arguments: List[ASTNode]
 
+@slotted
 @dataclass
+@positioned
 class ArrayNode(ASTNode):
     elements: List[ASTNode]
 
+@slotted
 @dataclass
+@positioned
 class IndexNode(ASTNode):
     array: ASTNode
     index: ASTNode
 
+@slotted
 @dataclass
+@positioned
 class BreakNode(ASTNode):
     pass
 
+@slotted
 @dataclass
+@positioned
 class ContinueNode(ASTNode):
     pass
 
+@slotted
 @dataclass
+@positioned
 class ProgramNode(ASTNode):
     statements: List[ASTNode]
 
+class TokenLookahead:
+    """Indexable sliding window over a token iterator.
+
+    The parser only looks at the current and the previous token, so tokens
+    before that are discarded as parsing moves on and memory stays bounded
+    regardless of the script size.
+    """
+    
+    def __init__(self, tokens: Iterable[Token], window: int = 64):
+        self.source = iter(tokens)
+        self.buffer: List[Token] = []
+        self.base = 0           # token index of buffer[0]
+        self.window = window
+    
+    def __getitem__(self, index: int) -> Token:
+        offset = index - self.base
+        if offset < 0:
+            raise IndexError(f"token {index} has already been discarded")
+        
+        buffer = self.buffer
+        while offset >= len(buffer):
+            try:
+                buffer.append(next(self.source))
+            except StopIteration:
+                raise IndexError("token index out of range") from None
+        
+        token = buffer[offset]
+        if offset > self.window:
+            # Keep the token before `index` for previous()
+            del buffer[:offset - 1]
+            self.base = index - 1
+        return token
+    
+    @property
+    def kinds(self) -> 'LookaheadKinds':
+        return LookaheadKinds(self)
+
+class LookaheadKinds:
+    """Token kind view over a TokenLookahead, for MarathiParser.kinds"""
+    
+    def __init__(self, lookahead: TokenLookahead):
+        self.lookahead = lookahead
+    
+    def __getitem__(self, index: int) -> TokenType:
+        return self.lookahead[index].type
+
 class MarathiParser:
-    def __init__(self):
+    def __init__(self, print_errors: bool = True):
         self.tokens = []
+        self.kinds = array('B')
+        self.value_at = self.token_value
+        self.position_at = self.token_position
         self.current = 0
-    
-    def parse(self, tokens: List[Token]) -> ProgramNode:
-        """Parse tokens into an AST"""
-        self.tokens = tokens
-        self.current = 0
+        self.errors: List[str] = []
+        self.print_errors = print_errors
+        
+        # Dispatch tables keyed by the kind of the token that starts a
+        # statement, starts an expression, or follows a left operand
+        self.statement_rules = {
+            TokenType.CHAL: partial(self.variable_declaration, is_constant=False),
+            TokenType.STHIR: partial(self.variable_declaration, is_constant=True),
+            TokenType.KARYA: self.function_declaration,
+            TokenType.JAR: self.if_statement,
+            TokenType.JOPARYANT: self.while_statement,
+            TokenType.PRATYEKA: self.for_each_statement,
+            TokenType.PARAT: self.return_statement,
+            TokenType.MUDRAN: self.print_statement,
+        }
+        self.prefix_rules = {
+            TokenType.BOOLEAN: self.boolean_literal,
+            TokenType.NULL: self.null_literal,
+            TokenType.NUMBER: self.number_literal,
+            TokenType.STRING: self.string_literal,
+            TokenType.IDENTIFIER: self.identifier,
+            TokenType.LAMBI: self.builtin,
+            TokenType.SHRENI: self.builtin,
+            TokenType.LBRACKET: self.array_literal,
+            TokenType.LPAREN: self.grouping,
+            TokenType.NAHI: self.unary,
+            TokenType.MINUS: self.unary,
+        }
+        self.infix_rules = {token_type: self.binary for token_type in BINARY_POWERS}
+        self.infix_rules[TokenType.LPAREN] = self.call
+        self.infix_rules[TokenType.LBRACKET] = self.index
+        self.infix_rules[TokenType.DOT] = self.module_member
+    
+    def parse(self, tokens: Iterable[Token]) -> ProgramNode:
+        """Parse tokens into an AST
+
+        `tokens` is a token list, a TokenBuffer, or any token iterator, such
+        as MarathiLexer.iter_tokens, which is then consumed lazily.
+        """
+        self.load(tokens)
+        self.errors = []
+        
         
         statements = []
         while not self.is_at_end():
             # Skip newlines
             if self.check(TokenType.NEWLINE):
-                self.advance()
+                self.skip()
                 continue
             
             stmt = self.statement()
@@ -133,32 +316,64 @@ class MarathiParser:
         return ProgramNode(statements)
     
     def statement(self) -> Optional[ASTNode]:
-        """Parse a statement"""
-        try:
-            if self.match(TokenType.CHAL):
-                return self.variable_declaration(is_constant=False)
-            elif self.match(TokenType.STHIR):
-                return self.variable_declaration(is_constant=True)
-            elif self.match(TokenType.KARYA):
-                return self.function_declaration()
-            elif self.match(TokenType.JAR):
-                return self.if_statement()
-            elif self.match(TokenType.JOPARYANT):
-                return self.while_statement()
-            elif self.match(TokenType.PRATYEKA):
-                return self.for_each_statement()
-            elif self.match(TokenType.PARAT):
-                return self.return_statement()
-            elif self.match(TokenType.MUDRAN):
-                return self.print_statement()
-            else:
-                return self.expression_statement()
-        except Exception as e:
-            print(f"व्याकरण त्रुटी: {e}")
-            # Skip to next statement by advancing to next newline or EOF
-            while not self.check(TokenType.NEWLINE) and not self.is_at_end():
-                self.advance()
-            return None
+        """Parse a statement
+
+        A rule for a statement with a block parses its header up to the '{'
+        and returns a (close, state) continuation instead of parsing the
+        block itself. The block's statements are collected here, on an
+        explicit stack of open blocks, and at the closing '}' close(state,
+        body) returns the finished node or the continuation for an else
+        block. Nesting depth is therefore not limited by Python's stack.
+        Every statement gets the position of its first token.
+        """
+        blocks = []     # open blocks: (close, state, statements so far, position)
+        while True:
+            position = self.position_at(self.current)
+            try:
+                rule = self.statement_rules.get(self.kinds[self.current])
+                if rule is not None:
+                    self.skip()
+                    node = rule()
+                else:
+                    node = self.expression_statement()
+            except Exception as e:
+                node = self.recover(e)
+            
+            while True:
+                if type(node) is tuple:
+                    close, state = node
+                    blocks.append((close, state, [], position))
+                    node = None
+                elif node is not None:
+                    node.line, node.column = position
+                if not blocks:
+                    return node
+                if node is not None:
+                    blocks[-1][2].append(node)
+                
+                # Skip newlines, then either parse the next statement of the
+                # innermost block or close it
+                while self.check(TokenType.NEWLINE):
+                    self.skip()
+                if not self.check(TokenType.RBRACE) and not self.is_at_end():
+                    break
+                close, state, body, position = blocks.pop()
+                try:
+                    self.consume(TokenType.RBRACE, "'}' ची अपेक्षा")
+                    node = close(state, body)
+                except Exception as e:
+                    node = self.recover(e)
+    
+    def recover(self, error: Exception) -> None:
+        """Report a syntax error and skip to the next newline or EOF"""
+        message = f"व्याकरण त्रुटी: {error}"
+        self.errors.append(message)
+        if self.print_errors:
+            print(message)
+        # Skip to next statement by advancing to next newline or EOF
+        while not self.check(TokenType.NEWLINE) and not self.is_at_end():
+            self.skip()
+        return None
     
     def variable_declaration(self, is_constant: bool) -> AssignmentNode:
         """Parse variable declaration"""
@@ -167,7 +382,9 @@ class MarathiParser:
         value = self.expression()
         return AssignmentNode(name, value, is_constant)
     
-    def function_declaration(self) -> FunctionDefNode:
+    # Block statement rules: parse the header and the '{', and return the
+    # continuation that statement() calls with the block's statements
+    def function_declaration(self) -> tuple:
         """Parse function declaration"""
         name = self.consume(TokenType.IDENTIFIER, "कार्य नावाची अपेक्षा").value
         
@@ -181,68 +398,38 @@ class MarathiParser:
         
         self.consume(TokenType.RPAREN, "')' ची अपेक्षा")
         self.consume(TokenType.LBRACE, "'{' ची अपेक्षा")
-        
-        body = []
-        while not self.check(TokenType.RBRACE) and not self.is_at_end():
-            if self.check(TokenType.NEWLINE):
-                self.advance()
-                continue
-            stmt = self.statement()
-            if stmt:
-                body.append(stmt)
-        
-        self.consume(TokenType.RBRACE, "'}' ची अपेक्षा")
+        return self.finish_function, (name, parameters)
+    
+    def finish_function(self, header: tuple, body: List[ASTNode]) -> FunctionDefNode:
+        name, parameters = header
         return FunctionDefNode(name, parameters, body)
     
-    def if_statement(self) -> IfNode:
+    def if_statement(self) -> tuple:
         """Parse if statement"""
         condition = self.expression()
         self.consume(TokenType.LBRACE, "'{' ची अपेक्षा")
-        
-        then_branch = []
-        while not self.check(TokenType.RBRACE) and not self.is_at_end():
-            if self.check(TokenType.NEWLINE):
-                self.advance()
-                continue
-            stmt = self.statement()
-            if stmt:
-                then_branch.append(stmt)
-        
-        self.consume(TokenType.RBRACE, "'}' ची अपेक्षा")
-        
-        else_branch = None
+        return self.finish_then, condition
+    
+    def finish_then(self, condition: ASTNode, then_branch: List[ASTNode]) -> Union[IfNode, tuple]:
         if self.match(TokenType.NAHITAR):
             self.consume(TokenType.LBRACE, "'{' ची अपेक्षा")
-            else_branch = []
-            while not self.check(TokenType.RBRACE) and not self.is_at_end():
-                if self.check(TokenType.NEWLINE):
-                    self.advance()
-                    continue
-                stmt = self.statement()
-                if stmt:
-                    else_branch.append(stmt)
-            self.consume(TokenType.RBRACE, "'}' ची अपेक्षा")
-        
+            return self.finish_else, (condition, then_branch)
+        return IfNode(condition, then_branch, None)
+    
+    def finish_else(self, header: tuple, else_branch: List[ASTNode]) -> IfNode:
+        condition, then_branch = header
         return IfNode(condition, then_branch, else_branch)
     
-    def while_statement(self) -> WhileNode:
+    def while_statement(self) -> tuple:
         """Parse while statement"""
         condition = self.expression()
         self.consume(TokenType.LBRACE, "'{' ची अपेक्षा")
-        
-        body = []
-        while not self.check(TokenType.RBRACE) and not self.is_at_end():
-            if self.check(TokenType.NEWLINE):
-                self.advance()
-                continue
-            stmt = self.statement()
-            if stmt:
-                body.append(stmt)
-        
-        self.consume(TokenType.RBRACE, "'}' ची अपेक्षा")
+        return self.finish_while, condition
+    
+    def finish_while(self, condition: ASTNode, body: List[ASTNode]) -> WhileNode:
         return WhileNode(condition, body)
     
-    def for_each_statement(self) -> ForEachNode:
+    def for_each_statement(self) -> tuple:
         """Parse for each statement"""
         # Handle variable name - can be identifier or certain keywords used as identifiers
         if self.check(TokenType.IDENTIFIER):
@@ -255,17 +442,10 @@ class MarathiParser:
         self.consume(TokenType.MADHYE, "'मध्ये' ची अपेक्षा")
         iterable = self.expression()
         self.consume(TokenType.LBRACE, "'{' ची अपेक्षा")
-        
-        body = []
-        while not self.check(TokenType.RBRACE) and not self.is_at_end():
-            if self.check(TokenType.NEWLINE):
-                self.advance()
-                continue
-            stmt = self.statement()
-            if stmt:
-                body.append(stmt)
-        
-        self.consume(TokenType.RBRACE, "'}' ची अपेक्षा")
+        return self.finish_for_each, (variable, iterable)
+    
+    def finish_for_each(self, header: tuple, body: List[ASTNode]) -> ForEachNode:
+        variable, iterable = header
         return ForEachNode(variable, iterable, body)
     
     def return_statement(self) -> ReturnNode:
@@ -297,119 +477,154 @@ class MarathiParser:
         
         # Check for assignment
         if isinstance(expr, IdentifierNode) and self.check(TokenType.ASSIGN):
-            self.advance()  # consume '='
+            self.skip()  # consume '='
             value = self.expression()
             return AssignmentNode(expr.name, value, False)
         
         # Skip semicolons if present
         if self.check(TokenType.SEMICOLON):
-            self.advance()
+            self.skip()
         return expr
     
-    def expression(self) -> ASTNode:
-        """Parse expression"""
-        return self.logical_or()
+    def expression(self, min_power: int = 0) -> ASTNode:
+        """Parse expression whose operators bind tighter than min_power (Pratt parser)
+
+        Rules that need a sub-expression do not call expression() again:
+        they return a (resume, state, power) continuation, the operand is
+        parsed at that binding power, and resume(state, operand) returns
+        the finished node or another continuation. Suspended rules are kept
+        on an explicit stack, so nesting depth is limited only by memory.
+        
+        A node gets the position of its first token, which for an operator
+        or a call is the first token of its left operand. A parenthesized
+        expression keeps the position of what is inside the parentheses.
+        """
+        kinds = self.kinds
+        prefix_rules = self.prefix_rules
+        infix_rules = self.infix_rules
+        position_at = self.position_at
+        suspended = []      # (resume, state, binding power to return to, position)
+        power = min_power
+        while True:
+            rule = prefix_rules.get(kinds[self.current])
+            if rule is None:
+                raise RuntimeError(f"अनपेक्षित टोकन: {self.peek().value}")
+            position = position_at(self.current)
+            self.skip()
+            expr = rule()
+            
+            while True:
+                if type(expr) is tuple:
+                    resume, state, operand_power = expr
+                    suspended.append((resume, state, power, position))
+                    power = operand_power
+                    break
+                if not expr.line:
+                    expr.line, expr.column = position
+                kind = kinds[self.current]
+                infix_power = INFIX_POWERS.get(kind)
+                if infix_power is not None and infix_power > power:
+                    self.skip()
+                    expr = infix_rules[kind](expr)
+                elif suspended:
+                    resume, state, power, position = suspended.pop()
+                    expr = resume(state, expr)
+                else:
+                    return expr
+    
+    # Prefix rules: called after the token that starts the expression
+    def boolean_literal(self) -> BooleanNode:
+        return BooleanNode(self.previous_value())
+    
+    def null_literal(self) -> NullNode:
+        return NullNode()
+    
+    def number_literal(self) -> NumberNode:
+        return NumberNode(self.previous_value())
+    
+    def string_literal(self) -> StringNode:
+        return StringNode(self.previous_value())
+    
+    def identifier(self) -> IdentifierNode:
+        return IdentifierNode(self.previous_value())
+    
+    def builtin(self) -> IdentifierNode:
+        """Parse the name of a builtin function, which can only be called"""
+        if not self.check(TokenType.LPAREN):
+            raise RuntimeError("'(' ची अपेक्षा")
+        return IdentifierNode(self.previous_value())
     
-    def logical_or(self) -> ASTNode:
-        """Parse logical OR expression"""
-        expr = self.logical_and()
-        
-        while self.match(TokenType.KINVA):
-            operator = self.previous().value
-            right = self.logical_and()
-            expr = BinaryOpNode(expr, operator, right)
-        
-        return expr
+    def grouping(self) -> tuple:
+        """Parse parenthesized expression"""
+        return self.finish_grouping, None, 0
     
-    def logical_and(self) -> ASTNode:
-        """Parse logical AND expression"""
-        expr = self.equality()
-        
-        while self.match(TokenType.ANI):
-            operator = self.previous().value
-            right = self.equality()
-            expr = BinaryOpNode(expr, operator, right)
-        
+    def finish_grouping(self, state: None, expr: ASTNode) -> ASTNode:
+        self.consume(TokenType.RPAREN, "')' ची अपेक्षा")
         return expr
     
-    def equality(self) -> ASTNode:
-        """Parse equality expression"""
-        expr = self.comparison()
-        
-        while self.match(TokenType.EQUAL, TokenType.NOT_EQUAL):
-            operator = self.previous().value
-            right = self.comparison()
-            expr = BinaryOpNode(expr, operator, right)
-        
-        return expr
+    def unary(self) -> tuple:
+        """Parse unary expression"""
+        return self.finish_unary, self.previous_value(), UNARY_POWER
     
-    def comparison(self) -> ASTNode:
-        """Parse comparison expression"""
-        expr = self.term()
-        
-        while self.match(TokenType.GREATER, TokenType.GREATER_EQUAL, TokenType.LESS, TokenType.LESS_EQUAL):
-            operator = self.previous().value
-            right = self.term()
-            expr = BinaryOpNode(expr, operator, right)
-        
-        return expr
+    def finish_unary(self, operator: str, operand: ASTNode) -> UnaryOpNode:
+        return UnaryOpNode(operator, operand)
     
-    def term(self) -> ASTNode:
-        """Parse term expression"""
-        expr = self.factor()
-        
-        while self.match(TokenType.PLUS, TokenType.MINUS):
-            operator = self.previous().value
-            right = self.factor()
-            expr = BinaryOpNode(expr, operator, right)
-        
-        return expr
+    def array_literal(self) -> Union[ArrayNode, tuple]:
+        """Parse array literal [1, 2, 3]"""
+        if not self.check(TokenType.RBRACKET):
+            return self.array_element, [], 0
+        self.consume(TokenType.RBRACKET, "']' ची अपेक्षा")
+        return ArrayNode([])
     
-    def factor(self) -> ASTNode:
-        """Parse factor expression"""
-        expr = self.unary()
-        
-        while self.match(TokenType.MULTIPLY, TokenType.DIVIDE, TokenType.MODULO):
-            operator = self.previous().value
-            right = self.unary()
-            expr = BinaryOpNode(expr, operator, right)
-        
-        return expr
+    def array_element(self, elements: List[ASTNode], element: ASTNode) -> Union[ArrayNode, tuple]:
+        elements.append(element)
+        if self.match(TokenType.COMMA):
+            return self.array_element, elements, 0
+        self.consume(TokenType.RBRACKET, "']' ची अपेक्षा")
+        return ArrayNode(elements)
     
-    def unary(self) -> ASTNode:
-        """Parse unary expression"""
-        if self.match(TokenType.NAHI, TokenType.MINUS):
-            operator = self.previous().value
-            right = self.unary()
-            return UnaryOpNode(operator, right)
-        
-        return self.call()
+    # Infix rules: called with the left operand after the operator token
+    def binary(self, left: ASTNode) -> tuple:
+        """Parse the right operand of a left-associative binary operator"""
+        operator = self.previous_value()
+        return self.finish_binary, (left, operator), BINARY_POWERS[self.kinds[self.current - 1]]
     
-    def call(self) -> ASTNode:
-        """Parse function call and array indexing"""
-        expr = self.primary()
-        
-        while True:
-            if self.match(TokenType.LPAREN):
-                expr = self.finish_call(expr)
-            elif self.match(TokenType.LBRACKET):
-                index = self.expression()
-                self.consume(TokenType.RBRACKET, "']' ची अपेक्षा")
-                expr = IndexNode(expr, index)
-            else:
-                break
-        
-        return expr
+    def finish_binary(self, state: tuple, right: ASTNode) -> BinaryOpNode:
+        left, operator = state
+        return BinaryOpNode(left, operator, right)
     
-    def finish_call(self, callee: ASTNode) -> FunctionCallNode:
-        """Finish parsing function call"""
-        arguments = []
-        
+    def index(self, array: ASTNode) -> tuple:
+        """Parse array indexing"""
+        return self.finish_index, array, 0
+    
+    def finish_index(self, array: ASTNode, index: ASTNode) -> IndexNode:
+        self.consume(TokenType.RBRACKET, "']' ची अपेक्षा")
+        return IndexNode(array, index)
+    
+    def module_member(self, module: ASTNode) -> IdentifierNode:
+        """Parse `मॉड्यूल.कार्य`, which can only be called"""
+        if not isinstance(module, IdentifierNode) or '.' in module.name:
+            raise RuntimeError("अवैध कार्य कॉल")
+        member = self.consume(TokenType.IDENTIFIER, "कार्याच्या नावाची अपेक्षा")
+        if not self.check(TokenType.LPAREN):
+            raise RuntimeError("'(' ची अपेक्षा")
+        return IdentifierNode(f'{module.name}.{member.value}')
+    
+    def call(self, callee: ASTNode) -> Union[FunctionCallNode, tuple]:
+        """Parse function call arguments"""
         if not self.check(TokenType.RPAREN):
-            arguments.append(self.expression())
-            while self.match(TokenType.COMMA):
-                arguments.append(self.expression())
-        
+            return self.call_argument, (callee, []), 0
+        return self.finish_call(callee, [])
+    
+    def call_argument(self, state: tuple, argument: ASTNode) -> Union[FunctionCallNode, tuple]:
+        callee, arguments = state
+        arguments.append(argument)
+        if self.match(TokenType.COMMA):
+            return self.call_argument, state, 0
+        return self.finish_call(callee, arguments)
+    
+    def finish_call(self, callee: ASTNode, arguments: List[ASTNode]) -> FunctionCallNode:
+        """Finish parsing function call"""
         self.consume(TokenType.RPAREN, "')' ची अपेक्षा")
         
         if isinstance(callee, IdentifierNode):
@@ -417,69 +632,57 @@ class MarathiParser:
         else:
             raise RuntimeError("अवैध कार्य कॉल")
     
-    def primary(self) -> ASTNode:
-        """Parse primary expression"""
-        if self.match(TokenType.BOOLEAN):
-            return BooleanNode(self.previous().value)
-        
-        if self.match(TokenType.NULL):
-            return NullNode()
-        
-        if self.match(TokenType.NUMBER):
-            return NumberNode(self.previous().value)
-        
-        if self.match(TokenType.STRING):
-            return StringNode(self.previous().value)
-        
-        if self.match(TokenType.IDENTIFIER):
-            return IdentifierNode(self.previous().value)
-        
-        if self.match(TokenType.LBRACKET):
-            return self.array_literal()
-        
-        if self.match(TokenType.LPAREN):
-            expr = self.expression()
-            self.consume(TokenType.RPAREN, "')' ची अपेक्षा")
-            return expr
-        
-        raise RuntimeError(f"अनपेक्षित टोकन: {self.peek().value}")
-    
-    def array_literal(self) -> ArrayNode:
-        """Parse array literal [1, 2, 3]"""
-        elements = []
-        
-        if not self.check(TokenType.RBRACKET):
-            elements.append(self.expression())
-            while self.match(TokenType.COMMA):
-                elements.append(self.expression())
-        
-        self.consume(TokenType.RBRACKET, "']' ची अपेक्षा")
-        return ArrayNode(elements)
-    
     # Helper methods
+    def load(self, tokens: Iterable[Token]):
+        """Set the token source and rewind to its first token
+
+        The helpers below test token kinds through `self.kinds`, which for a
+        TokenBuffer is its byte array, so Token objects are only built when
+        a token's value is actually needed.
+        """
+        if isinstance(tokens, TokenBuffer):
+            self.kinds = tokens.kinds
+            self.value_at = tokens.value_at
+            self.position_at = tokens.position_at
+        else:
+            if isinstance(tokens, list):
+                self.kinds = array('B', [token.type for token in tokens])
+            else:
+                if not isinstance(tokens, TokenLookahead):
+                    tokens = TokenLookahead(tokens)
+                self.kinds = tokens.kinds
+            self.value_at = self.token_value
+            self.position_at = self.token_position
+        self.tokens = tokens
+        self.current = 0
+    
     def match(self, *types: TokenType) -> bool:
         """Check if current token matches any of the given types"""
         for token_type in types:
             if self.check(token_type):
-                self.advance()
+                self.skip()
                 return True
         return False
     
     def check(self, token_type: TokenType) -> bool:
         """Check if current token is of given type"""
-        if self.is_at_end():
-            return False
-        return self.peek().type == token_type
+        kind = self.kinds[self.current]
+        return kind == token_type and kind != EOF
     
     def advance(self) -> Token:
         """Consume current token and return it"""
-        if not self.is_at_end():
+        if self.kinds[self.current] != EOF:
             self.current += 1
         return self.previous()
     
+    def skip(self):
+        """Consume current token without building a Token for it"""
+        if self.kinds[self.current] != EOF:
+            self.current += 1
+    
     def is_at_end(self) -> bool:
         """Check if we're at the end of tokens"""
-        return self.peek().type == TokenType.EOF
+        return self.kinds[self.current] == EOF
     
     def peek(self) -> Token:
         """Return current token without consuming it"""
@@ -489,6 +692,18 @@ class MarathiParser:
         """Return previous token"""
         return self.tokens[self.current - 1]
     
+    def previous_value(self):
+        """Return the value of the previous token"""
+        return self.value_at(self.current - 1)
+    
+    def token_value(self, index: int):
+        return self.tokens[index].value
+    
+    def token_position(self, index: int) -> tuple:
+        """(line, column) of a token"""
+        token = self.tokens[index]
+        return token.line, token.column
+    
     def consume(self, token_type: TokenType, message: str) -> Token:
         """Consume token of given type or raise error"""
         if self.check(token_type):
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MarathiLang Profiler - Where a program spends its time
+मराठी भाषा प्रोफायलर - प्रोग्रामचा वेळ कुठे जातो
+
+Two ways to profile the tree evaluator:
+
+- ProfilingEvaluator times every call of a कार्य and counts every
+  statement it executes. Counts are exact; timing every call makes the
+  program run slower, at most about twice as slow.
+- Sampler looks at what an ordinary MarathiEvaluator is doing a few
+  hundred times a second from another thread, so the program runs at
+  full speed, and counts samples instead of measuring time.
+
+Both produce a Profile: per-function calls and inclusive/exclusive time
+(or samples), hits per source line, and call stacks in the collapsed
+format of flamegraph.pl, speedscope and similar tools.
+"""
+
+import sys
+import threading
+from collections import Counter
+from time import perf_counter
+from typing import Any, Dict, List, Optional
+
+from .parser import *
+from .evaluator import MarathiEvaluator
+from .hooks import live_statements
+
+DETERMINISTIC = 'deterministic'
+SAMPLING = 'sampling'
+MODES = (DETERMINISTIC, SAMPLING)
+
+# Seconds between samples; the GIL may delay a sample by up to
+# sys.getswitchinterval()
+DEFAULT_INTERVAL = 0.002
+
+class FunctionStats:
+    """Totals for one कार्य
+
+    Inclusive time counts the calls it makes, exclusive time does not.
+    Time spent in a recursive call is only counted once.
+    """
+
+    __slots__ = ('calls', 'inclusive', 'exclusive')
+
+    def __init__(self, calls: Optional[int] = 0):
+        self.calls = calls
+        self.inclusive = 0.0
+        self.exclusive = 0.0
+
+class Profile:
+    """Results of a profiled run
+
+    In deterministic mode times are in seconds; in sampling mode they are
+    numbers of samples and calls are not known (None). `stacks` maps
+    'root;कार्य;...' to the exclusive time or samples of that call stack,
+    where root names the top-level code.
+    """
+
+    def __init__(self, mode: str, root: str):
+        self.mode = mode
+        self.root = root
+        self.functions: Dict[str, FunctionStats] = {}
+        self.lines: Counter = Counter()
+        self.stacks: Counter = Counter()
+        self.total = 0.0
+
+    def function(self, name: str) -> FunctionStats:
+        stats = self.functions.get(name)
+        if stats is None:
+            stats = self.functions[name] = FunctionStats(0 if self.mode == DETERMINISTIC else None)
+        return stats
+
+    def collapsed(self) -> str:
+        """Call stacks in collapsed format, one 'root;f;g value' per line
+
+        Values are microseconds in deterministic mode and samples in
+        sampling mode.
+        """
+        scale = 1e6 if self.mode == DETERMINISTIC else 1
+        lines = []
+        for stack, value in sorted(self.stacks.items()):
+            value = round(value * scale)
+            if value:
+                lines.append(f'{stack} {value}')
+        return '\n'.join(lines) + '\n' if lines else ''
+
+    def report(self, source_lines: Optional[List[str]] = None, limit: int = 20) -> str:
+        """Text summary: functions by inclusive time, then the busiest lines"""
+        sampled = self.mode == SAMPLING
+        unit = 'samples' if sampled else 's'
+        number = (lambda value: f'{value:10.0f}') if sampled else (lambda value: f'{value:10.4f}')
+        total = number(self.total).strip()
+        lines = [f'profile ({self.mode}): {self.root}, {total} {unit}',
+                 f'{"function":<24}{"calls":>10}{"incl " + unit:>14}{"excl " + unit:>14}']
+        for name, stats in sorted(self.functions.items(), key=lambda item: -item[1].inclusive):
+            calls = '-' if stats.calls is None else stats.calls
+            lines.append(f'{name:<24}{calls:>10}{number(stats.inclusive):>14}{number(stats.exclusive):>14}')
+        lines.append('')
+        lines.append(f'{"line":>8}{"hits":>12}  source')
+        for line, hits in self.lines.most_common(limit):
+            text = ''
+            if source_lines is not None and 0 < line <= len(source_lines):
+                text = source_lines[line - 1].strip()
+            lines.append(f'{line:>8}{hits:>12}  {text}')
+        return '\n'.join(lines)
+
+class ProfilingEvaluator(MarathiEvaluator):
+    """Tree evaluator that times calls and counts statements as it runs
+
+    The results of every program it evaluates are added to self.profile.
+    """
+
+    def __init__(self, *args, root: str = '<main>', **kwargs):
+        super().__init__(*args, **kwargs)
+        self.profile = Profile(DETERMINISTIC, root)
+        self.statements: Dict[int, ASTNode] = {}
+        # Calls being timed, innermost last: [stack path, time in callees]
+        self.timers: List[list] = []
+        # Calls of each function in progress
+        self.active: Counter = Counter()
+        # (caller's stack path, function name) -> stack path of the call
+        self.paths: Dict[tuple, str] = {}
+
+    def evaluate(self, node: ASTNode) -> Any:
+        statement = self.statements.get(id(node))
+        if statement is not None:
+            self.profile.lines[statement.line] += 1
+        elif node.__class__ is ProgramNode:
+            return self.evaluate_program(node)
+        return MarathiEvaluator.evaluate(self, node)
+
+    def evaluate_program(self, program: ProgramNode) -> Any:
+        self.statements = live_statements(program, self.functions)
+        profile = self.profile
+        timer = [profile.root, 0.0]
+        self.timers.append(timer)
+        start = perf_counter()
+        try:
+            return MarathiEvaluator.evaluate(self, program)
+        finally:
+            elapsed = perf_counter() - start
+            self.timers.pop()
+            profile.total += elapsed
+            profile.stacks[profile.root] += elapsed - timer[1]
+
+    def execute_function(self, function: FunctionDefNode, arguments: List[Any]) -> Any:
+        timers = self.timers
+        if not timers:
+            # Called from outside evaluate(), e.g. by a host program
+            return MarathiEvaluator.execute_function(self, function, arguments)
+        name = function.name
+        caller = timers[-1]
+        path = self.paths.get((caller[0], name))
+        if path is None:
+            path = self.paths[caller[0], name] = f'{caller[0]};{name}'
+        timer = [path, 0.0]
+        timers.append(timer)
+        active = self.active
+        active[name] += 1
+        start = perf_counter()
+        try:
+            return MarathiEvaluator.execute_function(self, function, arguments)
+        finally:
+            elapsed = perf_counter() - start
+            timers.pop()
+            caller[1] += elapsed
+            exclusive = elapsed - timer[1]
+            profile = self.profile
+            stats = profile.function(name)
+            stats.calls += 1
+            stats.exclusive += exclusive
+            active[name] -= 1
+            if not active[name]:
+                # Outermost call of this function: count its time once
+                stats.inclusive += elapsed
+            profile.stacks[timer[0]] += exclusive
+
+# Code of the evaluator methods whose frames show what is running
+EVALUATE_CODE = MarathiEvaluator.evaluate.__code__
+EXECUTE_FUNCTION_CODE = MarathiEvaluator.execute_function.__code__
+
+class Sampler:
+    """Samples what a MarathiEvaluator in the current thread is executing
+
+    Use as a context manager around evaluate(); the evaluator itself is
+    not changed, so it runs as fast as without profiling.
+    """
+
+    def __init__(self, root: str = '<main>', interval: float = DEFAULT_INTERVAL):
+        self.profile = Profile(SAMPLING, root)
+        self.interval = interval
+        self.thread_id: Optional[int] = None
+        self.stopped = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> 'Sampler':
+        self.thread_id = threading.get_ident()
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self.run, name='marathi-sampler', daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.thread.join()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.sample(frame)
+
+    def sample(self, frame: Any):
+        """Record the Marathi call stack and line of a Python stack"""
+        names = []
+        line = None
+        while frame is not None:
+            code = frame.f_code
+            if code is EXECUTE_FUNCTION_CODE:
+                function = frame.f_locals.get('function')
+                if function is not None:
+                    names.append(function.name)
+            elif code is EVALUATE_CODE and line is None:
+                node = frame.f_locals.get('node')
+                if node is not None and node.line:
+                    line = node.line
+            frame = frame.f_back
+        if line is None and not names:
+            # Not inside the program (yet)
+            return
+        names.reverse()
+        profile = self.profile
+        profile.total += 1
+        if line is not None:
+            profile.lines[line] += 1
+        profile.stacks[';'.join([profile.root] + names)] += 1
+        for name in set(names):
+            profile.function(name).inclusive += 1
+        if names:
+            profile.function(names[-1]).exclusive += 1
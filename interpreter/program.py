@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MarathiLang Compiled Programs - Parse once, run many times
+मराठी भाषा संकलित प्रोग्राम - एकदा पार्स करा, अनेकदा चालवा
+
+compile_program() lexes, parses and, if asked, optimizes a source once.
+The CompiledProgram it returns cannot be changed, and no engine changes
+the tree it holds, so any number of evaluators can run it, in several
+threads at the same time. Every run has its own globals, starting from
+the inputs it is given, so one program can be run for thousands of
+parameter sets. It pickles to a compact encoding of the tree (that of
+the .mrc cache), so process pools can send it to their workers without
+parsing it again.
+"""
+
+import pickle
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from .lexer import MarathiLexer
+from .parser import *
+from .evaluator import MarathiEvaluator
+from .optimizer import Optimizer, post_order
+from .scope import collect_names
+from .cache import decode_node, encode_node
+from .stdlib import MODULES, load_stdlib
+
+@dataclass(frozen=True, eq=False)
+class CompiledProgram:
+    """A parsed program ready to run
+
+    `errors` are the syntax errors found while parsing; the statements
+    they affected were skipped, as when running a file. `inputs` are the
+    names the program reads but never assigns, which run() expects to be
+    given.
+    """
+    name: str
+    source: str = field(repr=False)
+    program: ProgramNode = field(repr=False)
+    errors: Tuple[str, ...]
+    passes: Optional[Tuple[str, ...]]
+    inputs: Tuple[str, ...]
+
+    def run(self, inputs: Optional[Dict[str, Any]] = None,
+            evaluator: Optional[MarathiEvaluator] = None) -> Dict[str, Any]:
+        """Run the program and return its global variables
+
+        `inputs` become global variables before it starts. It runs on a
+        new MarathiEvaluator with the standard library, or on the given
+        evaluator, which should be new too (any engine, perhaps with
+        limits or hooks) for the run to have globals of its own. Syntax
+        errors are printed first, as they are when running a file.
+        """
+        if evaluator is None:
+            evaluator = MarathiEvaluator()
+            load_stdlib(evaluator)
+        for message in self.errors:
+            print(message)
+        if inputs:
+            evaluator.variables.update(inputs)
+        evaluator.evaluate(self.program)
+        return {name: value for name, value in evaluator.variables.items() if name not in evaluator.modules}
+
+    def __reduce__(self):
+        try:
+            # Nested tuples pickle to about half the size of the nodes
+            tree = pickle.dumps(encode_node(self.program), pickle.HIGHEST_PROTOCOL)
+        except RecursionError:
+            # Too deep to encode; parse the source again when loaded
+            tree = None
+        return restore, (self.name, self.source, tree, self.errors, self.passes, self.inputs)
+
+def restore(name: str, source: str, tree: Optional[bytes], errors: Tuple[str, ...],
+            passes: Optional[Tuple[str, ...]], inputs: Tuple[str, ...]) -> CompiledProgram:
+    """Rebuild a pickled CompiledProgram"""
+    if tree is None:
+        return compile_program(source, name, passes)
+    return CompiledProgram(name, source, decode_node(pickle.loads(tree)), errors, passes, inputs)
+
+def input_names(program: ProgramNode) -> Tuple[str, ...]:
+    """Names a program reads and its top level never assigns, in source order
+
+    A function's parameters and the names it assigns are its own, so
+    they only count for reads in that function.
+    """
+    assigned: Dict[str, None] = {}
+    read: Dict[str, None] = {}
+    collect_names(program.statements, assigned, read)
+    for node in post_order(program):
+        if isinstance(node, FunctionDefNode):
+            local: Dict[str, None] = dict.fromkeys(node.parameters)
+            function_read: Dict[str, None] = {}
+            collect_names(node.body, local, function_read)
+            read.update((name, None) for name in function_read if name not in local)
+    return tuple(name for name in read if name not in assigned and name not in MODULES)
+
+def compile_program(source: str, name: str = '<program>',
+                    passes: Optional[Sequence[str]] = None) -> CompiledProgram:
+    """Parse source into a CompiledProgram
+
+    `passes` are optimizer passes to run on it, in order; None runs none.
+    """
+    parser = MarathiParser(print_errors=False)
+    program = parser.parse(MarathiLexer().tokenize(source))
+    if passes is not None:
+        passes = tuple(passes)
+        program = Optimizer(passes).optimize(program)
+    return CompiledProgram(name, source, program, tuple(parser.errors), passes, input_names(program))
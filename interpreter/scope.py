@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MarathiLang Scope Resolver - Assigns function variables to frame slots
+मराठी भाषा व्याप्ती - कार्यातील चलांना फ्रेममधील जागा देते
+"""
+
+from dataclasses import fields
+from typing import Any, Dict, List
+
+from .parser import *
+
+class Unset:
+    """Marker for a frame slot that has not been assigned"""
+
+    def __repr__(self):
+        return '<unset>'
+
+UNSET = Unset()
+
+def collect_names(statements: List[ASTNode], assigned: Dict[str, None], read: Dict[str, None]):
+    """Collect the names a function body assigns and reads, in source order
+
+    Bodies of nested function definitions belong to those functions.
+    """
+    pending = list(reversed(statements))
+    while pending:
+        node = pending.pop()
+        if isinstance(node, list):
+            pending.extend(reversed(node))
+            continue
+        if not isinstance(node, ASTNode) or isinstance(node, FunctionDefNode):
+            continue
+        if isinstance(node, IdentifierNode):
+            read[node.name] = None
+        elif isinstance(node, AssignmentNode):
+            assigned[node.name] = None
+        elif isinstance(node, ForEachNode):
+            assigned[node.variable] = None
+        for field in reversed(fields(node)):
+            pending.append(getattr(node, field.name))
+
+class FrameLayout:
+    """Slot numbers of the variables a function mentions; parameters first"""
+
+    def __init__(self, function: FunctionDefNode):
+        self.name = function.name
+        assigned: Dict[str, None] = {}
+        read: Dict[str, None] = {}
+        collect_names(function.body, assigned, read)
+        names = dict.fromkeys(function.parameters)
+        names.update(assigned)
+        names.update(read)
+        self.slot_names = list(names)
+        self.slot_index = {name: slot for slot, name in enumerate(self.slot_names)}
+        self.parameter_slots = [self.slot_index[parameter] for parameter in function.parameters]
+        # Parameters fill slots 0..n-1 unless a name is repeated
+        self.simple_parameters = self.parameter_slots == list(range(len(self.parameter_slots)))
+        self.size = len(self.slot_names)
+
+class Frame:
+    """One active call: the function and the values of its slots"""
+
+    __slots__ = ('function', 'layout', 'slots')
+
+    def __init__(self, function: FunctionDefNode, layout: FrameLayout, arguments: List[Any]):
+        self.function = function
+        self.layout = layout
+        if layout.simple_parameters:
+            self.slots: List[Any] = arguments + [UNSET] * (layout.size - len(arguments))
+        else:
+            self.slots = [UNSET] * layout.size
+            for slot, argument in zip(layout.parameter_slots, arguments):
+                self.slots[slot] = argument
+
+    def __repr__(self):
+        return f'<कार्य {self.function.name}>'
+
+class ScopeResolver:
+    """Computes the FrameLayout of each function once and keeps it"""
+
+    def __init__(self):
+        # id(FunctionDefNode) -> (node, layout)
+        self.layouts: Dict[int, tuple] = {}
+
+    def layout(self, function: FunctionDefNode) -> FrameLayout:
+        entry = self.layouts.get(id(function))
+        if entry is None or entry[0] is not function:
+            entry = (function, FrameLayout(function))
+            self.layouts[id(function)] = entry
+        return entry[1]
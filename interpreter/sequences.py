@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MarathiLang Sequences - Lazy ranges and what प्रत्येक can loop over
+मराठी भाषा क्रम - आळशी श्रेणी आणि प्रत्येक कशावर फिरू शकते
+
+प्रत्येक loops over lists and over anything else that follows Python's
+iterator protocol (ranges, vectors, the lines of a file from a module),
+taking one element at a time, so lazy sequences use constant memory.
+"""
+
+import math
+from typing import Any, Iterator
+
+from .storage import LIST_TYPES
+
+def range_bound(value: Any) -> Any:
+    if type(value) not in (int, float) or (type(value) is float and not math.isfinite(value)):
+        raise RuntimeError(f"श्रेणीच्या सीमा संख्या असाव्यात, {value!r} नाही")
+    return value
+
+class Range:
+    """Numbers from start up to, but not including, stop, step apart
+
+    Elements are computed while looping: integer ranges run on Python's
+    range, decimal ones compute start + i * step so that errors do not
+    add up.
+    """
+
+    __slots__ = ('start', 'stop', 'step', 'count')
+
+    def __init__(self, start: Any, stop: Any, step: Any = 1):
+        self.start = range_bound(start)
+        self.stop = range_bound(stop)
+        self.step = range_bound(step)
+        if step == 0:
+            raise RuntimeError("श्रेणीचे पाऊल शून्य असू शकत नाही")
+        if type(start) is int and type(stop) is int and type(step) is int:
+            self.count = len(range(start, stop, step))
+        else:
+            self.count = max(0, math.ceil((stop - start) / step))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[Any]:
+        start, step = self.start, self.step
+        if type(start) is int and type(self.stop) is int and type(step) is int:
+            return iter(range(start, self.stop, step))
+        return (start + index * step for index in range(self.count))
+
+    def __repr__(self) -> str:
+        return f'श्रेणी({self.start!r}, {self.stop!r}, {self.step!r})'
+
+def make_range(*arguments: Any) -> Range:
+    """श्रेणी(शेवट), श्रेणी(सुरुवात, शेवट) or श्रेणी(सुरुवात, शेवट, पाऊल)"""
+    if len(arguments) == 1:
+        return Range(0, arguments[0])
+    if len(arguments) in (2, 3):
+        return Range(*arguments)
+    raise RuntimeError("Argument count mismatch")
+
+def loop_items(value: Any) -> Any:
+    """What प्रत्येक iterates for a value that is not a list
+
+    Strings are not sequences of letters here, as before.
+    """
+    if isinstance(value, str) or not hasattr(value, '__iter__'):
+        raise RuntimeError("ForEach expects a list")
+    return value
+
+# Values लांबी can measure besides strings
+SIZED_TYPES = LIST_TYPES + (Range,)
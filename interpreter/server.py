@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MarathiLang Server - Runs programs in a pool of warm worker processes
+मराठी भाषा सर्व्हर - तयार कार्यकर्ता प्रक्रियांमध्ये प्रोग्राम चालवा
+
+Starting Python and importing the interpreter for every run takes far
+longer than most programs do. A WorkerPool keeps processes that have
+already imported the lexer, parser, evaluator and standard library and
+runs each program on a fresh evaluator in one of them, replacing a
+worker after max_runs programs so that nothing one program leaves behind
+builds up.
+
+`python main.py --serve` reads requests as JSON lines on stdin, or from
+any number of clients on a Unix socket with `--socket PATH`:
+
+    {"id": 1, "source": "मुद्रण(१)", "stdin": "", "limits": {"max_steps": 1000}}
+
+`stdin` and `limits` (fields of interpreter.limits.Limits, added to the
+server's own) are optional. Output comes back while the program runs,
+then the result; requests are handled concurrently, so the lines of
+different requests interleave and carry their request's id:
+
+    {"id": 1, "stdout": "1\n"}
+    {"id": 1, "done": true, "ok": true, "error": null, "limit": null, "seconds": 0.0004}
+
+stdout and stderr are what `python run_marathi.py file.mr` would print.
+`ok` is false after a syntax or runtime error, whose message is in
+`error`; `limit` names the limit a program went over, if any.
+"""
+
+import io
+import os
+import sys
+import json
+import stat
+import signal
+import queue
+import threading
+import contextlib
+import socketserver
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import fields, replace
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from .lexer import MarathiLexer
+from .parser import MarathiParser
+from .evaluator import MarathiEvaluator
+from .limits import TIME, LimitExceeded, Limits
+from .stdlib import load_stdlib
+
+STDOUT = 'stdout'
+STDERR = 'stderr'
+DONE = 'done'
+
+# Programs a worker runs before it is replaced
+DEFAULT_MAX_RUNS = 100
+
+# Output is sent at least this often while a program runs (seconds), and
+# as soon as this many characters are waiting
+FLUSH_INTERVAL = 0.05
+CHUNK_SIZE = 8192
+
+# A worker whose program has a time limit is killed if it has not
+# finished this long after the limit, e.g. while waiting in a module call
+KILL_GRACE = 1.0
+
+LIMIT_FIELDS = tuple(field.name for field in fields(Limits))
+
+# Run at the start of every worker so that the first request finds
+# everything loaded
+WARM_UP = '''कार्य वर्ग(x) {
+    परत x * x
+}
+चल यादी = [१, २, ३]
+प्रत्येक n मध्ये यादी {
+    मुद्रण(वर्ग(n), शब्द.लांबी("अबक"))
+}
+'''
+
+def start_method() -> str:
+    """Start workers from a warm fork server where there is one"""
+    return 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+class StreamWriter(io.TextIOBase):
+    """stdout or stderr of a program in a worker, sent to the server in chunks"""
+
+    def __init__(self, connection: Any, name: str, lock: threading.Lock):
+        self.connection = connection
+        self.name = name
+        # Shared by the writers of one program and its Flusher
+        self.lock = lock
+        self.parts = []
+        self.size = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        with self.lock:
+            self.parts.append(text)
+            self.size += len(text)
+            if self.size >= CHUNK_SIZE:
+                self.send()
+        return len(text)
+
+    def flush(self):
+        with self.lock:
+            self.send()
+
+    def send(self):
+        if self.parts:
+            self.connection.send((self.name, ''.join(self.parts)))
+            self.parts = []
+            self.size = 0
+
+class Flusher:
+    """Sends what a running program has printed every FLUSH_INTERVAL"""
+
+    def __init__(self, writers: Iterable[StreamWriter]):
+        self.writers = list(writers)
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name='marathi-flusher', daemon=True)
+
+    def __enter__(self) -> 'Flusher':
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.thread.join()
+        for writer in self.writers:
+            writer.flush()
+
+    def run(self):
+        while not self.stopped.wait(FLUSH_INTERVAL):
+            for writer in self.writers:
+                writer.flush()
+
+def execute(job: Dict[str, Any], connection: Any, evaluator_class: type, options: Dict[str, Any]) -> dict:
+    """Run one program in a worker, sending its output; return its result"""
+    lock = threading.Lock()
+    stdout = StreamWriter(connection, STDOUT, lock)
+    stderr = StreamWriter(connection, STDERR, lock)
+    parser = MarathiParser()
+    error = limit = None
+    start = perf_counter()
+    saved_stdin = sys.stdin
+    sys.stdin = io.StringIO(job.get('stdin') or '')
+    try:
+        with Flusher((stdout, stderr)), contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            try:
+                evaluator = evaluator_class(**options)
+                if job.get('limits') is not None:
+                    evaluator.set_limits(job['limits'])
+                load_stdlib(evaluator)
+                evaluator.evaluate(parser.parse(MarathiLexer().tokenize(job['source'])))
+            except Exception as e:
+                error = str(e)
+                if isinstance(e, LimitExceeded):
+                    limit = e.kind
+                # As main.py reports it
+                print(f"त्रुटी: {e}")
+    finally:
+        sys.stdin = saved_stdin
+    if error is None and parser.errors:
+        error = parser.errors[0]
+    return {'ok': error is None, 'error': error, 'limit': limit, 'seconds': perf_counter() - start}
+
+def worker_main(connection: Any, evaluator_class: type, options: Dict[str, Any]):
+    """Run the jobs sent over connection until None or the end of it"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        evaluator = evaluator_class(**options)
+        load_stdlib(evaluator)
+        evaluator.evaluate(MarathiParser().parse(MarathiLexer().tokenize(WARM_UP)))
+    while True:
+        try:
+            job = connection.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+        connection.send((DONE, execute(job, connection, evaluator_class, options)))
+
+class WorkerFailed(Exception):
+    """A worker died or was too slow, so its result will never come"""
+
+class WorkerTimeout(WorkerFailed):
+    pass
+
+class Worker:
+    """A worker process and the server's end of its connection"""
+
+    def __init__(self, context: Any, evaluator_class: type, options: Dict[str, Any]):
+        self.connection, child = context.Pipe()
+        self.process = context.Process(target=worker_main, args=(child, evaluator_class, options),
+                                       name='marathi-worker', daemon=True)
+        self.process.start()
+        child.close()
+        self.runs = 0
+
+    def run(self, job: Dict[str, Any], emit: Callable[[str, str], None], timeout: Optional[float]) -> dict:
+        """Send a job and pass its output to emit until its result comes"""
+        deadline = perf_counter() + timeout if timeout is not None else None
+        try:
+            self.connection.send(job)
+            while True:
+                if deadline is not None and not self.connection.poll(max(deadline - perf_counter(), 0)):
+                    raise WorkerTimeout()
+                kind, data = self.connection.recv()
+                if kind == DONE:
+                    self.runs += 1
+                    return data
+                emit(kind, data)
+        except (EOFError, OSError) as e:
+            self.process.join(0.1)
+            raise WorkerFailed(f'worker process exited ({self.process.exitcode})') from e
+
+    def stop(self):
+        try:
+            self.connection.send(None)
+        except OSError:
+            pass
+        self.connection.close()
+        self.process.join(1.0)
+        if self.process.is_alive():
+            self.kill()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+class WorkerPool:
+    """Warm worker processes that run programs sent to run()
+
+    run() may be called from many threads at once; each call waits for an
+    idle worker. Every program gets a new evaluator_class(**options) with
+    the standard library loaded and the pool's limits, if any.
+    """
+
+    def __init__(self, size: Optional[int] = None, max_runs: int = DEFAULT_MAX_RUNS,
+                 evaluator_class: type = MarathiEvaluator, limits: Optional[Limits] = None,
+                 options: Optional[Dict[str, Any]] = None):
+        if max_runs < 1:
+            raise ValueError(f'max_runs must be positive, not {max_runs}')
+        if limits is not None and not evaluator_class.supports_limits:
+            raise ValueError(f'{evaluator_class.__name__} does not support limits')
+        self.size = size or os.cpu_count() or 1
+        self.max_runs = max_runs
+        self.evaluator_class = evaluator_class
+        self.limits = limits
+        self.options = options or {}
+        self.context = multiprocessing.get_context(start_method())
+        if self.context.get_start_method() == 'forkserver':
+            # Workers are forked from a process that has imported the interpreter
+            self.context.set_forkserver_preload([__name__])
+        self.idle: queue.Queue = queue.Queue()
+        self.closed = False
+        for _ in range(self.size):
+            self.idle.put(self.new_worker())
+
+    def new_worker(self) -> Worker:
+        return Worker(self.context, self.evaluator_class, self.options)
+
+    def job_limits(self, overrides: Optional[Dict[str, Any]]) -> Optional[Limits]:
+        """The pool's limits with a request's changes"""
+        if not overrides:
+            return self.limits
+        if not self.evaluator_class.supports_limits:
+            raise ValueError(f'{self.evaluator_class.__name__} does not support limits')
+        unknown = set(overrides) - set(LIMIT_FIELDS)
+        if unknown:
+            raise ValueError(f'unknown limits: {", ".join(sorted(unknown))}')
+        return replace(self.limits or Limits(), **overrides)
+
+    def run(self, source: str, stdin: str = '', limits: Optional[Dict[str, Any]] = None,
+            emit: Optional[Callable[[str, str], None]] = None) -> dict:
+        """Run a program; emit(stream, text) gets its output as it is printed
+
+        Returns {'ok', 'error', 'limit', 'seconds'} as described above.
+        Invalid limits raise ValueError.
+        """
+        job_limits = self.job_limits(limits)
+        timeout = None
+        if job_limits is not None and job_limits.max_seconds is not None:
+            timeout = job_limits.max_seconds + KILL_GRACE
+        job = {'source': source, 'stdin': stdin, 'limits': job_limits}
+        worker = self.idle.get()
+        start = perf_counter()
+        try:
+            return worker.run(job, emit or (lambda stream, text: None), timeout)
+        except WorkerFailed as e:
+            worker.kill()
+            worker = self.new_worker()
+            if isinstance(e, WorkerTimeout):
+                return {'ok': False, 'error': str(LimitExceeded(TIME, job_limits.max_seconds)),
+                        'limit': TIME, 'seconds': perf_counter() - start}
+            return {'ok': False, 'error': str(e), 'limit': None, 'seconds': perf_counter() - start}
+        finally:
+            if worker.runs >= self.max_runs:
+                worker.stop()
+                worker = self.new_worker()
+            if self.closed:
+                worker.stop()
+            else:
+                self.idle.put(worker)
+
+    def close(self):
+        """Stop the idle workers now and busy ones when they finish"""
+        self.closed = True
+        while True:
+            try:
+                worker = self.idle.get_nowait()
+            except queue.Empty:
+                break
+            worker.stop()
+
+    def __enter__(self) -> 'WorkerPool':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class Session:
+    """One client's requests, read as JSON lines and answered as JSON lines"""
+
+    def __init__(self, pool: WorkerPool, write: Callable[[str], None]):
+        self.pool = pool
+        self.write = write
+        self.lock = threading.Lock()
+
+    def send(self, message: dict):
+        line = json.dumps(message, ensure_ascii=False) + '\n'
+        with self.lock:
+            self.write(line)
+
+    def serve(self, lines: Iterable[str]):
+        """Handle requests until the input ends, then wait for their results"""
+        with ThreadPoolExecutor(max_workers=self.pool.size) as executor:
+            for line in lines:
+                if line.strip():
+                    executor.submit(self.handle, line)
+
+    def handle(self, line: str):
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError('a request is a JSON object')
+            request_id = request.get('id')
+            source = request.get('source')
+            stdin = request.get('stdin') or ''
+            if not isinstance(source, str) or not isinstance(stdin, str):
+                raise ValueError("'source' and 'stdin' must be strings")
+
+            def emit(stream: str, text: str):
+                self.send({'id': request_id, stream: text})
+
+            result = self.pool.run(source, stdin, request.get('limits'), emit)
+        except (ValueError, TypeError) as e:
+            result = {'ok': False, 'error': f'invalid request: {e}', 'limit': None, 'seconds': 0.0}
+        self.send(dict({'id': request_id, DONE: True}, **result))
+
+def serve_stdio(pool: WorkerPool):
+    """Serve the requests on stdin, answering on stdout"""
+    stdout = sys.stdout
+
+    def write(line: str):
+        stdout.write(line)
+        stdout.flush()
+
+    Session(pool, write).serve(sys.stdin)
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        def write(line: str):
+            self.wfile.write(line.encode('utf-8'))
+
+        Session(self.server.pool, write).serve(line.decode('utf-8') for line in self.rfile)
+
+def interrupt(signum: int, frame: Any):
+    raise KeyboardInterrupt
+
+def serve_unix(pool: WorkerPool, path: str):
+    """Serve clients connecting to a Unix socket at path until interrupted"""
+    if not hasattr(socketserver, 'ThreadingUnixStreamServer'):
+        raise RuntimeError('Unix sockets are not available here; serve on stdin instead')
+    if os.path.exists(path):
+        if not stat.S_ISSOCK(os.stat(path).st_mode):
+            raise RuntimeError(f'{path} exists and is not a socket')
+        # Left behind by a server that did not shut down
+        os.unlink(path)
+    server = socketserver.ThreadingUnixStreamServer(path, RequestHandler)
+    server.daemon_threads = True
+    server.pool = pool
+    if threading.current_thread() is threading.main_thread():
+        # Remove the socket on `kill` as on Ctrl+C
+        signal.signal(signal.SIGTERM, interrupt)
+    print(f'listening on {path}', file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        os.unlink(path)
@@ -1 +1,17 @@
 # MarathiLang Standard Library Package
+
+from .ganit import GanitModule
+from .shabd import ShabdModule
+from .pravesh import PraveshModule
+
+# Module classes by the name programs use them by
+MODULES = {
+    'गणित': GanitModule,
+    'शब्द': ShabdModule,
+    'प्रवेश': PraveshModule,
+}
+
+def load_stdlib(evaluator):
+    """Give an evaluator a fresh instance of every standard module"""
+    for name, module in MODULES.items():
+        evaluator.load_module(name, module())
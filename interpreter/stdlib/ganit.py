@@ -1,5 +1,7 @@
 # marathi-lang/interpreter/stdlib/ganit.py
 
+from .. import storage, vector
+
 class GanitModule:
     def वर्गमूळ(self, n):
         return n ** 0.5
@@ -12,3 +14,26 @@ class GanitModule:
 
     def मी(self):
         return 3.14159
+
+    # Vectors: elementwise + - * / % and comparisons without a loop
+    def सदिश(self, values):
+        return vector.Vector.from_values(values)
+
+    def यादी(self, values):
+        return storage.make_list(list(values))
+
+    # Reductions over a vector or a list of numbers
+    def बेरीज(self, values):
+        return vector.total(values)
+
+    def किमान(self, values):
+        return vector.minimum(values)
+
+    def कमाल(self, values):
+        return vector.maximum(values)
+
+    def सरासरी(self, values):
+        return vector.mean(values)
+
+    def बिंदुगुणाकार(self, a, b):
+        return vector.dot(a, b)
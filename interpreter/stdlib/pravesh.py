@@ -8,6 +8,12 @@ class PraveshModule:
         with open(filename, 'r', encoding='utf-8') as f:
             return f.read()
 
+    def ओळी(self, filename):
+        # One line at a time, for प्रत्येक over large files
+        with open(filename, 'r', encoding='utf-8') as f:
+            for line in f:
+                yield line.rstrip('\n')
+
     def फाइल_लिहा(self, filename, content):
         with open(filename, 'w', encoding='utf-8') as f:
             f.write(content)
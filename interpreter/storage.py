@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MarathiLang List Storage - Compact storage for lists of numbers
+मराठी भाषा यादी साठवण - संख्यांच्या यादीसाठी कमी जागेची साठवण
+
+A Python list holds a pointer and a separate int or float object for
+every element. A list literal of at least COMPACT_LENGTH elements that
+are all integers, or all decimals, becomes a CompactList instead, which
+keeps them unboxed in an array('q') or array('d'): 8 bytes per element
+instead of about 36. Shorter lists are cheaper to build and index as
+Python lists.
+Everything a program can do with a list works the same on a
+CompactList, including how it prints and the errors it raises. Adding
+or repeating compact lists keeps them compact; anything else gives an
+ordinary list.
+"""
+
+import operator
+from array import array
+from typing import Any, Callable, Iterator, List
+
+# Element type stored by each typecode; bool is not stored because
+# सत्य and 1 print differently
+TYPECODES = {int: 'q', float: 'd'}
+
+# Fewest elements stored compactly
+COMPACT_LENGTH = 16
+
+def compact_items(values: List[Any]) -> Any:
+    """An array holding values if they are all ints or all floats, else None"""
+    if len(values) < COMPACT_LENGTH:
+        return None
+    element_type = type(values[0])
+    typecode = TYPECODES.get(element_type)
+    if typecode is None:
+        return None
+    for value in values:
+        if type(value) is not element_type:
+            return None
+    try:
+        return array(typecode, values)
+    except OverflowError:
+        # Integers beyond 64 bits stay in a list
+        return None
+
+def make_list(values: List[Any]) -> Any:
+    """The list value for evaluated list elements"""
+    items = compact_items(values)
+    return values if items is None else CompactList(items)
+
+def comparison(operation: Callable[[Any, Any], Any]) -> Callable[[Any, Any], Any]:
+    """Method that compares like the equivalent list"""
+    def method(self, other):
+        if isinstance(other, CompactList):
+            other = other.tolist()
+        elif not isinstance(other, list):
+            return NotImplemented
+        return operation(self.tolist(), other)
+    return method
+
+class CompactList:
+    """List of numbers of one type stored in an array
+
+    `items` is an array until a write stores a value of another type,
+    after which it is an ordinary list. Operations the array does not
+    cover are done on an equivalent list, so that results and error
+    messages are those of a list.
+    """
+
+    __slots__ = ('items',)
+
+    def __init__(self, items: Any):
+        self.items = items
+
+    def tolist(self) -> List[Any]:
+        items = self.items
+        return items.tolist() if isinstance(items, array) else list(items)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.items)
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return make_list(self.tolist()[index])
+        return self.items[index]
+
+    def __setitem__(self, index: int, value: Any):
+        items = self.items
+        if isinstance(items, array) and type(value) is not type(items[0]):
+            # Another type: switch to generic storage for good
+            items = self.items = items.tolist()
+        items[index] = value
+
+    def append(self, value: Any):
+        items = self.items
+        if isinstance(items, array) and (not items or type(value) is not type(items[0])):
+            items = self.items = items.tolist()
+        items.append(value)
+
+    def __repr__(self) -> str:
+        return repr(self.tolist())
+
+    def __bool__(self) -> bool:
+        return len(self.items) > 0
+
+    __hash__ = None
+
+    def __add__(self, other: Any) -> Any:
+        if isinstance(other, CompactList):
+            items, other_items = self.items, other.items
+            if isinstance(items, array) and isinstance(other_items, array) \
+                    and items.typecode == other_items.typecode:
+                return CompactList(items + other_items)
+            other = other.tolist()
+        return result_list(operator.add(self.tolist(), other))
+
+    def __radd__(self, other: Any) -> Any:
+        return result_list(operator.add(other, self.tolist()))
+
+    def __mul__(self, count: Any) -> Any:
+        if type(count) is int and isinstance(self.items, array):
+            return CompactList(self.items * count)
+        return result_list(operator.mul(self.tolist(), count))
+
+    def __rmul__(self, count: Any) -> Any:
+        if type(count) is int and isinstance(self.items, array):
+            return CompactList(self.items * count)
+        return result_list(operator.mul(count, self.tolist()))
+
+    __eq__ = comparison(operator.eq)
+    __ne__ = comparison(operator.ne)
+    __lt__ = comparison(operator.lt)
+    __gt__ = comparison(operator.gt)
+    __le__ = comparison(operator.le)
+    __ge__ = comparison(operator.ge)
+
+# Python names the type in errors such as "'<' not supported between
+# instances of 'list' and 'int'"; __qualname__ keeps the real name
+CompactList.__name__ = 'list'
+
+def result_list(value: Any) -> Any:
+    """Compact the result of a list operation if it is a list of numbers"""
+    return make_list(value) if type(value) is list else value
+
+# What the interpreter accepts wherever it needs a list
+LIST_TYPES = (list, CompactList)
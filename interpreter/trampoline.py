@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MarathiLang Trampoline Evaluator - Deep recursion without the Python stack
+मराठी भाषा ट्रॅम्पोलिन - Python स्टॅकशिवाय खोल पुनरावृत्ती
+"""
+
+from dataclasses import fields
+from typing import Any, Dict, Generator, List
+
+from .parser import *
+from .evaluator import MarathiEvaluator, native_function, print_values
+from .compiler import BINARY_OPERATORS
+from .memo import DEFAULT_MEMO_SIZE, PurityAnalyzer
+from .scope import Frame
+from .storage import LIST_TYPES, make_list
+from .sequences import loop_items
+from .vector import zero_divisor
+
+# Deepest chain of active calls before a RecursionError
+DEFAULT_MAX_DEPTH = 200000
+
+# Evaluation of a node: yields the nodes (or call steps) it needs values of
+# and receives each value back; returns the node's value
+Steps = Generator[Any, Any, Any]
+
+class TailCall:
+    """Request to replace the running generator with another whose value it would return"""
+
+    __slots__ = ('steps',)
+
+    def __init__(self, steps: Steps):
+        self.steps = steps
+
+class TrampolineEvaluator(MarathiEvaluator):
+    """MarathiEvaluator whose function calls do not use the Python stack
+
+    Every node that contains a call is evaluated by a generator that
+    yields the child nodes it needs; run() keeps those generators on its
+    own list and feeds each value back, so a Marathi call costs a few
+    suspended generators and a Frame instead of Python frames. Parts of
+    the tree without calls go to MarathiEvaluator.evaluate, whose depth
+    is bounded by the source.
+
+    `परत f(...)` directly in a function body replaces the running call
+    instead of adding one, as long as f and everything it calls only
+    read variables they assigned themselves. With dynamic scoping any
+    other function could read the caller's variables, so it keeps them.
+    """
+
+    supports_hooks = False
+    supports_limits = False
+
+    def __init__(self, max_depth: int = DEFAULT_MAX_DEPTH, memoize: bool = True,
+                 memo_size: int = DEFAULT_MEMO_SIZE):
+        super().__init__(memoize, memo_size)
+        self.max_depth = max_depth
+        # Functions a tail call may replace its caller with
+        self.closed = PurityAnalyzer(self.functions, allow_print=True)
+        # id(node) -> (node, whether evaluating it can call a function)
+        self.call_sites: Dict[int, tuple] = {}
+        self.running = False
+        self.steps = {
+            ProgramNode: self.program_steps,
+            AssignmentNode: self.assignment_steps,
+            ArrayNode: self.array_steps,
+            IndexNode: self.index_steps,
+            BinaryOpNode: self.binary_steps,
+            UnaryOpNode: self.unary_steps,
+            PrintNode: self.print_steps,
+            IfNode: self.if_steps,
+            WhileNode: self.while_steps,
+            ForEachNode: self.for_each_steps,
+            FunctionCallNode: self.call_steps,
+            ReturnNode: self.return_steps,
+        }
+
+    def evaluate(self, node: ASTNode) -> Any:
+        if self.running:
+            # Reached from MarathiEvaluator.evaluate, which run() only gives nodes without calls
+            return MarathiEvaluator.evaluate(self, node)
+        return self.run(self.root_steps(node))
+
+    def execute_function(self, function: FunctionDefNode, arguments: List[Any]) -> Any:
+        return self.run(self.function_call(function, arguments))
+
+    def define_function(self, function: FunctionDefNode):
+        super().define_function(function)
+        self.closed.invalidate()
+
+    def run(self, steps: Steps) -> Any:
+        """Drive a generator and everything it waits for to completion"""
+        stack = [steps]
+        push = stack.append
+        has_call = self.has_call
+        plain = MarathiEvaluator.evaluate
+        node_steps = self.steps
+        depth = len(self.call_stack)
+        frame = self.frame
+        running = self.running
+        self.running = True
+        value = None
+        try:
+            while True:
+                try:
+                    request = stack[-1].send(value)
+                except StopIteration as finished:
+                    stack.pop()
+                    value = finished.value
+                    if not stack:
+                        return value
+                    continue
+                if isinstance(request, ASTNode):
+                    if has_call(request):
+                        push(node_steps[type(request)](request))
+                        value = None
+                    else:
+                        value = plain(self, request)
+                elif isinstance(request, TailCall):
+                    stack[-1] = request.steps
+                    value = None
+                else:
+                    push(request)
+                    value = None
+        except BaseException as e:
+            # Remember where the error happened for tracebacks
+            if isinstance(e, Exception) and len(self.call_stack) > depth and not hasattr(e, 'marathi_stack'):
+                e.marathi_stack = self.stack_trace()
+            del self.call_stack[depth:]
+            self.frame = frame
+            raise
+        finally:
+            self.running = running
+
+    def has_call(self, node: ASTNode) -> bool:
+        entry = self.call_sites.get(id(node))
+        if entry is None or entry[0] is not node:
+            self.mark_call_sites(node)
+            entry = self.call_sites[id(node)]
+        return entry[1]
+
+    def mark_call_sites(self, root: ASTNode):
+        """Record for root and every node below it whether it can call
+
+        Defining a function does not run its body, so a definition never
+        counts as calling, though the statements in its body are marked.
+        """
+        call_sites = self.call_sites
+        pending = [(root, False)]
+        while pending:
+            node, expanded = pending.pop()
+            children = []
+            for field in fields(node):
+                value = getattr(node, field.name)
+                if isinstance(value, ASTNode):
+                    children.append(value)
+                elif isinstance(value, list):
+                    children.extend(item for item in value if isinstance(item, ASTNode))
+            if not expanded:
+                pending.append((node, True))
+                pending.extend((child, False) for child in children)
+                continue
+            calls = isinstance(node, FunctionCallNode) or (
+                not isinstance(node, FunctionDefNode)
+                and any(call_sites[id(child)][1] for child in children))
+            call_sites[id(node)] = (node, calls)
+
+    def root_steps(self, node: ASTNode) -> Steps:
+        return (yield node)
+
+    def program_steps(self, node: ProgramNode) -> Steps:
+        result = None
+        for statement in node.statements:
+            result = yield statement
+        return result
+
+    def assignment_steps(self, node: AssignmentNode) -> Steps:
+        value = yield node.value
+        if node.is_constant:
+            if self.is_defined(node.name):
+                raise RuntimeError(f"Cannot reassign constant '{node.name}'")
+        self.store(node.name, value)
+        return value
+
+    def array_steps(self, node: ArrayNode) -> Steps:
+        values = []
+        for element in node.elements:
+            values.append((yield element))
+        return make_list(values)
+
+    def index_steps(self, node: IndexNode) -> Steps:
+        array = yield node.array
+        index = yield node.index
+        if not isinstance(array, LIST_TYPES):
+            raise RuntimeError(f"Indexing non-array type")
+        if not isinstance(index, int):
+            raise RuntimeError(f"Array index must be an integer")
+        if index < 0 or index >= len(array):
+            raise RuntimeError(f"Array index out of bounds")
+        return array[index]
+
+    def binary_steps(self, node: BinaryOpNode) -> Steps:
+        left = yield node.left
+        right = yield node.right
+        operator = node.operator
+        function = BINARY_OPERATORS.get(operator)
+        if function is not None:
+            return function(left, right)
+        if operator == '/':
+            if zero_divisor(right):
+                raise RuntimeError("Division by zero")
+            return left / right
+        elif operator == 'आणि':
+            return left and right
+        elif operator == 'किंवा':
+            return left or right
+        raise RuntimeError(f"Unknown binary operator: {operator}")
+
+    def unary_steps(self, node: UnaryOpNode) -> Steps:
+        operand = yield node.operand
+        if node.operator == 'नाही':
+            return not operand
+        elif node.operator == '-':
+            return -operand
+        return None
+
+    def print_steps(self, node: PrintNode) -> Steps:
+        values = []
+        for argument in node.arguments:
+            values.append((yield argument))
+        print_values(values)
+
+    def if_steps(self, node: IfNode) -> Steps:
+        if (yield node.condition):
+            branch = node.then_branch
+        elif node.else_branch:
+            branch = node.else_branch
+        else:
+            return None
+        for statement in branch:
+            result = yield statement
+            if isinstance(statement, ReturnNode):
+                return result
+        return None
+
+    def while_steps(self, node: WhileNode) -> Steps:
+        while (yield node.condition):
+            for statement in node.body:
+                yield statement
+
+    def for_each_steps(self, node: ForEachNode) -> Steps:
+        iterable = yield node.iterable
+        if not isinstance(iterable, LIST_TYPES):
+            iterable = loop_items(iterable)
+        for element in iterable:
+            self.store(node.variable, element)
+            for statement in node.body:
+                yield statement
+
+    def return_steps(self, node: ReturnNode) -> Steps:
+        if node.value:
+            return (yield node.value)
+        return None
+
+    def call_steps(self, node: FunctionCallNode) -> Steps:
+        function = self.functions.get(node.name)
+        if not function:
+            native = native_function(self.modules, node.name)
+            arguments = []
+            for argument in node.arguments:
+                arguments.append((yield argument))
+            return native(*arguments)
+        arguments = []
+        for argument in node.arguments:
+            arguments.append((yield argument))
+        # The call's value is this node's value
+        yield TailCall(self.function_call(function, arguments))
+
+    def function_call(self, function: FunctionDefNode, arguments: List[Any]) -> Steps:
+        """Call a function, reusing the result of an earlier pure call"""
+        if len(function.parameters) != len(arguments):
+            raise RuntimeError("Argument count mismatch")
+        results = key = None
+        if self.memo is not None:
+            results, key = self.memo.lookup(function, arguments)
+            if results is not None and key in results:
+                return self.memo.reuse(results, key)
+        result = yield self.function_body(function, arguments)
+        if results is not None:
+            self.memo.remember(results, key, result)
+        return result
+
+    def function_body(self, function: FunctionDefNode, arguments: List[Any]) -> Steps:
+        """Run a function body in a new frame, as MarathiEvaluator.execute_function does"""
+        if len(self.call_stack) >= self.max_depth:
+            raise RecursionError("maximum recursion depth exceeded")
+        frame = Frame(function, self.resolver.layout(function), arguments)
+        caller = self.frame
+        self.call_stack.append(frame)
+        self.frame = frame
+
+        result = None
+        for statement in function.body:
+            if isinstance(statement, ReturnNode):
+                call = statement.value
+                callee = self.functions.get(call.name) if isinstance(call, FunctionCallNode) else None
+                if callee:
+                    values = []
+                    for argument in call.arguments:
+                        values.append((yield argument))
+                    if len(callee.parameters) != len(values):
+                        raise RuntimeError("Argument count mismatch")
+                    if self.closed.is_pure(callee):
+                        # Nothing in this frame is needed any more
+                        self.call_stack.pop()
+                        self.frame = caller
+                        yield TailCall(self.function_body(callee, values))
+                    result = yield self.function_call(callee, values)
+                elif call:
+                    result = yield call
+                break
+            value = yield statement
+            # Check if we encountered a return statement in nested structure
+            if isinstance(statement, IfNode) and value is not None:
+                result = value
+                break
+
+        self.call_stack.pop()
+        self.frame = caller
+        return result
@@ -0,0 +1,629 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MarathiLang Transpiler - Translates AST into Python source code
+मराठी भाषा ट्रान्सपायलर - AST चे Python कोडमध्ये भाषांतर
+"""
+
+import math
+import unicodedata
+from typing import Any, Dict, List, Optional
+
+from .parser import *
+from .evaluator import MarathiEvaluator, is_native, length
+from .storage import LIST_TYPES, make_list
+from .sequences import make_range
+from .vector import zero_divisor
+from .scope import collect_names
+
+# Helpers the generated code calls. They are written into every
+# standalone file; in-process programs share one copy of them.
+RUNTIME = '''
+import sys
+import math
+
+_U = object()       # a local variable that has not been assigned yet
+
+def _print(*values):
+    try:
+        print(*values)
+    except UnicodeEncodeError:
+        output = ' '.join(str(value) for value in values)
+        sys.stdout.buffer.write(output.encode('utf-8'))
+        sys.stdout.buffer.write(b'\\n')
+        sys.stdout.buffer.flush()
+
+def _free(E, name):
+    """Look a variable up in the calling scopes; _U if it is not defined"""
+    while type(E) is tuple:
+        names, values, E = E
+        index = names.get(name)
+        if index is not None and values[index] is not _U:
+            return values[index]
+    return E.get(name, _U)
+
+def _read(E, name):
+    value = _free(E, name)
+    if value is _U:
+        raise RuntimeError(f"Undefined variable '{name}'")
+    return value
+
+def _undefined(name):
+    raise RuntimeError(f"Undefined variable '{name}'")
+
+def _constant(value, current, E, name):
+    if current is not _U or _free(E, name) is not _U:
+        raise RuntimeError(f"Cannot reassign constant '{name}'")
+    return value
+
+def _global_constant(V, name, value):
+    if name in V:
+        raise RuntimeError(f"Cannot reassign constant '{name}'")
+    V[name] = value
+
+def _zero_divisor(value):
+    return value == 0
+
+def _divide(left, right):
+    if _zero_divisor(right):
+        raise RuntimeError("Division by zero")
+    return left / right
+
+def _and(left, right):
+    return left and right
+
+def _or(left, right):
+    return left or right
+
+def _unknown_operator(left, right, operator):
+    raise RuntimeError(f"Unknown binary operator: {operator}")
+
+# In-process programs use the interpreter's compact lists instead
+_LISTS = (list,)
+
+def _list(values):
+    return values
+
+def _length(value):
+    if not isinstance(value, (str, _Range) + _LISTS):
+        raise RuntimeError("लांबी फक्त शब्द किंवा यादीची असते")
+    return len(value)
+
+def _index(array, index):
+    if not isinstance(array, _LISTS):
+        raise RuntimeError("Indexing non-array type")
+    if not isinstance(index, int):
+        raise RuntimeError("Array index must be an integer")
+    if index < 0 or index >= len(array):
+        raise RuntimeError("Array index out of bounds")
+    return array[index]
+
+def _iterable(value):
+    if not isinstance(value, _LISTS) and (isinstance(value, str) or not hasattr(value, '__iter__')):
+        raise RuntimeError("ForEach expects a list")
+    return value
+
+def _bound(value):
+    if type(value) not in (int, float) or (type(value) is float and not math.isfinite(value)):
+        raise RuntimeError(f"श्रेणीच्या सीमा संख्या असाव्यात, {value!r} नाही")
+    return value
+
+class _Range:
+    """Same as the interpreter's श्रेणी (interpreter/sequences.py)"""
+
+    def __init__(self, start, stop, step=1):
+        self.start, self.stop, self.step = _bound(start), _bound(stop), _bound(step)
+        if step == 0:
+            raise RuntimeError("श्रेणीचे पाऊल शून्य असू शकत नाही")
+        self.integers = type(start) is int and type(stop) is int and type(step) is int
+        if self.integers:
+            self.count = len(range(start, stop, step))
+        else:
+            self.count = max(0, math.ceil((stop - start) / step))
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        if self.integers:
+            return iter(range(self.start, self.stop, self.step))
+        return (self.start + index * self.step for index in range(self.count))
+
+    def __repr__(self):
+        return f'श्रेणी({self.start!r}, {self.stop!r}, {self.step!r})'
+
+def _range(*arguments):
+    if len(arguments) == 1:
+        return _Range(0, arguments[0])
+    if len(arguments) in (2, 3):
+        return _Range(*arguments)
+    raise RuntimeError("Argument count mismatch")
+
+def _function(F, name, count):
+    function = F.get(name)
+    if function is None:
+        raise RuntimeError(f"अपरिभाषित कार्य '{name}'")
+    if function.arity != count:
+        return _mismatch
+    return function
+
+def _mismatch(E, *arguments):
+    raise RuntimeError("Argument count mismatch")
+
+def _native(M, name):
+    """Function for a call of a builtin or of `मॉड्यूल.कार्य`"""
+    if name == 'लांबी':
+        return _length
+    if name == 'श्रेणी':
+        return _range
+    module_name, _, attribute = name.partition('.')
+    module = M.get(module_name)
+    function = None
+    if module is not None and attribute and not attribute.startswith('_'):
+        function = getattr(module, attribute, None)
+    if not callable(function):
+        raise RuntimeError(f"अपरिभाषित कार्य '{name}'")
+    return function
+'''
+
+MAIN = '''
+F = {}
+M = {}      # standalone scripts have no modules
+
+def _main():
+    for message in _SYNTAX_ERRORS:
+        _print(message)
+    try:
+        _program({}, F)
+    except Exception as error:
+        try:
+            print(f"त्रुटी: {error}")
+        except UnicodeEncodeError:
+            print(f"Error: {error}")
+
+if __name__ == '__main__':
+    _main()
+'''
+
+PYTHON_OPERATORS = {'+', '-', '*', '%', '==', '!=', '<', '>', '<=', '>='}
+CONSTANT_NODES = (NumberNode, StringNode, BooleanNode)
+
+# How the value of an if statement is used, as in the bytecode compiler
+DISCARD = 0         # nested in another statement: परत only ends the branch
+VALUE = 1           # last statement of a program: its value is the result
+FUNCTION = 2        # directly in a function body: a non-null परत returns
+
+def mangle(name: str) -> str:
+    """Python identifier for a Marathi variable name
+
+    Names that Python would accept unchanged keep their spelling after a
+    prefix; anything else (joiners, characters NFKC would fold) is spelled
+    out in hex so that two different Marathi names never meet.
+    """
+    if name.isidentifier() and unicodedata.normalize('NFKC', name) == name:
+        return 'v_' + name
+    return 'u_' + name.encode('utf-8').hex()
+
+def python_constant(value: Any) -> str:
+    if isinstance(value, float) and not math.isfinite(value):
+        return f"float('{value}')"
+    return repr(value)
+
+class FunctionScope:
+    """Variables of the function being translated
+
+    Parameters and assigned names become Python locals; names the body
+    only reads are fetched from the calling scopes when the call starts.
+    """
+
+    def __init__(self, function: FunctionDefNode, descriptor: str):
+        self.parameters = list(dict.fromkeys(function.parameters))
+        assigned: Dict[str, None] = {}
+        read: Dict[str, None] = {}
+        collect_names(function.body, assigned, read)
+        self.locals = [name for name in assigned if name not in self.parameters]
+        self.free = [name for name in read if name not in assigned and name not in self.parameters]
+        self.names = self.parameters + self.locals + self.free
+        self.descriptor = descriptor
+        # Names that are certainly assigned at the current point of the body
+        self.assigned = set(self.parameters)
+        self.temporaries = 0
+
+    def environment(self) -> str:
+        """Expression for the scope a call from this function passes on"""
+        if not self.names:
+            return 'E'
+        values = ', '.join(mangle(name) for name in self.names)
+        if len(self.names) == 1:
+            values += ','
+        return f'({self.descriptor}, ({values}), E)'
+
+class PythonTranspiler:
+    """Translates a ProgramNode into Python source with the same behaviour
+
+    The program becomes `_program(V, F)`, where V is the dict of global
+    variables and F maps function names to the generated functions (the
+    functions find F as a module global of the same name, next to M, the
+    modules that `मॉड्यूल.कार्य` calls reach). Top-level code reads and
+    writes V directly. Every Marathi function becomes
+    a Python function taking the caller's scope and its arguments: the
+    evaluator runs a function in a copy of its caller's variables, so the
+    scope is passed on as a chain of (names, values, caller scope) tuples
+    ending in V, and a name the function has not assigned is looked up in
+    that chain.
+    """
+
+    def __init__(self):
+        self.lines: List[str] = []
+        self.depth = 0
+        self.scope: Optional[FunctionScope] = None
+        self.temporaries = 0
+        self.functions: List[tuple] = []
+        self.function_names: Dict[int, str] = {}
+        self.statement_rules = {
+            AssignmentNode: self.assignment,
+            PrintNode: self.print_statement,
+            IfNode: self.if_statement,
+            WhileNode: self.while_statement,
+            ForEachNode: self.for_each_statement,
+            FunctionDefNode: self.function_definition,
+            ReturnNode: self.return_statement,
+        }
+        self.expression_rules = {
+            NumberNode: self.constant,
+            StringNode: self.constant,
+            BooleanNode: self.constant,
+            NullNode: self.constant,
+            IdentifierNode: self.identifier,
+            BinaryOpNode: self.binary,
+            UnaryOpNode: self.unary,
+            ArrayNode: self.array,
+            IndexNode: self.index,
+            FunctionCallNode: self.function_call,
+        }
+
+    def transpile(self, program: ProgramNode) -> str:
+        """Return the Python source of the functions and `_program` (without RUNTIME)"""
+        self.lines = []
+        self.functions = []
+        self.function_names = {}
+        self.scope = None
+        self.temporaries = 0
+
+        self.emit('def _program(V, F):')
+        self.depth = 1
+        self.emit('_result = None')
+        self.emit('try:')
+        self.depth = 2
+        statements = program.statements
+        for statement in statements[:-1]:
+            self.statement(statement)
+        if statements:
+            self.statement_value(statements[-1])
+        else:
+            self.emit('pass')
+        self.depth = 1
+        self.emit('except KeyError as error:')
+        # Top-level code reads V[name]; nothing else it runs indexes a dict
+        self.emit('    raise RuntimeError(f"Undefined variable \'{error.args[0]}\'") from None')
+        self.emit('return _result')
+        self.depth = 0
+        program_lines = self.lines
+
+        # Functions found while translating, including nested definitions
+        function_lines = []
+        position = 0
+        while position < len(self.functions):
+            node, name = self.functions[position]
+            position += 1
+            self.lines = []
+            self.function(node, name)
+            function_lines.extend(self.lines)
+            function_lines.append('')
+        self.lines = program_lines
+        return '\n'.join(function_lines + program_lines) + '\n'
+
+    def module(self, program: ProgramNode, errors: List[str] = (), source_name: str = '') -> str:
+        """Return a standalone Python script that runs the program"""
+        header = [
+            '#!/usr/bin/env python3',
+            '# -*- coding: utf-8 -*-',
+            f'# Generated by the MarathiLang transpiler from {source_name}' if source_name
+            else '# Generated by the MarathiLang transpiler',
+        ]
+        body = self.transpile(program)
+        return '\n'.join(header) + '\n' + RUNTIME + '\n' + \
+            f'_SYNTAX_ERRORS = {list(errors)!r}\n\n' + body + MAIN
+
+    def emit(self, line: str):
+        self.lines.append('    ' * self.depth + line)
+
+    def temporary(self) -> str:
+        owner = self.scope or self
+        owner.temporaries += 1
+        return f'_t{owner.temporaries}'
+
+    def function_name(self, node: FunctionDefNode) -> str:
+        name = self.function_names.get(id(node))
+        if name is None:
+            name = f'_f{len(self.functions)}'
+            if mangle(node.name).startswith('v_'):
+                name += '_' + node.name
+            self.function_names[id(node)] = name
+            self.functions.append((node, name))
+        return name
+
+    # Statements
+    def statement(self, node: ASTNode):
+        rule = self.statement_rules.get(type(node))
+        if rule is not None:
+            rule(node)
+        elif type(node) in self.expression_rules:
+            self.emit(self.expression(node))
+        else:
+            # Other nodes (BreakNode, ContinueNode) do nothing, as in the tree walker
+            self.emit('pass')
+
+    def statement_value(self, node: ASTNode):
+        """Last statement of a program: also set _result to its value"""
+        if isinstance(node, IfNode):
+            self.if_statement(node, VALUE)
+        elif isinstance(node, AssignmentNode):
+            self.assignment(node)
+            self.emit(f'_result = {self.identifier(IdentifierNode(node.name))}')
+        elif isinstance(node, ReturnNode):
+            self.emit(f'_result = {self.expression(node.value) if node.value else "None"}')
+        elif type(node) in self.expression_rules:
+            self.emit(f'_result = {self.expression(node)}')
+        else:
+            self.statement(node)
+
+    def block(self, statements: List[ASTNode]):
+        """Translate an indented block; assignments in it are not certain afterwards"""
+        self.depth += 1
+        start = len(self.lines)
+        saved = set(self.scope.assigned) if self.scope else None
+        for statement in statements:
+            self.statement(statement)
+        if len(self.lines) == start:
+            self.emit('pass')
+        if self.scope:
+            self.scope.assigned = saved
+        self.depth -= 1
+
+    def assignment(self, node: AssignmentNode):
+        value = self.expression(node.value)
+        name = node.name
+        if self.scope is None:
+            if node.is_constant:
+                self.emit(f'_global_constant(V, {name!r}, {value})')
+            else:
+                self.emit(f'V[{name!r}] = {value}')
+            return
+        target = mangle(name)
+        if node.is_constant:
+            self.emit(f'{target} = _constant({value}, {target}, E, {name!r})')
+        else:
+            self.emit(f'{target} = {value}')
+        self.scope.assigned.add(name)
+
+    def print_statement(self, node: PrintNode):
+        arguments = ', '.join(self.expression(argument) for argument in node.arguments)
+        self.emit(f'_print({arguments})')
+
+    def if_statement(self, node: IfNode, mode: int = DISCARD):
+        self.emit(f'if {self.expression(node.condition)}:')
+        self.branch(node.then_branch, mode)
+        if node.else_branch:
+            self.emit('else:')
+            self.branch(node.else_branch, mode)
+        elif mode == VALUE:
+            self.emit('else:')
+            self.emit('    _result = None')
+
+    def branch(self, statements: List[ASTNode], mode: int):
+        """Translate an if branch: it ends at its first परत"""
+        self.depth += 1
+        start = len(self.lines)
+        saved = set(self.scope.assigned) if self.scope else None
+        for statement in statements:
+            if isinstance(statement, ReturnNode):
+                self.branch_return(statement, mode)
+                break
+            self.statement(statement)
+        else:
+            if mode == VALUE:
+                self.emit('_result = None')
+        if len(self.lines) == start:
+            self.emit('pass')
+        if self.scope:
+            self.scope.assigned = saved
+        self.depth -= 1
+
+    def branch_return(self, node: ReturnNode, mode: int):
+        value = node.value
+        if mode == VALUE:
+            self.emit(f'_result = {self.expression(value) if value else "None"}')
+        elif mode == DISCARD:
+            if value:
+                self.emit(self.expression(value))
+        elif value and not isinstance(value, NullNode):
+            # परत with a value other than शून्य ends the function
+            if isinstance(value, CONSTANT_NODES):
+                self.emit(f'return {self.expression(value)}')
+            else:
+                result = self.temporary()
+                self.emit(f'{result} = {self.expression(value)}')
+                self.emit(f'if {result} is not None:')
+                self.emit(f'    return {result}')
+
+    def while_statement(self, node: WhileNode):
+        self.emit(f'while {self.expression(node.condition)}:')
+        self.block(node.body)
+
+    def for_each_statement(self, node: ForEachNode):
+        iterable = self.expression(node.iterable)
+        if self.scope is None:
+            target = f'V[{node.variable!r}]'
+        else:
+            target = mangle(node.variable)
+        self.emit(f'for {target} in _iterable({iterable}):')
+        if self.scope is None:
+            self.block(node.body)
+            return
+        saved = set(self.scope.assigned)
+        self.scope.assigned.add(node.variable)
+        self.block(node.body)
+        self.scope.assigned = saved
+
+    def function_definition(self, node: FunctionDefNode):
+        self.emit(f'F[{node.name!r}] = {self.function_name(node)}')
+
+    def return_statement(self, node: ReturnNode):
+        # Outside a function body and an if branch, परत only evaluates its value
+        if node.value:
+            self.emit(self.expression(node.value))
+        else:
+            self.emit('pass')
+
+    def function(self, node: FunctionDefNode, name: str):
+        """Translate a function body: it ends at its first top-level परत, or at
+        an if statement that returns a value other than शून्य"""
+        descriptor = f'_D{name[2:]}'
+        scope = self.scope = FunctionScope(node, descriptor)
+        if scope.names:
+            entries = ', '.join(f'{variable!r}: {index}' for index, variable in enumerate(scope.names))
+            self.emit(f'{descriptor} = {{{entries}}}')
+
+        repeated = len(scope.parameters) != len(node.parameters)
+        if repeated:
+            # A repeated parameter name takes the last argument, as in the evaluator
+            parameters = [f'_p{index}' for index in range(len(node.parameters))]
+        else:
+            parameters = [mangle(parameter) for parameter in node.parameters]
+        self.emit(f'def {name}({", ".join(["E"] + parameters)}):')
+        self.depth = 1
+        if repeated:
+            for parameter, argument in zip(node.parameters, parameters):
+                self.emit(f'{mangle(parameter)} = {argument}')
+        if scope.locals:
+            self.emit(' = '.join(mangle(local) for local in scope.locals) + ' = _U')
+        for free in scope.free:
+            self.emit(f'{mangle(free)} = _free(E, {free!r})')
+
+        for statement in node.body:
+            if isinstance(statement, ReturnNode):
+                self.emit(f'return {self.expression(statement.value) if statement.value else "None"}')
+                break
+            if isinstance(statement, IfNode):
+                self.if_statement(statement, FUNCTION)
+            else:
+                self.statement(statement)
+        else:
+            self.emit('return None')
+        self.depth = 0
+        self.emit(f'{name}.arity = {len(node.parameters)}')
+        self.scope = None
+
+    # Expressions: return Python source for the value
+    def expression(self, node: ASTNode) -> str:
+        rule = self.expression_rules.get(type(node))
+        if rule is None:
+            return 'None'
+        return rule(node)
+
+    def constant(self, node: ASTNode) -> str:
+        return python_constant(None if isinstance(node, NullNode) else node.value)
+
+    def identifier(self, node: IdentifierNode) -> str:
+        name = node.name
+        scope = self.scope
+        if scope is None:
+            return f'V[{name!r}]'
+        variable = mangle(name)
+        if name in scope.assigned:
+            return variable
+        if name in scope.free:
+            return f'({variable} if {variable} is not _U else _undefined({name!r}))'
+        return f'({variable} if {variable} is not _U else _read(E, {name!r}))'
+
+    def binary(self, node: BinaryOpNode) -> str:
+        # Both operands are always evaluated, left first, as in the tree walker
+        left = self.expression(node.left)
+        right = self.expression(node.right)
+        operator = node.operator
+        if operator in PYTHON_OPERATORS:
+            return f'({left} {operator} {right})'
+        if operator == '/':
+            return f'_divide({left}, {right})'
+        if operator == 'आणि':
+            return f'_and({left}, {right})'
+        if operator == 'किंवा':
+            return f'_or({left}, {right})'
+        return f'_unknown_operator({left}, {right}, {operator!r})'
+
+    def unary(self, node: UnaryOpNode) -> str:
+        operand = self.expression(node.operand)
+        if node.operator == 'नाही':
+            return f'(not {operand})'
+        if node.operator == '-':
+            return f'(-{operand})'
+        return f'({operand}, None)[1]'
+
+    def array(self, node: ArrayNode) -> str:
+        return '_list([' + ', '.join(self.expression(element) for element in node.elements) + '])'
+
+    def index(self, node: IndexNode) -> str:
+        return f'_index({self.expression(node.array)}, {self.expression(node.index)})'
+
+    def function_call(self, node: FunctionCallNode) -> str:
+        # The function is looked up before its arguments are evaluated
+        if is_native(node.name):
+            arguments = ', '.join(self.expression(argument) for argument in node.arguments)
+            return f'_native(M, {node.name!r})({arguments})'
+        environment = 'V' if self.scope is None else self.scope.environment()
+        arguments = ''.join(', ' + self.expression(argument) for argument in node.arguments)
+        return f'_function(F, {node.name!r}, {len(node.arguments)})({environment}{arguments})'
+
+class PythonEvaluator(MarathiEvaluator):
+    """MarathiEvaluator that transpiles programs to Python and runs the compiled code
+
+    `functions` holds the generated Python functions instead of
+    FunctionDefNodes.
+    """
+
+    supports_hooks = False
+    supports_limits = False
+
+    def __init__(self):
+        super().__init__(memoize=False)
+        self.functions: Dict[str, Any] = {}
+        self.runtime: Dict[str, Any] = {'__name__': 'marathi_runtime'}
+        exec(RUNTIME, self.runtime)
+        self.runtime.update(_LISTS=LIST_TYPES, _list=make_list, _length=length, _range=make_range,
+                            _zero_divisor=zero_divisor)
+
+    def load(self, program: ProgramNode, functions: Dict[str, Any]) -> Any:
+        """Compile a program against a function table and return its `_program`"""
+        source = PythonTranspiler().transpile(program)
+        namespace = dict(self.runtime)
+        namespace['F'] = functions
+        namespace['M'] = self.modules
+        exec(compile(source, '<मराठी>', 'exec'), namespace)
+        return namespace['_program']
+
+    def evaluate(self, node: ASTNode) -> Any:
+        if not isinstance(node, ProgramNode):
+            node = ProgramNode([node])
+        return self.load(node, self.functions)(self.variables, self.functions)
+
+    def execute_function(self, function: FunctionDefNode, arguments: List[Any]) -> Any:
+        # Compile the definition without leaving it in the function table
+        previous = self.functions.get(function.name)
+        self.evaluate(ProgramNode([function]))
+        compiled = self.functions.pop(function.name)
+        if previous is not None:
+            self.functions[function.name] = previous
+        if compiled.arity != len(arguments):
+            raise RuntimeError("Argument count mismatch")
+        return compiled(self.variables, *arguments)
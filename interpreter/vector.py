@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MarathiLang Vectors - Numeric arrays with elementwise operations
+मराठी भाषा सदिश - घटकनिहाय क्रिया असलेल्या संख्या यादी
+
+A Vector holds numbers of one kind (integers, decimals or truth values)
+in a NumPy array when NumPy is installed and in an `array` module buffer
+otherwise. `+ - * / %` and the comparisons work element by element, on
+two vectors of the same length or on a vector and a number, in C loops
+instead of one interpreted step per element. Integers are 64-bit; the
+array backend fails on overflow where NumPy wraps around, and NumPy may
+add decimals in another order, but otherwise both give the same results.
+"""
+
+import operator
+from array import array
+from itertools import repeat
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Union
+
+from .storage import LIST_TYPES
+from .sequences import Range
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+BACKEND = 'numpy' if numpy is not None else 'array'
+
+INT = 'int'
+FLOAT = 'float'
+BOOL = 'bool'
+
+# Storage of each kind of element
+TYPECODES = {INT: 'q', FLOAT: 'd', BOOL: 'B'}
+DTYPES = {INT: 'int64', FLOAT: 'float64', BOOL: 'bool'}
+
+ARITHMETIC: Dict[str, Callable[[Any, Any], Any]] = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.truediv,
+    '%': operator.mod,
+}
+COMPARISONS: Dict[str, Callable[[Any, Any], Any]] = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '>': operator.gt,
+    '<=': operator.le,
+    '>=': operator.ge,
+}
+if numpy is not None:
+    UFUNCS = {
+        '+': numpy.add,
+        '-': numpy.subtract,
+        '*': numpy.multiply,
+        '/': numpy.true_divide,
+        '%': numpy.mod,
+        '==': numpy.equal,
+        '!=': numpy.not_equal,
+        '<': numpy.less,
+        '>': numpy.greater,
+        '<=': numpy.less_equal,
+        '>=': numpy.greater_equal,
+    }
+
+Scalar = Union[int, float, bool]
+
+def scalar_kind(value: Any) -> Any:
+    """Kind of a number, or None for anything else"""
+    value_type = type(value)
+    if value_type is bool:
+        return BOOL
+    if value_type is int:
+        return INT
+    if value_type is float:
+        return FLOAT
+    return None
+
+def result_kind(symbol: str, left: str, right: str) -> str:
+    if symbol in COMPARISONS:
+        return BOOL
+    if symbol == '/' or FLOAT in (left, right):
+        return FLOAT
+    # Truth values count as 0 and 1, as they do for single numbers
+    return INT
+
+def operator_method(symbol: str, reflected: bool = False) -> Callable[[Any, Any], Any]:
+    def method(self, other):
+        return self.combine(symbol, other, reflected)
+    return method
+
+class Vector:
+    """Numbers of one kind, stored unboxed
+
+    Iterating or converting with tolist() gives Python ints, floats or
+    bools. A vector is true when any element is non-zero, so
+    `जर अ == ब` asks whether any element matches, and dividing by a
+    vector that holds a zero fails like dividing by zero.
+    """
+
+    __slots__ = ('data', 'kind')
+
+    def __init__(self, data: Any, kind: str):
+        self.data = data
+        self.kind = kind
+
+    @classmethod
+    def from_values(cls, values: Iterable[Any]) -> 'Vector':
+        if isinstance(values, Vector):
+            return values
+        values = list(values)
+        kinds = set()
+        for value in values:
+            kind = scalar_kind(value)
+            if kind is None:
+                raise RuntimeError(f"सदिशात फक्त संख्या असू शकतात, {value!r} नाही")
+            kinds.add(kind)
+        if FLOAT in kinds:
+            kind = FLOAT
+        elif INT in kinds or not kinds:
+            kind = INT
+        else:
+            kind = BOOL
+        return cls.build(values, kind)
+
+    @classmethod
+    def build(cls, values: Iterable[Any], kind: str) -> 'Vector':
+        if numpy is not None:
+            return cls(numpy.fromiter(values, dtype=DTYPES[kind]), kind)
+        return cls(array(TYPECODES[kind], values), kind)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __iter__(self) -> Iterator[Scalar]:
+        return iter(self.tolist())
+
+    def tolist(self) -> List[Scalar]:
+        if numpy is not None:
+            return self.data.tolist()
+        if self.kind == BOOL:
+            return [bool(value) for value in self.data]
+        return self.data.tolist()
+
+    def __repr__(self) -> str:
+        return f'सदिश({self.tolist()!r})'
+
+    def __bool__(self) -> bool:
+        # Whether any or every element should count is the program's to say
+        raise RuntimeError("सदिशाचे सत्यमूल्य संदिग्ध आहे; जर, आणि, किंवा व नाही यांना एकच मूल्य हवे")
+
+    def has_zero(self) -> bool:
+        if numpy is not None:
+            return bool((self.data == 0).any())
+        return 0 in self.data
+
+    __hash__ = None
+
+    def operand(self, other: Any) -> Any:
+        """A vector or number to combine with self, or NotImplemented"""
+        if isinstance(other, LIST_TYPES):
+            other = Vector.from_values(other)
+        if isinstance(other, Vector):
+            if len(other) != len(self):
+                raise RuntimeError(f"सदिशांची लांबी जुळत नाही: {len(self)} आणि {len(other)}")
+            return other
+        if scalar_kind(other) is None:
+            return NotImplemented
+        return other
+
+    def combine(self, symbol: str, other: Any, reflected: bool = False) -> Any:
+        other = self.operand(other)
+        if other is NotImplemented:
+            return NotImplemented
+        other_kind = other.kind if isinstance(other, Vector) else scalar_kind(other)
+        kind = result_kind(symbol, self.kind, other_kind)
+        left, right = (other, self) if reflected else (self, other)
+        if numpy is not None:
+            return Vector(numpy_combine(symbol, left, right, kind), kind)
+        count = len(self)
+        left_values = left.data if isinstance(left, Vector) else repeat(left, count)
+        right_values = right.data if isinstance(right, Vector) else repeat(right, count)
+        return Vector(array(TYPECODES[kind], map(ARITHMETIC.get(symbol) or COMPARISONS[symbol],
+                                                 left_values, right_values)), kind)
+
+    __add__ = operator_method('+')
+    __radd__ = operator_method('+', True)
+    __sub__ = operator_method('-')
+    __rsub__ = operator_method('-', True)
+    __mul__ = operator_method('*')
+    __rmul__ = operator_method('*', True)
+    __truediv__ = operator_method('/')
+    __rtruediv__ = operator_method('/', True)
+    __mod__ = operator_method('%')
+    __rmod__ = operator_method('%', True)
+    __eq__ = operator_method('==')
+    __ne__ = operator_method('!=')
+    __lt__ = operator_method('<')
+    __gt__ = operator_method('>')
+    __le__ = operator_method('<=')
+    __ge__ = operator_method('>=')
+
+    def __neg__(self) -> 'Vector':
+        kind = INT if self.kind == BOOL else self.kind
+        if numpy is not None:
+            return Vector(numpy.negative(self.data.astype(DTYPES[kind])), kind)
+        return Vector(array(TYPECODES[kind], map(operator.neg, self.data)), kind)
+
+def numpy_combine(symbol: str, left: Any, right: Any, kind: str) -> Any:
+    """Apply an operator to NumPy operands; either may be a plain number"""
+    operands = []
+    for operand in (left, right):
+        if isinstance(operand, Vector):
+            operand = operand.data
+            if operand.dtype == numpy.bool_ and symbol in ARITHMETIC:
+                operand = operand.astype('int64')
+        elif type(operand) is bool:
+            operand = int(operand)
+        operands.append(operand)
+    if symbol in ('/', '%') and numpy.any(numpy.asarray(operands[1]) == 0):
+        # NumPy would give inf or nan; single numbers fail instead
+        raise ZeroDivisionError('division by zero' if symbol == '/' else 'modulo by zero')
+    return UFUNCS[symbol](operands[0], operands[1]).astype(DTYPES[kind], copy=False)
+
+def zero_divisor(value: Any) -> bool:
+    """Whether dividing by value fails: it is 0, or a vector with a 0 in it"""
+    if type(value) is Vector:
+        return value.has_zero()
+    return value == 0
+
+def as_vector(values: Any) -> Vector:
+    if isinstance(values, Vector):
+        return values
+    if isinstance(values, LIST_TYPES + (Range,)):
+        return Vector.from_values(values)
+    raise RuntimeError("सदिश किंवा संख्यांची यादी अपेक्षित")
+
+def scalar(value: Any) -> Scalar:
+    """A Python number for a NumPy scalar"""
+    return value.item() if hasattr(value, 'item') else value
+
+def total(values: Any) -> Scalar:
+    vector = as_vector(values)
+    if numpy is not None:
+        data = vector.data.astype('int64') if vector.kind == BOOL else vector.data
+        return scalar(data.sum())
+    return sum(vector.data)
+
+def minimum(values: Any) -> Scalar:
+    vector = as_vector(values)
+    if not len(vector):
+        raise RuntimeError("रिकाम्या सदिशाचे किमान नाही")
+    return reduce_with(vector, min, 'min')
+
+def maximum(values: Any) -> Scalar:
+    vector = as_vector(values)
+    if not len(vector):
+        raise RuntimeError("रिकाम्या सदिशाचे कमाल नाही")
+    return reduce_with(vector, max, 'max')
+
+def reduce_with(vector: Vector, function: Callable, method: str) -> Scalar:
+    if numpy is not None:
+        return scalar(getattr(vector.data, method)())
+    value = function(vector.data)
+    return bool(value) if vector.kind == BOOL else value
+
+def mean(values: Any) -> float:
+    vector = as_vector(values)
+    if not len(vector):
+        raise RuntimeError("रिकाम्या सदिशाची सरासरी नाही")
+    return total(vector) / len(vector)
+
+def dot(left: Any, right: Any) -> Scalar:
+    left = as_vector(left)
+    right = left.operand(as_vector(right))
+    if numpy is not None:
+        data = [vector.data.astype('int64') if vector.kind == BOOL else vector.data
+                for vector in (left, right)]
+        return scalar(numpy.dot(data[0], data[1]))
+    return sum(map(operator.mul, left.data, right.data))
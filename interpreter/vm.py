@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MarathiLang Virtual Machine - Runs bytecode from the bytecode compiler
+मराठी भाषा आभासी यंत्र - बाइटकोड चालवते
+"""
+
+from typing import Any, Dict, List
+
+from .parser import *
+from .bytecode import *
+from .evaluator import MarathiEvaluator, native_function, print_values
+from .storage import LIST_TYPES, make_list
+from .sequences import loop_items
+from .vector import zero_divisor
+
+class Unset:
+    """Marker for a slot that has not been assigned in its frame"""
+
+    def __repr__(self):
+        return '<unset>'
+
+UNSET = Unset()
+
+class VirtualMachine:
+    """Stack-based interpreter for CodeObjects
+
+    Calls push a frame on an explicit frame stack instead of recursing in
+    Python, so the call depth is limited by max_depth only. A frame is a
+    (code, slots, caller frame) tuple; globals live in the evaluator's
+    variables dict.
+    """
+
+    def __init__(self, functions: Dict[str, FunctionDefNode], max_depth: int = 10000,
+                 modules: Dict[str, Any] = None):
+        self.functions = functions
+        self.modules = {} if modules is None else modules
+        self.max_depth = max_depth
+        self.compiler = BytecodeCompiler()
+        # id(FunctionDefNode) -> (node, code, unset slots after the parameters)
+        self.function_code: Dict[int, tuple] = {}
+
+    def code_for(self, function: FunctionDefNode) -> tuple:
+        """Return the function_code entry for a function, compiling it on first use"""
+        entry = self.function_code.get(id(function))
+        if entry is None or entry[0] is not function:
+            code = self.compiler.compile_function(function)
+            unset = [UNSET] * (len(code.slot_names) - len(code.parameter_slots))
+            entry = (function, code, unset)
+            self.function_code[id(function)] = entry
+        return entry
+
+    def lookup(self, frame: tuple, slot: int, variables: Dict[str, Any]) -> Any:
+        """Value of an unset slot: the variable as the caller saw it at the call"""
+        name = frame[0].slot_names[slot]
+        caller = frame[2]
+        while caller is not None:
+            index = caller[0].slot_index.get(name)
+            if index is not None and caller[1][index] is not UNSET:
+                value = caller[1][index]
+                break
+            caller = caller[2]
+        else:
+            if name not in variables:
+                raise RuntimeError(f"Undefined variable '{name}'")
+            value = variables[name]
+        # The callers are suspended until this frame returns, so the value
+        # cannot change; keep it for later reads
+        frame[1][slot] = value
+        return value
+
+    def is_defined(self, frame: tuple, slot: int, variables: Dict[str, Any]) -> bool:
+        try:
+            self.lookup(frame, slot, variables)
+        except RuntimeError:
+            return False
+        return True
+
+    def call_function(self, function: FunctionDefNode, arguments: List[Any], variables: Dict[str, Any]) -> Any:
+        """Call a function from top-level code"""
+        code = CodeObject('<कॉल>', None)
+        code.emit(CONST, code.add_constant(function))
+        for argument in arguments:
+            code.emit(CONST, len(code.constants))
+            code.constants.append(argument)
+        code.emit(CALL, len(arguments))
+        code.emit(RETURN)
+        return self.run(code, variables)
+
+    def run(self, code: CodeObject, variables: Dict[str, Any]) -> Any:
+        """Run top-level code against the global variables and return its result"""
+        functions = self.functions
+        function_code = self.function_code
+        lookup = self.lookup
+        max_depth = self.max_depth
+
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        frames = []             # suspended callers: (code, pc, frame)
+        top_slots = slots = [variables.get(name, UNSET) for name in code.slot_names]
+        frame = (code, slots, None)
+        new_globals = []        # top-level slots assigned for the first time, in order
+        instructions = code.instructions
+        constants = code.constants
+        pc = 0
+
+        try:
+            while True:
+                opcode, argument = instructions[pc]
+                pc += 1
+
+                if opcode < 9:
+                    if opcode < 4:
+                        if opcode == LOAD_LOCAL:
+                            value = slots[argument]
+                            if value is UNSET:
+                                value = lookup(frame, argument, variables)
+                            push(value)
+                        elif opcode == LOAD_LOCAL_CONST_BINARY:
+                            slot, constant, function = argument
+                            value = slots[slot]
+                            if value is UNSET:
+                                value = lookup(frame, slot, variables)
+                            push(function(value, constant))
+                        elif opcode == CONST:
+                            push(constants[argument])
+                        else:   # BINARY
+                            right = pop()
+                            stack[-1] = argument(stack[-1], right)
+                    elif opcode == LOOKUP_FUNCTION:
+                        function = functions.get(argument)
+                        if not function:
+                            raise RuntimeError(f"अपरिभाषित कार्य '{argument}'")
+                        push(function)
+                    elif opcode <= CALL_LOCAL_CONST_BINARY:
+                        if opcode == CALL_LOCAL_CONST_BINARY:
+                            # Same as LOOKUP_FUNCTION, LOAD_LOCAL_CONST_BINARY, CALL 1
+                            name, slot, constant, operation = argument
+                            function = functions.get(name)
+                            if not function:
+                                raise RuntimeError(f"अपरिभाषित कार्य '{name}'")
+                            value = slots[slot]
+                            if value is UNSET:
+                                value = lookup(frame, slot, variables)
+                            push(function)
+                            push(operation(value, constant))
+                            argument = 1
+                        base = len(stack) - argument
+                        function = stack[base - 1]
+                        entry = function_code.get(id(function))
+                        if entry is None or entry[0] is not function:
+                            entry = self.code_for(function)
+                        callee = entry[1]
+                        if argument != len(callee.parameter_slots):
+                            raise RuntimeError("Argument count mismatch")
+                        if len(frames) >= max_depth:
+                            raise RecursionError("maximum recursion depth exceeded")
+                        frames.append((code, pc, frame))
+                        if callee.simple_parameters:
+                            slots = stack[base:] + entry[2]
+                        else:
+                            slots = [UNSET] * len(callee.slot_names)
+                            for slot, value in zip(callee.parameter_slots, stack[base:]):
+                                slots[slot] = value
+                        del stack[base - 1:]
+                        frame = (callee, slots, frame)
+                        code = callee
+                        instructions = code.instructions
+                        constants = code.constants
+                        pc = 0
+                    else:   # RETURN, RETURN_IF_VALUE
+                        if opcode == RETURN_IF_VALUE and stack[-1] is None:
+                            pop()
+                            continue
+                        if not frames:
+                            return pop()
+                        code, pc, frame = frames.pop()
+                        slots = frame[1]
+                        instructions = code.instructions
+                        constants = code.constants
+                elif opcode < 17:
+                    if opcode < 13:
+                        if opcode == STORE_LOCAL:
+                            slots[argument] = pop()
+                        elif opcode == STORE_GLOBAL:
+                            if slots[argument] is UNSET:
+                                new_globals.append(argument)
+                            slots[argument] = pop()
+                        elif opcode == LOCAL_CONST_BINARY_STORE:
+                            slot, constant, function, target = argument
+                            value = slots[slot]
+                            if value is UNSET:
+                                value = lookup(frame, slot, variables)
+                            value = function(value, constant)
+                            if slots[target] is UNSET and slots is top_slots:
+                                new_globals.append(target)
+                            slots[target] = value
+                        else:   # LOAD_LOCAL_LOCAL_BINARY
+                            slot, other, function = argument
+                            value = slots[slot]
+                            if value is UNSET:
+                                value = lookup(frame, slot, variables)
+                            other_value = slots[other]
+                            if other_value is UNSET:
+                                other_value = lookup(frame, other, variables)
+                            push(function(value, other_value))
+                    elif opcode == LOCAL_CONST_COMPARE_JUMP:
+                        slot, constant, function, target = argument
+                        value = slots[slot]
+                        if value is UNSET:
+                            value = lookup(frame, slot, variables)
+                        if not function(value, constant):
+                            pc = target
+                    elif opcode == LOCAL_CONST_COMPARE_LOOP:
+                        slot, constant, function, target = argument
+                        value = slots[slot]
+                        if value is UNSET:
+                            value = lookup(frame, slot, variables)
+                        if function(value, constant):
+                            pc = target
+                    elif opcode == COMPARE_JUMP_IF_FALSE:
+                        right = pop()
+                        if not argument[0](pop(), right):
+                            pc = argument[1]
+                    else:   # JUMP
+                        pc = argument
+                elif opcode == FOR_ITER:
+                    for value in stack[-1]:
+                        push(value)
+                        break
+                    else:
+                        pop()
+                        pc = argument
+                elif opcode == POP_JUMP_IF_FALSE:
+                    if not pop():
+                        pc = argument
+                elif opcode == POP:
+                    pop()
+                elif opcode == GET_ITER:
+                    if not isinstance(stack[-1], LIST_TYPES):
+                        loop_items(stack[-1])
+                    stack[-1] = iter(stack[-1])
+                elif opcode == DIVIDE:
+                    right = pop()
+                    if zero_divisor(right):
+                        raise RuntimeError("Division by zero")
+                    stack[-1] = stack[-1] / right
+                elif opcode == INDEX:
+                    index = pop()
+                    array = stack[-1]
+                    if not isinstance(array, LIST_TYPES):
+                        raise RuntimeError(f"Indexing non-array type")
+                    if not isinstance(index, int):
+                        raise RuntimeError(f"Array index must be an integer")
+                    if index < 0 or index >= len(array):
+                        raise RuntimeError(f"Array index out of bounds")
+                    stack[-1] = array[index]
+                elif opcode == BUILD_LIST:
+                    if argument:
+                        values = stack[-argument:]
+                        del stack[-argument:]
+                        push(make_list(values))
+                    else:
+                        push([])
+                elif opcode == PRINT:
+                    if argument:
+                        values = stack[-argument:]
+                        del stack[-argument:]
+                    else:
+                        values = []
+                    print_values(values)
+                elif opcode == AND:
+                    right = pop()
+                    stack[-1] = stack[-1] and right
+                elif opcode == OR:
+                    right = pop()
+                    stack[-1] = stack[-1] or right
+                elif opcode == NOT:
+                    stack[-1] = not stack[-1]
+                elif opcode == NEGATE:
+                    stack[-1] = -stack[-1]
+                elif opcode == UNARY_NONE:
+                    stack[-1] = None
+                elif opcode == DUP:
+                    push(stack[-1])
+                elif opcode == STORE_CONST_LOCAL:
+                    if slots[argument] is not UNSET or self.is_defined(frame, argument, variables):
+                        raise RuntimeError(f"Cannot reassign constant '{code.slot_names[argument]}'")
+                    slots[argument] = pop()
+                elif opcode == STORE_CONST_GLOBAL:
+                    if slots[argument] is not UNSET:
+                        raise RuntimeError(f"Cannot reassign constant '{code.slot_names[argument]}'")
+                    new_globals.append(argument)
+                    slots[argument] = pop()
+                elif opcode == DEFINE_FUNCTION:
+                    function = constants[argument]
+                    functions[function.name] = function
+                elif opcode == LOOKUP_NATIVE:
+                    push(native_function(self.modules, argument))
+                elif opcode == CALL_NATIVE:
+                    if argument:
+                        values = stack[-argument:]
+                        del stack[-argument:]
+                    else:
+                        values = []
+                    stack[-1] = stack[-1](*values)
+                else:
+                    raise RuntimeError(f"Unknown opcode: {opcode}")
+        finally:
+            # Write the top-level slots back; new names are added in the
+            # order they were first assigned, as the tree walker would
+            top_names = frames[0][0].slot_names if frames else code.slot_names
+            for name, value in zip(top_names, top_slots):
+                if value is not UNSET and name in variables:
+                    variables[name] = value
+            for slot in new_globals:
+                variables[top_names[slot]] = top_slots[slot]
+
+class VMEvaluator(MarathiEvaluator):
+    """MarathiEvaluator that compiles programs to bytecode and runs them on the VM"""
+
+    supports_hooks = False
+    supports_limits = False
+
+    def __init__(self, max_depth: int = 10000):
+        super().__init__(memoize=False)
+        self.vm = VirtualMachine(self.functions, max_depth, self.modules)
+
+    def evaluate(self, node: ASTNode) -> Any:
+        if not isinstance(node, ProgramNode):
+            node = ProgramNode([node])
+        return self.vm.run(self.vm.compiler.compile_program(node), self.variables)
+
+    def execute_function(self, function: FunctionDefNode, arguments: List[Any]) -> Any:
+        return self.vm.call_function(function, arguments, self.variables)
@@ -29,21 +29,71 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'interpreter'))
 from interpreter.lexer import MarathiLexer
 from interpreter.parser import MarathiParser
 from interpreter.evaluator import MarathiEvaluator
-from interpreter.stdlib.ganit import GanitModule
-from interpreter.stdlib.shabd import ShabdModule
-from interpreter.stdlib.pravesh import PraveshModule
+from interpreter.compiler import ClosureEvaluator
+from interpreter.vm import VMEvaluator
+from interpreter.trampoline import TrampolineEvaluator
+from interpreter.bytecode import BytecodeCompiler, disassemble
+from interpreter.transpiler import PythonEvaluator, PythonTranspiler
+from interpreter.optimizer import Optimizer, PASSES
+from interpreter.cache import ASTCache
+from interpreter.profiler import DETERMINISTIC, MODES, SAMPLING, ProfilingEvaluator, Sampler
+from interpreter.coverage import Coverage
+from interpreter.limits import Limits, parse_size
+from interpreter.server import DEFAULT_MAX_RUNS, WorkerPool, serve_stdio, serve_unix
+from interpreter.stdlib import load_stdlib
+
+# Execution engines selectable with --engine
+ENGINES = {
+    'tree': MarathiEvaluator,       # walks the AST node by node
+    'closure': ClosureEvaluator,    # compiles each node into a Python closure first
+    'vm': VMEvaluator,              # compiles to bytecode for a stack-based virtual machine
+    'python': PythonEvaluator,      # transpiles to Python source and runs the compiled code
+    'trampoline': TrampolineEvaluator,  # walks the AST without using the Python stack for calls
+}
+
+# Engines whose calls do not use the Python stack and take a max_depth
+DEPTH_LIMITED_ENGINES = ('vm', 'trampoline')
 
 class MarathiREPL:
-    def __init__(self):
+    def __init__(self, use_cache=True, rebuild_cache=False, cache_dir=None, engine='tree', optimize=None,
+                 memoize=True, max_depth=None, profile=None, coverage=False, limits=None):
         self.lexer = MarathiLexer()
         self.parser = MarathiParser()
-        self.evaluator = MarathiEvaluator()
+        if max_depth is not None:
+            self.evaluator = ENGINES[engine](max_depth=max_depth)
+        elif profile == DETERMINISTIC:
+            self.evaluator = ProfilingEvaluator()
+        else:
+            self.evaluator = ENGINES[engine]()
+        if not memoize or coverage:
+            # Only the tree and trampoline evaluators remember results of
+            # pure functions. A remembered call skips its body, whose lines
+            # coverage would then count too rarely.
+            self.evaluator.memo = None
+        if limits is not None:
+            # Steps, time, call depth and memory of each run (tree engine only)
+            self.evaluator.set_limits(limits)
         self.history = []
         
+        # Profiling mode of execute_file (tree engine only) and its results
+        self.profile_mode = profile
+        self.profile = None
+        
+        # Line coverage of executed files (tree engine only)
+        self.coverage = None
+        if coverage:
+            self.coverage = Coverage()
+            self.evaluator.add_hooks(self.coverage)
+        
+        # Optimizer passes run on every parsed program; None turns them off
+        self.optimizer = Optimizer(optimize) if optimize is not None else None
+        
+        # Parsed files are cached as .mrc files keyed by their content hash
+        self.cache = ASTCache(cache_dir) if use_cache else None
+        self.rebuild_cache = rebuild_cache
+        
         # Load standard library modules
-        self.evaluator.load_module('गणित', GanitModule())
-        self.evaluator.load_module('शब्द', ShabdModule())
-        self.evaluator.load_module('प्रवेश', PraveshModule())
+        load_stdlib(self.evaluator)
         
     def run_repl(self):
         print("मराठी भाषा v1.0 - Marathi Programming Language")
@@ -96,7 +146,7 @@ class MarathiREPL:
     def execute_line(self, line):
         try:
             tokens = self.lexer.tokenize(line)
-            ast = self.parser.parse(tokens)
+            ast = self.optimized(self.parser.parse(tokens))
             result = self.evaluator.evaluate(ast)
             
             if result is not None:
@@ -108,14 +158,36 @@ class MarathiREPL:
             except UnicodeEncodeError:
                 print(f"Error: {e}")
     
-    def execute_file(self, filename):
+    def parse_file(self, filename):
+        if self.cache:
+            return self.optimized(self.cache.compile_file(filename, self.lexer, self.parser, self.rebuild_cache))
+        # Tokens are pulled lazily from the file while parsing
+        with open(filename, 'r', encoding='utf-8') as f:
+            return self.optimized(self.parser.parse(self.lexer.iter_tokens(f)))
+    
+    def optimized(self, ast):
+        # The cache keeps the parser's tree; passes run after it is loaded
+        return self.optimizer.optimize(ast) if self.optimizer else ast
+    
+    def execute_file(self, filename, disassemble_only=False, compile_to=None):
         try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                code = f.read()
-            
-            tokens = self.lexer.tokenize(code)
-            ast = self.parser.parse(tokens)
-            self.evaluator.evaluate(ast)
+            if compile_to:
+                # Parse afresh so the script can replay the syntax errors
+                with open(filename, 'r', encoding='utf-8') as f:
+                    ast = self.optimized(self.parser.parse(self.lexer.iter_tokens(f)))
+                source = PythonTranspiler().module(ast, self.parser.errors, os.path.basename(filename))
+                with open(compile_to, 'w', encoding='utf-8') as f:
+                    f.write(source)
+                return
+            ast = self.parse_file(filename)
+            if self.coverage and not disassemble_only:
+                self.coverage.add_program(ast)
+            if disassemble_only:
+                print(disassemble(BytecodeCompiler().compile_program(ast)))
+            elif self.profile_mode:
+                self.run_profiled(ast, os.path.basename(filename))
+            else:
+                self.evaluator.evaluate(ast)
             
         except FileNotFoundError:
             try:
@@ -128,6 +200,17 @@ class MarathiREPL:
             except UnicodeEncodeError:
                 print(f"Error: {e}")
     
+    def run_profiled(self, ast, root):
+        if self.profile_mode == SAMPLING:
+            sampler = Sampler(root)
+            self.profile = sampler.profile
+            with sampler:
+                self.evaluator.evaluate(ast)
+        else:
+            self.profile = self.evaluator.profile
+            self.profile.root = root
+            self.evaluator.evaluate(ast)
+    
     def show_help(self):
         help_text = """
 मराठी भाषा - मदत (MarathiLang Help)
@@ -205,20 +288,139 @@ REPL आज्ञा (REPL Commands):
         else:
             print("उपलब्ध उदाहरणे: hello, variables, loops")
 
+def serve(args, limits, max_depth):
+    """Run the execution server until its input ends or it is interrupted"""
+    options = {}
+    if max_depth is not None:
+        options['max_depth'] = max_depth
+    if args.no_memoize and args.engine in ('tree', 'trampoline'):
+        options['memoize'] = False
+    with WorkerPool(args.workers, args.max_runs, ENGINES[args.engine], limits, options) as pool:
+        if args.socket:
+            serve_unix(pool, args.socket)
+        else:
+            serve_stdio(pool)
+
 def main():
     parser = argparse.ArgumentParser(description='मराठी भाषा - Marathi Programming Language')
     parser.add_argument('file', nargs='?', help='MarathiLang file to execute (.mr)')
     parser.add_argument('--repl', action='store_true', help='Start REPL mode')
     parser.add_argument('--version', action='version', version='मराठी भाषा 1.0')
+    parser.add_argument('--no-cache', action='store_true', help='Do not read or write .mrc AST cache files')
+    parser.add_argument('--rebuild-cache', action='store_true', help='Re-parse the file and overwrite its .mrc cache')
+    parser.add_argument('--cache-dir', help='Directory for .mrc files (default: __marathicache__ next to the file)')
+    parser.add_argument('--engine', choices=list(ENGINES), default='tree',
+                        help='How programs are executed (default: tree)')
+    parser.add_argument('--disassemble', action='store_true',
+                        help='Print the bytecode of the file instead of running it')
+    parser.add_argument('--compile', metavar='OUT',
+                        help='Translate the file into a standalone Python script instead of running it')
+    parser.add_argument('--optimize', action='store_true',
+                        help='Fold constants and remove dead code before running')
+    parser.add_argument('--passes', metavar='PASSES',
+                        help=f'Comma-separated optimizer passes, in order (implies --optimize; '
+                             f'default: {",".join(PASSES)})')
+    parser.add_argument('--optimize-stats', action='store_true',
+                        help='Print what each optimizer pass changed to stderr (implies --optimize)')
+    parser.add_argument('--max-depth', type=int, metavar='N',
+                        help=f'Deepest recursion allowed (tree, {" and ".join(DEPTH_LIMITED_ENGINES)} engines only)')
+    parser.add_argument('--max-steps', type=int, metavar='N',
+                        help='Stop a program after N loop iterations and calls (tree engine only)')
+    parser.add_argument('--time-limit', type=float, metavar='SECONDS',
+                        help='Stop a program that runs longer than this (tree engine only)')
+    parser.add_argument('--max-memory', type=parse_size, metavar='SIZE',
+                        help='Stop a program that makes more than SIZE bytes of lists and strings, '
+                             'e.g. 64M (tree engine only)')
+    parser.add_argument('--no-memoize', action='store_true',
+                        help='Always run pure functions instead of reusing earlier results')
+    parser.add_argument('--memo-stats', action='store_true',
+                        help='Print memoization hits and misses to stderr')
+    parser.add_argument('--profile', action='store_true',
+                        help='Print time per function and hits per line to stderr (tree engine only)')
+    parser.add_argument('--profile-mode', choices=MODES,
+                        help=f'Time every call, or sample the running program at almost no cost '
+                             f'(implies --profile; default: {DETERMINISTIC})')
+    parser.add_argument('--profile-output', metavar='FILE',
+                        help='With --profile, write call stacks in collapsed format for flame graphs')
+    parser.add_argument('--coverage', action='store_true',
+                        help='Write FILE.mr.cover showing how often each line ran (tree engine only)')
+    parser.add_argument('--coverage-dir', metavar='DIR',
+                        help='Directory for .cover files (implies --coverage; default: next to the file)')
+    parser.add_argument('--serve', action='store_true',
+                        help='Run programs sent as JSON lines on stdin in a pool of warm worker processes')
+    parser.add_argument('--socket', metavar='PATH',
+                        help='With --serve, take requests from clients of a Unix socket instead of stdin')
+    parser.add_argument('--workers', type=int, metavar='N',
+                        help='With --serve, number of worker processes (default: one per CPU)')
+    parser.add_argument('--max-runs', type=int, metavar='N', default=DEFAULT_MAX_RUNS,
+                        help=f'With --serve, replace a worker after N programs (default: {DEFAULT_MAX_RUNS})')
     
     args = parser.parse_args()
+    if args.max_depth is not None and args.engine not in ('tree',) + DEPTH_LIMITED_ENGINES:
+        parser.error(f'--max-depth needs --engine tree, {" or ".join(DEPTH_LIMITED_ENGINES)}')
+    limited = args.max_steps is not None or args.time_limit is not None or args.max_memory is not None
+    if limited and args.engine != 'tree':
+        parser.error('--max-steps, --time-limit and --max-memory need --engine tree')
+    if args.profile_mode:
+        args.profile = True
+    if args.profile and args.engine != 'tree':
+        parser.error('--profile needs --engine tree')
+    if args.coverage_dir:
+        args.coverage = True
+    if args.coverage and args.engine != 'tree':
+        parser.error('--coverage needs --engine tree')
+    if args.profile_output and not args.profile:
+        parser.error('--profile-output needs --profile')
+    if args.serve and (args.file or args.repl or args.profile or args.coverage or args.disassemble
+                       or args.compile or args.passes is not None or args.optimize or args.optimize_stats):
+        parser.error('--serve runs the programs it is sent; it takes no file, --repl, --profile, '
+                     '--coverage, --disassemble, --compile or optimizer options')
+    if (args.socket or args.workers is not None) and not args.serve:
+        parser.error('--socket and --workers need --serve')
     
-    repl = MarathiREPL()
+    passes = None
+    if args.passes is not None:
+        passes = [name.strip() for name in args.passes.split(',') if name.strip()]
+    elif args.optimize or args.optimize_stats:
+        passes = list(PASSES)
+    try:
+        limits = max_depth = None
+        if args.engine == 'tree':
+            if limited or args.max_depth is not None:
+                limits = Limits(max_steps=args.max_steps, max_seconds=args.time_limit,
+                                max_depth=args.max_depth, max_bytes=args.max_memory)
+        else:
+            max_depth = args.max_depth
+        if args.serve:
+            serve(args, limits, max_depth)
+            return
+        repl = MarathiREPL(use_cache=not args.no_cache, rebuild_cache=args.rebuild_cache,
+                           cache_dir=args.cache_dir, engine=args.engine, optimize=passes,
+                           memoize=not args.no_memoize, max_depth=max_depth,
+                           profile=(args.profile_mode or DETERMINISTIC) if args.profile else None,
+                           coverage=args.coverage, limits=limits)
+    except ValueError as e:
+        parser.error(str(e))
     
     if args.file:
-        repl.execute_file(args.file)
+        repl.execute_file(args.file, disassemble_only=args.disassemble, compile_to=args.compile)
     else:
         repl.run_repl()
+    
+    if args.optimize_stats and repl.optimizer:
+        print(repl.optimizer.report(), file=sys.stderr)
+    if args.memo_stats and repl.evaluator.memo:
+        stats = repl.evaluator.memo.stats()
+        print(', '.join(f'{name} {count}' for name, count in stats.items()), file=sys.stderr)
+    if repl.profile:
+        with open(args.file, 'r', encoding='utf-8') as f:
+            source_lines = f.read().split('\n')
+        print(repl.profile.report(source_lines), file=sys.stderr)
+        if args.profile_output:
+            with open(args.profile_output, 'w', encoding='utf-8') as f:
+                f.write(repl.profile.collapsed())
+    if repl.coverage and args.file:
+        print(repl.coverage.report(args.file, args.coverage_dir), file=sys.stderr)
 
 if __name__ == '__main__':
     main()
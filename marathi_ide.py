@@ -1,10 +1,12 @@
 import tkinter as tk
 from tkinter import scrolledtext, messagebox, filedialog, Menu
-import subprocess
 import os
 import sys
 from pathlib import Path
 
+from interpreter.incremental import IncrementalDocument
+from interpreter.server import WorkerPool
+
 class MarathiIDE(tk.Tk):
     def __init__(self):
         super().__init__()
@@ -57,6 +59,13 @@ class MarathiIDE(tk.Tk):
         
         self.editor.insert(tk.END, sample_code)
         
+        # Incrementally re-lexed/re-parsed copy of the buffer for syntax checks
+        self.document = IncrementalDocument(sample_code)
+        
+        # Warm worker process that runs the code, started on the first run
+        self.pool = None
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        
         # Create output frame
         output_frame = tk.Frame(main_frame, bg='#f0f0f0')
         output_frame.pack(fill=tk.BOTH, expand=False, pady=(5, 0))
@@ -84,6 +93,7 @@ class MarathiIDE(tk.Tk):
         # Bind keyboard shortcuts
         self.bind('<Control-r>', lambda e: self.run_code())
         self.bind('<F5>', lambda e: self.run_code())
+        self.editor.bind('<KeyRelease>', lambda e: self.check_syntax())
         
     def create_menu(self):
         menubar = Menu(self)
@@ -183,9 +193,19 @@ class MarathiIDE(tk.Tk):
         )
         save_btn.pack(side=tk.LEFT, padx=5, pady=5)
         
+    def check_syntax(self):
+        # Only the edited lines are re-lexed and re-parsed
+        self.document.update(self.editor.get("1.0", "end-1c"))
+        errors = self.document.errors
+        if errors:
+            self.status_bar.config(text=f"{len(errors)} syntax error(s): {errors[0]}")
+        else:
+            self.status_bar.config(text="Ready")
+        
     def new_file(self):
         self.editor.delete("1.0", tk.END)
         self.clear_output()
+        self.check_syntax()
         self.status_bar.config(text="New file created")
         
     def open_file(self):
@@ -199,6 +219,7 @@ class MarathiIDE(tk.Tk):
                     content = f.read()
                 self.editor.delete("1.0", tk.END)
                 self.editor.insert("1.0", content)
+                self.check_syntax()
                 self.status_bar.config(text=f"Opened: {file_path}")
             except Exception as e:
                 messagebox.showerror("Error", f"Could not open file: {str(e)}")
@@ -240,43 +261,29 @@ class MarathiIDE(tk.Tk):
         self.update()
         
         try:
-            # Save code to temporary file
-            temp_file = "temp.mr"
-            with open(temp_file, "w", encoding="utf-8") as f:
-                f.write(code)
-            
-            # Get the current directory
-            current_dir = os.getcwd()
-            
-            # Run the code using the interpreter
-            # Set environment variables for proper Unicode handling
-            env = os.environ.copy()
-            env['PYTHONIOENCODING'] = 'utf-8'
-            env['PYTHONLEGACYWINDOWSSTDIO'] = '1'
-            
-            result = subprocess.run(
-                [sys.executable, "run_marathi.py", temp_file], 
-                capture_output=True, 
-                text=True, 
-                cwd=current_dir,
-                encoding='utf-8',
-                env=env
-            )
+            # Run the code in a worker process that has the interpreter
+            # loaded already, collecting what it prints
+            if self.pool is None:
+                self.pool = WorkerPool(size=1)
+            streams = {'stdout': [], 'stderr': []}
+            self.pool.run(code, emit=lambda stream, text: streams[stream].append(text))
+            stdout = ''.join(streams['stdout'])
+            stderr = ''.join(streams['stderr'])
             
             # Display output
             self.output.configure(state='normal')
             self.output.delete("1.0", tk.END)
             
-            if result.stdout:
+            if stdout:
                 self.output.insert(tk.END, "Output:\n")
-                self.output.insert(tk.END, result.stdout)
+                self.output.insert(tk.END, stdout)
                 self.output.insert(tk.END, "\n")
                 
-            if result.stderr:
+            if stderr:
                 self.output.insert(tk.END, "Errors:\n")
-                self.output.insert(tk.END, result.stderr)
+                self.output.insert(tk.END, stderr)
                 
-            if not result.stdout and not result.stderr:
+            if not stdout and not stderr:
                 self.output.insert(tk.END, "Code executed successfully (no output)")
                 
             self.output.configure(state='disabled')
@@ -288,14 +295,11 @@ class MarathiIDE(tk.Tk):
             self.output.insert(tk.END, f"Error running code: {str(e)}")
             self.output.configure(state='disabled')
             self.status_bar.config(text="Error occurred")
-            
-        finally:
-            # Clean up temporary file
-            if os.path.exists(temp_file):
-                try:
-                    os.remove(temp_file)
-                except:
-                    pass
+    
+    def on_close(self):
+        if self.pool is not None:
+            self.pool.close()
+        self.destroy()
 
 if __name__ == "__main__":
     app = MarathiIDE()